@@ -70,7 +70,11 @@ class Chempiler(object):
         graph_file: Union[str, Dict[str, List[Dict[str, Any]]]],
         output_dir: str,
         simulation: bool,
-        device_modules: Optional[List[ModuleType]]
+        device_modules: Optional[List[ModuleType]],
+        precompute_routes: bool = False,
+        graph_snapshot: bool = False,
+        lockstep_execution: bool = False,
+        pipeline_depth: Optional[int] = None
     ) -> None:
         """
         Initialiser method of the Chempiler class. Initialises crash dump
@@ -90,6 +94,17 @@ class Chempiler(object):
                 logged to file) and operational mode.
             device_modules (list): List of modules containing devices to be used
                 in experiment, Defaults to [ChemputerAPI].
+            precompute_routes (bool): Find default port paths between all
+                flask-like nodes at startup, or load them from the route table
+                cache next to the graph file. Defaults to False.
+            graph_snapshot (bool): Load the parsed graph from the snapshot next
+                to the graph file if the graph file hasn't changed, and write
+                the snapshot otherwise. Defaults to False.
+            lockstep_execution (bool): Execute pipelined pump and valve
+                commands one step group at a time instead of as a dependency
+                graph. Defaults to False.
+            pipeline_depth (Optional[int]): Most chunks of a move on a path at
+                once. Defaults to None, as many as the pumps on the path allow.
         """
 
         # Give parameters passed at instantiation to object.
@@ -97,20 +112,27 @@ class Chempiler(object):
         self.output_dir = output_dir
         self.simulation = simulation
         self.device_modules = device_modules or []
+        self.lockstep_execution = lockstep_execution
+        self.pipeline_depth = pipeline_depth
 
         # Initialise everything.
         self.initialise_logging()
         self.graph = ChempilerGraph(
-            graph_file, self.logger, self.device_modules, self.simulation
+            graph_file, self.logger, self.device_modules, self.simulation,
+            use_snapshot=graph_snapshot
         )
+        if precompute_routes:
+            self.graph.precompute_route_table()
         self.setup_platform()
         self.initialise_crash_dump()
         self.initialise_executioners()
 
         # Expose Methods
         self.move = self.pump.move
+        self.move_split = self.pump.move_split
         self.move_duration = self.pump.move_duration
         self.move_locks = self.pump.move_locks
+        self.prepare_move = self.pump.prepare_move
         self.connect = self.pump.connect_nodes
 
     ##################
@@ -145,7 +167,9 @@ class Chempiler(object):
     def initialise_executioners(self) -> None:
         """Instantiate executioners and expose them as attributes of self."""
         self.pump = PumpExecutioner(
-            self.graph, self.simulation, self.crash_dump)
+            self.graph, self.simulation, self.crash_dump,
+            lockstep=self.lockstep_execution,
+            pipeline_depth=self.pipeline_depth)
         self.stirrer = StirrerExecutioner(
             graph=self.graph, simulation=self.simulation)
         self.vacuum = VacuumExecutioner(
@@ -198,7 +222,9 @@ class Chempiler(object):
  {self.graph[node]["lock"]}')
 
                 # If no IllegalLockError raised, go ahead and lock node
-                self.graph[node]['lock'] = pid
+                if self.graph[node]['lock'] != pid:
+                    self.graph[node]['lock'] = pid
+                    self.graph.invalidate_route_cache(topology=False)
 
     def release_lock(self, nodes: List[str], pid: str):
         """Release lock on given nodes with given locking pid.
@@ -210,6 +236,7 @@ class Chempiler(object):
         for node in self.graph.nodes():
             if node in nodes and self.graph[node]['lock'] == pid:
                 self.graph[node]['lock'] = None
+                self.graph.invalidate_route_cache(topology=False)
 
     #################
     # MISCELLANEOUS #
@@ -14,6 +14,9 @@ DEFAULT_MID_PUMP_SPEED = 40
 # numerical constants (in alphabetical order)
 ATMOSPHERIC_PRESSURE = 900
 COOLING_THRESHOLD = 0.5  # degrees
+DEVICE_INIT_WORKERS = 16  # threads
+PLAN_CACHE_SIZE = 16  # plans per prepared move
+ROUTE_CACHE_SIZE = 256  # paths
 SEPARATION_DEAD_VOLUME = 2.5
 SEPARATION_DEFAULT_INITIAL_PUMP_SPEED = 10  # mL/min
 SEPARATION_DEFAULT_MID_PUMP_SPEED = 40  # mL/min
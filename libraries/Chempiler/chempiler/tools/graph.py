@@ -1,16 +1,21 @@
 import json
-import copy
+import pickle
 import networkx as nx
 from . import constants
 from .errors import ChempilerError
+from .path_search import PathQuery, PortStateSearch
+from .route_cache import RouteCache
+from . import route_table
+from . import snapshot
+from .topology import CompiledTopology, PUMP
 import inspect
 import logging
+from concurrent.futures import ThreadPoolExecutor, wait
 from itertools import chain
 from networkx.exception import NetworkXNoPath
 from networkx.readwrite.json_graph import node_link_graph
-from networkx.algorithms.shortest_paths import shortest_path_length
 from typing import (
-    Dict, Any, Optional, Union, List, Iterable, Tuple, Generator
+    Dict, Any, Optional, Union, List, Iterable, Tuple, Generator, FrozenSet
 )
 from types import ModuleType
 from ChemputerAPI import ChemputerDevice, ChemputerPump
@@ -190,7 +195,9 @@ def devices(modules: Iterable[ModuleType], simulation: bool) -> Dict[str, type]:
 ##################
 
 class ChempilerPathStep(object):
-    """Convenience class for steps in a path through the graph.
+    """Convenience class for steps in a path through the graph. Steps are
+    immutable and hashable, so paths can be shared between moves and cached
+    without copying.
 
     Args:
         src (str): Name of source node in step.
@@ -198,6 +205,8 @@ class ChempilerPathStep(object):
         src_port (Optional[Union[int, str]]): Source port in step.
         dest_port (Optional[Union[int, str]]): Destination port in step.
     """
+    __slots__ = ("src", "dest", "src_port", "dest_port")
+
     def __init__(
         self,
         src: str,
@@ -206,10 +215,28 @@ class ChempilerPathStep(object):
         dest_port: Optional[Union[int, str]] = None
     ) -> None:
 
-        self.src = src
-        self.dest = dest
-        self.src_port = src_port
-        self.dest_port = dest_port
+        object.__setattr__(self, "src", src)
+        object.__setattr__(self, "dest", dest)
+        object.__setattr__(self, "src_port", src_port)
+        object.__setattr__(self, "dest_port", dest_port)
+
+    def __setattr__(self, name, value):
+        raise AttributeError(f"{type(self).__name__} is immutable")
+
+    def __delattr__(self, name):
+        raise AttributeError(f"{type(self).__name__} is immutable")
+
+    def __eq__(self, other):
+        if not isinstance(other, ChempilerPathStep):
+            return NotImplemented
+        return self.as_tuple() == other.as_tuple()
+
+    def __hash__(self):
+        return hash(self.as_tuple())
+
+    def __reduce__(self):
+        return (ChempilerPathStep,
+                (self.src, self.dest, self.src_port, self.dest_port))
 
     def as_tuple(self):
         return (self.src, self.dest, (self.src_port, self.dest_port))
@@ -218,6 +245,18 @@ class ChempilerPathStep(object):
         return f"({self.src}, {self.dest}, ({self.src_port}, {self.dest_port}))"
 
 
+def path_from_tuples(path: tuple) -> List[ChempilerPathStep]:
+    """Convert path, or list of paths, from nested step tuples as returned by
+    ChempilerPathStep.as_tuple to ChempilerPathSteps.
+    """
+    return [
+        ChempilerPathStep(step[0], step[1], step[2][0], step[2][1])
+        if isinstance(step[0], str)
+        else path_from_tuples(step)
+        for step in path
+    ]
+
+
 # Long ago when man was King, his heart did speak of a Stained Class...
 class ChempilerGraph:
     """Class to represent the Chemputer topology.
@@ -227,6 +266,11 @@ class ChempilerGraph:
         filename (str): Name of the graph file
             - Currently supports GraphML and JSON
         logger (logging.Logger): Logging module
+        device_modules (List[ModuleType]): Modules containing device classes.
+        simulation (bool): Use simulated devices.
+        use_snapshot (bool): Load the sanitised graph and backbone from the
+            snapshot next to the graph file if the file hasn't changed, and
+            write the snapshot otherwise.
     """
 
     ##################
@@ -238,47 +282,133 @@ class ChempilerGraph:
         filename: str,
         logger: logging.Logger,
         device_modules: List[ModuleType],
-        simulation: bool = False
+        simulation: bool = False,
+        use_snapshot: bool = False
     ):
+        self.graph_file = filename
+        self._raw_graph = None
+
+        # Load sanitised graph from snapshot if possible
+        snapshot_key = None
+        graph_snapshot = None
+        if use_snapshot and isinstance(filename, str):
+            snapshot_key = snapshot.file_hash(filename)
+            graph_snapshot = snapshot.load_snapshot(filename, snapshot_key)
+
+        if graph_snapshot:
+            graph_bytes = graph_snapshot["graph"]
+            self.graph = pickle.loads(graph_bytes)
+
         # Load up the graph file into NetworkX
-        self.graph = load_graph(filename)
-        self.raw_graph = copy.deepcopy(self.graph)
-        self.graph = sanitise_graph(self.graph)
+        else:
+            self.graph = sanitise_graph(load_graph(filename))
+            if snapshot_key:
+                graph_bytes = pickle.dumps(
+                    self.graph, protocol=pickle.HIGHEST_PROTOCOL)
+
+        self._setup(logger, device_modules, simulation)
+
+        # Find the backbone topology. The snapshot backbone can only be used if
+        # nodes have the same device classes.
+        if snapshot_key:
+            classes = snapshot.device_classes(self.graph)
+            if (graph_snapshot
+                    and graph_snapshot["device_classes"] == classes):
+                self.backbone = list(graph_snapshot["backbone"])
+            else:
+                self.backbone = self.find_backbone()
+                snapshot.save_snapshot(
+                    filename, snapshot_key, graph_bytes, classes,
+                    self.backbone)
+        else:
+            self.backbone = self.find_backbone()
+
+    @classmethod
+    def from_sanitised(
+        cls,
+        graph: nx.MultiDiGraph,
+        logger: logging.Logger,
+        simulation: bool = False
+    ) -> 'ChempilerGraph':
+        """Create ChempilerGraph around an already sanitised graph whose nodes
+        already have device objects.
+
+        Args:
+            graph (nx.MultiDiGraph): Sanitised, populated graph.
+            logger (logging.Logger): Logging module
 
+        Returns:
+            ChempilerGraph: Graph wrapping graph.
+        """
+        self = cls.__new__(cls)
+        self.graph_file = None
+        self._raw_graph = None
+        self.graph = graph
+        self._setup(logger, [], simulation)
+        self.backbone = self.find_backbone()
+        return self
+
+    def _setup(
+        self,
+        logger: logging.Logger,
+        device_modules: List[ModuleType],
+        simulation: bool
+    ) -> None:
         # Logging
         self.logger = logger
 
         # Simulation
         self.simulation = simulation
 
+        # Compiled topology and port state search, built on first use as they
+        # need device objects
+        self._topology = None
+        self._path_search = None
+
+        # Paths found by find_path
+        self.route_cache = RouteCache(constants.ROUTE_CACHE_SIZE)
+
+        # Precomputed default port paths, see precompute_route_table
+        self.route_table = {}
+
         # Explicitly populate of flag set
         if device_modules:
             self.populate(device_modules)
 
-        # Find the backbone topology
-        self.backbone = self.find_backbone()
-
         # Nodes wrapper
         self.nodes = self.graph.nodes
 
         # Edge wrapper
         self.edges = self.graph.edges
 
-    def node_can_route(self, node, ports=()):
-        obj = self.graph.nodes[node]["obj"]
-        if hasattr(obj, "capabilities"):
-            capabilities = obj.capabilities
-            if ports:
-                return ("route", ports[0], ports[1]) in capabilities
+    @property
+    def raw_graph(self) -> Optional[nx.MultiDiGraph]:
+        """Graph as loaded from the graph file, before sanitisation. Loaded on
+        first use.
+        """
+        if self._raw_graph is None and self.graph_file:
+            self._raw_graph = load_graph(self.graph_file)
+        return self._raw_graph
+
+    @property
+    def topology(self) -> CompiledTopology:
+        """Compiled topology of this graph, rebuilt after the graph changes."""
+        if self._topology is None:
+            self._topology = CompiledTopology(self.graph)
+        return self._topology
+
+    @property
+    def path_search(self) -> PortStateSearch:
+        """Port state search over this graph, see `find_optimal_path`."""
+        if self._path_search is None:
+            self._path_search = PortStateSearch(self)
+        return self._path_search
 
-            return any([item[0] == "route" for item in capabilities])
-        return False
+    def node_can_route(self, node, ports=()):
+        return self.topology.can_route(node, ports)
 
     def node_can_pump(self, node):
-        obj = self.graph.nodes[node]["obj"]
-        if hasattr(obj, "capabilities"):
-            return "pump" in obj.capabilities
-        return False
+        return self.topology.has_role(node, PUMP)
 
     def node_is_valve(self, node):
         return self[node]["class"] == "ChemputerValve"
@@ -325,7 +455,21 @@ class ChempilerGraph:
         # Return unique list of valves in the backbone
         return list(set(backbone))
 
-    def instantiate_node(self, node: str, devs: Dict[str, type]) -> None:
+    def instantiate_node(
+        self,
+        node: str,
+        devs: Dict[str, type],
+        invalidate: bool = True
+    ) -> None:
+        """Instantiate the device object of node.
+
+        Args:
+            node (str): Node to instantiate.
+            devs (Dict[str, type]): Device classes by class name.
+            invalidate (bool): If True, drop cached paths as the new device
+                object may have different capabilities. populate does this
+                once all devices are instantiated instead.
+        """
         attrs = self.graph.nodes[node]
         node_class = devs[attrs["class"]]
         params = inspect.getfullargspec(node_class)
@@ -351,13 +495,38 @@ class ChempilerGraph:
             self.graph.nodes[node]["obj"] = node_class(**attrs)
         self.logger.debug(f"Node {node} instantiated.")
 
+        # New device object may have different capabilities.
+        if invalidate:
+            self.invalidate_route_cache()
+
+    def invalidate_route_cache(self, topology: bool = True) -> None:
+        """Drop all cached paths. Must be called whenever the graph topology,
+        node locks or node capabilities change.
+
+        Args:
+            topology (bool): If True, edges or device objects have changed so
+                the port state search has to be rebuilt as well.
+        """
+        self.route_cache.clear()
+        if topology:
+            self._topology = None
+            self._path_search = None
+            self.route_table = {}
+
     def populate(self, modules: List) -> None:
         """Populates the graph with ChemputerDevice objects and paramters
 
+        Devices are instantiated concurrently, as connecting to a device can
+        take seconds. All valves are ready before any pump is instantiated.
+
         Args:
             modules (List): List of Chemputer modules e.g. ChemputerAPI,
                 SerialLabware etc.
             simulation (bool): Simulation run
+
+        Raises:
+            ChempilerError: One or more devices could not be instantiated.
+                Every failure is listed in the error message.
         """
 
         # Get all DeviceObjects
@@ -372,24 +541,55 @@ class ChempilerGraph:
             if self.graph.nodes[node]['class'] not in [
                 'ChemputerPump', 'ChemputerValve']
         ]
-        # Instantiate non pump/valve nodes.
-        for node in other_nodes:
-            self.instantiate_node(node, devs)
-
-        # Instantiate valves first so that they switch to an appropriate
-        # position.
-        # before pumps instantiate and push down any liquid they may still
-        # contain.
-        for node in valves:
-            self.instantiate_node(node, devs)
-        for node in valves:
-            self.obj(node).wait_until_ready()
-
-        # Instantiate pumps after valves.
-        for node in pumps:
-            self.instantiate_node(node, devs)
-        for node in pumps:
-            self.obj(node).wait_until_ready()
+
+        def bring_up(node, wait_until_ready):
+            self.instantiate_node(node, devs, invalidate=False)
+            if wait_until_ready:
+                self.obj(node).wait_until_ready()
+
+        failures = []
+        with ThreadPoolExecutor(
+            max_workers=constants.DEVICE_INIT_WORKERS,
+            thread_name_prefix="populate",
+        ) as pool:
+            # Instantiate non pump/valve nodes and valves. Valves go first so
+            # that they switch to an appropriate position before pumps
+            # instantiate and push down any liquid they may still contain.
+            futures = {
+                pool.submit(bring_up, node, False): node
+                for node in other_nodes
+            }
+            valve_futures = {
+                pool.submit(bring_up, node, True): node for node in valves}
+            futures.update(valve_futures)
+            wait(valve_futures)
+
+            # Instantiate pumps after valves, unless a valve failed.
+            if any(future.exception() for future in valve_futures):
+                failures.extend(
+                    (node, "not instantiated as a valve failed")
+                    for node in pumps
+                )
+            else:
+                futures.update({
+                    pool.submit(bring_up, node, True): node for node in pumps})
+
+            for future, node in futures.items():
+                # SystemExit is a BaseException so it is caught here too.
+                exception = future.exception()
+                if exception is not None:
+                    failures.append((node, repr(exception)))
+
+        # New device objects may have different capabilities.
+        self.invalidate_route_cache()
+
+        if failures:
+            report = "\n".join(
+                f"  {node} ({self.graph.nodes[node]['class']}): {reason}"
+                for node, reason in failures
+            )
+            raise ChempilerError(
+                f"Unable to instantiate {len(failures)} device(s):\n{report}")
 
     ########################
     # Full path generation #
@@ -430,14 +630,11 @@ class ChempilerGraph:
         """
 
         # Get all possible edges for every subpath in path.
-        subpaths = [sp for sp in self.subpath_generator(path)]
-        path_edges = []
-        for subpath in subpaths:
-            subpath_edges = []
-            for src, dest, edge_data in self.edges.data():
-                if src == subpath[0] and dest == subpath[1]:
-                    subpath_edges.append([src, dest, edge_data["port"]])
-            path_edges.append(subpath_edges)
+        path_edges = [
+            [[src, dest, ports]
+             for ports in self.topology.edge_ports(src, dest)]
+            for src, dest in self.subpath_generator(path)
+        ]
 
         # Build all paths from all combinations of edges associated with
         # subpaths.
@@ -641,52 +838,39 @@ class ChempilerGraph:
         Returns:
             List[List[Tuple[str]]]: [forward_path, backward_path]
         """
-        # Find closest pump to node
-        shortest_pump_path_length = 100000
-        nearest_pump = None
-        for node in self.graph:
-            if self.node_can_pump(node):
-                try:
-                    pump_path_length = shortest_path_length(
-                        self.graph, source=src, target=node)
-                    if pump_path_length < shortest_pump_path_length:
-                        shortest_pump_path_length = pump_path_length
-                        nearest_pump = node
-                except NetworkXNoPath:
-                    pass
-
-        if not nearest_pump:
-            raise NetworkXNoPath(
-                f"Cannot find normal or alternative path between {src} and\
- {dest}")
+        # Try pumps nearest to src first, moving on to the next nearest pump
+        # if there is no valid path via a pump.
+        for pump in self.topology.nearest_pumps(src):
+            # Find paths from src to pump, and pump to dest.
+            try:
+                src_to_pump = self.find_optimal_path(
+                    src,
+                    pump,
+                    src_port=src_port,
+                    recursion_level=recursion_level + 1
+                )
+                pump_to_dest = self.find_optimal_path(
+                    pump,
+                    dest,
+                    dest_port=dest_port,
+                    recursion_level=recursion_level + 1
+                )
+            except NetworkXNoPath:
+                continue
 
-        # Find paths from src to pump, and pump to dest.
-        src_to_pump = self.find_optimal_path(
-            src,
-            nearest_pump,
-            src_port=src_port,
-            recursion_level=recursion_level + 1
-        )
-        pump_to_dest = self.find_optimal_path(
-            nearest_pump,
-            dest,
-            dest_port=dest_port,
-            recursion_level=recursion_level + 1
-        )
+            # Check paths found are valid
+            src_to_pump = self.filter_invalid_paths(
+                [src_to_pump], src_port=src_port)
+            pump_to_dest = self.filter_invalid_paths(
+                [pump_to_dest], dest_port=dest_port)
 
-        # Check paths found are valid
-        src_to_pump = self.filter_invalid_paths(
-            [src_to_pump], src_port=src_port)[0]
-        pump_to_dest = self.filter_invalid_paths(
-            [pump_to_dest], dest_port=dest_port)[0]
+            if src_to_pump and pump_to_dest:
+                return [src_to_pump[0], pump_to_dest[0]]
 
-        if not src_to_pump or not pump_to_dest:
-            raise NetworkXNoPath(
-                f"Cannot find normal or alternative path between {src} and\
+        raise NetworkXNoPath(
+            f"Cannot find normal or alternative path between {src} and\
  {dest}")
 
-        return [src_to_pump, pump_to_dest]
-
     def find_optimal_path(
         self,
         src: str,
@@ -697,6 +881,7 @@ class ChempilerGraph:
         connect: Optional[bool] = False,
         partial_path: Optional[bool] = False,
         recursion_level: int = 0,
+        avoid: FrozenSet[str] = frozenset(),
     ) -> List[ChempilerPathStep]:
 
         """Finds the most optimal and shortest path through the graph form src
@@ -720,6 +905,8 @@ class ChempilerGraph:
                 on this.
             recursion_level (int): Level of recursion. Needed to stop
                 alternative paths being found within alternative paths.
+            avoid (FrozenSet[str]): Nodes the path must not pass through.
+                Alternative paths are found without this restriction.
 
         Raises:
             NetworkXNoPath: No valid path found between the src and dest.
@@ -728,25 +915,54 @@ class ChempilerGraph:
             List[ChempilerPathStep]: Most optimal path.
         """
 
-        # Try and find all shortest paths from one node to another
-        try:
-            paths = [p for p in nx.all_simple_paths(self.graph, src, dest)]
-        except NetworkXNoPath:
-            raise NetworkXNoPath
+        if src not in self.graph:
+            raise nx.NodeNotFound(f"source node {src} not in graph")
+        if dest not in self.graph:
+            raise nx.NodeNotFound(f"target node {dest} not in graph")
 
-        full_paths = []
-        for path in paths:
-            full_paths.extend(self.get_full_paths(path))
+        def query(first_pred=None, last_pred=None):
+            return PathQuery(
+                src,
+                dest,
+                src_port=src_port,
+                dest_port=dest_port,
+                connect=connect,
+                partial_path=partial_path,
+                first_pred=first_pred,
+                last_pred=last_pred,
+                avoid=avoid,
+            )
+
+        # Explicitly want to utilise backbone. Paths are preferred in order:
+        # starting and ending in the backbone, starting in the backbone, ending
+        # in the backbone, anything else. Shortest path in first non empty
+        # group is returned.
+        if use_backbone:
+            in_backbone = self.in_backbone
+            not_in_backbone = self.not_in_backbone
+            for first_pred, last_pred in [
+                (in_backbone, in_backbone),
+                (in_backbone, not_in_backbone),
+                (not_in_backbone, in_backbone),
+                (not_in_backbone, not_in_backbone),
+            ]:
+                path, _ = self.path_search.find(query(first_pred, last_pred))
+                if path:
+                    break
+
+        # Return shortest path, if there is more than one default to the
+        # backbone.
+        else:
+            path, n_shortest_paths = self.path_search.find(
+                query(), count=True)
+            if path and n_shortest_paths > 1:
+                return self.find_optimal_path(
+                    src, dest, src_port, dest_port, use_backbone=True,
+                    connect=connect, avoid=avoid,
+                )
 
-        valid_paths = self.filter_invalid_paths(
-            full_paths,
-            src_port,
-            dest_port,
-            connect=connect,
-            partial_path=partial_path
-        )
         # No Paths -- try and find alternate path
-        if not valid_paths:
+        if not path:
             if not connect and recursion_level == 0:
                 self.logger.debug(
                     f"Unable to find path between {src} and {dest}\
@@ -767,66 +983,23 @@ class ChempilerGraph:
                         f"Cannot find normal or alternate path between {src}\
  ({src_port}) -- {dest} ({dest_port})"
                     )
-                valid_paths = [alt_path]
+                return alt_path
             else:
                 raise NetworkXNoPath(
                     f"Cannot find path between {src} ({src_port}) -- {dest}\
  ({dest_port})"
                 )
 
-        # Explicitly want to utilise backbone
-        elif use_backbone:
-            # Get all paths that pass through backbone
-            in_backbone_paths = [
-                p for p in valid_paths
-                if p[0].dest in self.backbone and p[-1].src in self.backbone
-            ]
-
-            # No backbone paths, just return shortest path
-            if not in_backbone_paths:
-                src_in_backbone_paths = [
-                    p for p in valid_paths if p[0].dest in self.backbone
-                ]
-                if not src_in_backbone_paths:
-                    dest_in_backbone_paths = [
-                        p for p in valid_paths if p[-1].src in self.backbone
-                    ]
-                    if not dest_in_backbone_paths:
-                        return min(valid_paths, key=lambda x: len(x))
-                    return min(dest_in_backbone_paths, key=lambda x: len(x))
-                return min(src_in_backbone_paths, key=lambda x: len(x))
-
-            # Return the shortest path if there are backbone paths
-            return min(in_backbone_paths, key=lambda x: len(x))
-
-        # Only one path, follow it
-        if len(valid_paths) == 1:
-            return valid_paths[0]
-
-        # Get the shortest path length
-        shortest_path_length = min([
-            len(elem) for elem in valid_paths
-        ])
-
-        # Get the list of shortest paths
-        shortest_paths = [
-            p for p in valid_paths
-            if len(p) == shortest_path_length
+        return [
+            ChempilerPathStep(step_src, step_dest, ports[0], ports[1])
+            for step_src, step_dest, ports in path
         ]
 
-        # Only one, return it
-        if len(shortest_paths) == 1:
-            return shortest_paths[0]
+    def in_backbone(self, node: str) -> bool:
+        return node in self.backbone
 
-        # More than one path, default to the backbone
-        elif len(shortest_paths) > 1:
-            return self.find_optimal_path(
-                src, dest, src_port, dest_port, use_backbone=True,
-                connect=connect,
-            )
-
-        # Just in case
-        return min(valid_paths, key=lambda x: len(x))
+    def not_in_backbone(self, node: str) -> bool:
+        return node not in self.backbone
 
     def assign_default_port(self, src_or_dest, node, port):
         """Assign default port if port not explicitly given."""
@@ -859,11 +1032,15 @@ class ChempilerGraph:
         through: Optional[Union[str, List[str]]] = "",
         use_backbone: Optional[bool] = True,
         connect: Optional[bool] = False,
+        avoid: FrozenSet[str] = frozenset(),
     ) -> List[ChempilerPathStep]:
 
         """Finds the most optimal/shortest path from src to dest
         Gives the optional choice for going through specific nodes.
 
+        Paths are cached in self.route_cache, the path returned is always a
+        copy that the caller is free to modify.
+
         Args:
             src (str): Source node
             dest (str): Destination node
@@ -877,6 +1054,7 @@ class ChempilerGraph:
                 possible. Defaults to True.
             connect (Optional[bool]): True if just valves being connected, no
                 liquid movement, otherwise False.
+            avoid (FrozenSet[str]): Nodes the path must not pass through.
 
         Raises:
             TypeError: Through nodes are not string or list
@@ -884,11 +1062,47 @@ class ChempilerGraph:
         Returns:
             List[ChempilerPathStep]: List of steps in path.
         """
+        if not through and not connect and not avoid:
+            steps = self.route_table.get(
+                (src, dest, src_port, dest_port, use_backbone))
+            if steps is not None:
+                return path_from_tuples(steps)
+
+        key = (
+            src,
+            dest,
+            src_port,
+            dest_port,
+            tuple(through) if isinstance(through, list) else through,
+            use_backbone,
+            connect,
+            frozenset(avoid),
+        )
+        path = self.route_cache.get(key)
+        if path is None:
+            path = self._find_path(
+                src, dest, src_port, dest_port, through, use_backbone, connect,
+                frozenset(avoid))
+            self.route_cache.put(key, path)
+        return path
+
+    def _find_path(
+        self,
+        src: str,
+        dest: str,
+        src_port: Optional[str],
+        dest_port: Optional[str],
+        through: Optional[Union[str, List[str]]],
+        use_backbone: bool,
+        connect: bool,
+        avoid: FrozenSet[str] = frozenset(),
+    ) -> List[ChempilerPathStep]:
+        """Uncached find_path."""
         if not through:
             # No through nodes, just return path from src, to dest
             return self.find_optimal_path(
                 src, dest, src_port, dest_port, use_backbone=use_backbone,
-                connect=connect, partial_path=False
+                connect=connect, partial_path=False, avoid=avoid
             )
 
         # Through single node
@@ -905,6 +1119,7 @@ class ChempilerGraph:
                 use_backbone=False,
                 connect=connect,
                 partial_path=True,
+                avoid=avoid,
             )
 
             self.logger.debug(
@@ -925,6 +1140,7 @@ class ChempilerGraph:
                 use_backbone=False,
                 connect=connect,
                 partial_path=True,
+                avoid=avoid,
             )
             self.logger.debug(
                 f'Found path from {through} to {dest}: {second_path}')
@@ -963,6 +1179,7 @@ class ChempilerGraph:
                 use_backbone=False,
                 connect=connect,
                 partial_path=True,
+                avoid=avoid,
             )
             through_src = through[0]
 
@@ -979,6 +1196,7 @@ class ChempilerGraph:
                         use_backbone=False,
                         connect=connect,
                         partial_path=True,
+                        avoid=avoid,
                     )
                 )
                 through_src = item
@@ -992,6 +1210,7 @@ class ChempilerGraph:
                 use_backbone=False,
                 connect=connect,
                 partial_path=True,
+                avoid=avoid,
             )
 
             # Join paths together
@@ -1038,6 +1257,44 @@ class ChempilerGraph:
         # You failed at following basic instructions....
         raise TypeError("Through parameter must be a list, string, or empty!")
 
+    def precompute_route_table(
+        self,
+        processes: Optional[int] = None,
+        cache_file: Optional[str] = None
+    ) -> None:
+        """Find the default port path between every pair of flask-like nodes
+        up front so that find_path can look them up. The table is loaded from
+        cache_file if it was computed for the same graph file and device
+        classes, otherwise it is computed with a process pool and saved to
+        cache_file.
+
+        Args:
+            processes (int): Number of worker processes. Defaults to the
+                number of CPUs.
+            cache_file (str): Route table cache file. Defaults to the graph
+                file path with '.routes' appended. Not cached if the graph was
+                given as a dict and no cache_file is given.
+        """
+        if cache_file is None and isinstance(self.graph_file, str):
+            cache_file = f"{self.graph_file}.routes"
+
+        key = None
+        routes = None
+        if cache_file:
+            key = route_table.graph_hash(self.graph_file, self.graph)
+            routes = route_table.load_route_table(cache_file, key)
+
+        if routes is None:
+            routes = route_table.compute_route_table(self, processes)
+            if cache_file:
+                route_table.save_route_table(cache_file, key, routes)
+            self.logger.debug(f"Computed {len(routes)} routes.")
+        else:
+            self.logger.debug(
+                f"Loaded {len(routes)} routes from {cache_file}.")
+
+        self.route_table = routes
+
     #################
     # Miscellaneous #
     #################
@@ -1052,13 +1309,9 @@ class ChempilerGraph:
             ChemputerPump: ChemputerPump object
         """
 
-        pump = [
-            x for x in self.graph.neighbors(valve_name)
-            if self.node_can_pump(x)
-        ]
-
+        pump = self.topology.pump_name(valve_name)
         if pump:
-            return self.obj(pump[0])
+            return self.obj(pump)
         return None
 
     def obj(self, key: str) -> ChemputerDevice:
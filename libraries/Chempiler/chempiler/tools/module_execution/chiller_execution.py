@@ -8,6 +8,8 @@ the Chemputer rig, essentially just wrapping the original class methods.
 import logging
 from time import sleep
 
+from SerialLabware import gather
+
 from chempiler.tools.constants import COOLING_THRESHOLD
 
 
@@ -96,6 +98,36 @@ class ChillerExecutioner(object):
         chiller_obj.set_temperature(temp=temp)
         self.logger.info("Done.")
 
+    def set_temps(self, temps):
+        """
+        Sets the temperatures of several chillers at once. Chillers that can
+        submit commands without waiting for them (see
+        `SerialLabware.serial_labware.SerialDevice.submit`) are all sent their
+        setpoint before waiting for any reply.
+
+        Args:
+            temps (Dict[str, float]): Temperature to set for every chiller
+
+        Raises:
+            Empty: A chiller didn't reply within its reply_timeout. Setpoints
+                still queued are cancelled.
+        """
+        replies = []
+        timeout = 0
+        for node_name, temp in temps.items():
+            self.logger.info(
+                "Setting temperature for chiller {0} to {1}°C...".format(
+                    node_name, temp))
+            chiller_obj = self._get_chiller_object(node_name)
+            if hasattr(chiller_obj, "submit"):
+                replies.append(
+                    chiller_obj.submit("set_temperature", temp=temp))
+                timeout = max(timeout, chiller_obj.reply_timeout)
+            else:
+                chiller_obj.set_temperature(temp=temp)
+        gather(*replies, timeout=timeout)
+        self.logger.info("Done.")
+
     def cooling_power(self, node_name, cooling_power):  # TODO check if CF41
         """
         Sets the cooling power of the chiller. Only works with Julabo CF41.
@@ -6,19 +6,26 @@ useful in organic chemical synthesis. Notably, it exposes the `separate_phases`
 function, which is a fairly robust phase separation procedure based on
 conductivtiy measurements, currently tied to `SerialLabware.ConductivitySensor`.
 """
-from typing import Callable, List, Union, Tuple, Dict, Any
+from typing import Callable, List, Optional, Union, Tuple, Dict, Any
+from itertools import zip_longest
 import logging
 import json
-import copy
 import math
+import time
+from collections import OrderedDict
 from typing import Sequence
 
 import numpy as np
 from networkx import MultiDiGraph
+from networkx.exception import NetworkXNoPath
+from ChemputerAPI import execute_group
 
 from .. import constants
 from ..errors import ChempilerError, IllegalPortError
 from ..graph import ChempilerPathStep
+from ..plan import Plan, compact_plan, expand_plan
+from ..step_dag import StepDAG, lockstep_duration
+from ..topology import PUMP, ROUTING, VALVE
 
 class PumpExecutioner(object):
 
@@ -29,7 +36,9 @@ class PumpExecutioner(object):
     def __init__(
         self, graph: MultiDiGraph,
         simulation: bool,
-        crash_dump: str
+        crash_dump: str,
+        lockstep: bool = False,
+        pipeline_depth: Optional[int] = None
     ) -> None:
         """
         Initialiser for the PumpExecutioner class.
@@ -38,6 +47,11 @@ class PumpExecutioner(object):
             graph (MutliDiGraph): Graph representing the platform
             simulation (bool): Whether or not this is a simulation
             crash_dump (str): Path to crash dump JSON file.
+            lockstep (bool): Execute pipelined steps one step group at a
+                time instead of as a dependency graph. Defaults to False.
+            pipeline_depth (Optional[int]): Most chunks of a move on a path
+                at once. Defaults to None, as many as the pumps on the path
+                allow.
         """
 
         # Graph object
@@ -53,9 +67,18 @@ class PumpExecutioner(object):
         # Main logger
         self.logger = logging.getLogger('chempiler')
 
-        # Smallest volume on the platform
+        # Smallest volume on the platform. Moves are chunked by the smallest
+        # syringe on their own path, this is only used for paths without
+        # pumps.
         self.max_volume = self.get_max_syringe_volume()
 
+        # Executor for pipelined steps, and timings of the last execution
+        self.lockstep = lockstep
+        self.execution_times = {}
+
+        # Most chunks of a move in flight at once, None for no limit
+        self.pipeline_depth = pipeline_depth
+
     ##############
     # Crash Dump #
     ##############
@@ -261,28 +284,35 @@ class PumpExecutioner(object):
 
         initial_pump_speed = constants.SEPARATION_DEFAULT_INITIAL_PUMP_SPEED
 
+        # The same two moves are repeated until the phase changes, so their
+        # paths are only found once.
+        withdraw = self.prepare_move(
+            src=separator_flask,
+            dest=separator_pump,
+            initial_pump_speed=initial_pump_speed,
+            mid_pump_speed=constants.SEPARATION_DEFAULT_MID_PUMP_SPEED,
+            end_pump_speed=constants.SEPARATION_DEFAULT_END_PUMP_SPEED,
+        )
+        empty_pump = None
+
         while True:
             if (not (self.graph[separator_pump]['current_volume']
                      + step_size_milliliters
                      < self.graph[separator_pump]['max_volume'])):
-                self.move(
-                    src=separator_pump,
-                    dest=lower_phase_target,
-                    dest_port=lower_phase_port,
-                    volume=self.graph[separator_pump]['current_volume'],
-                    initial_pump_speed=initial_pump_speed,
-                    mid_pump_speed=constants.SEPARATION_DEFAULT_MID_PUMP_SPEED,
-                    end_pump_speed=constants.SEPARATION_DEFAULT_END_PUMP_SPEED,
-                    through_nodes=lower_phase_through
-                )
-            self.move(
-                src=separator_flask,
-                dest=separator_pump,
-                volume=step_size_milliliters,
-                initial_pump_speed=initial_pump_speed,
-                mid_pump_speed=constants.SEPARATION_DEFAULT_MID_PUMP_SPEED,
-                end_pump_speed=constants.SEPARATION_DEFAULT_END_PUMP_SPEED,
-            )
+                if empty_pump is None:
+                    empty_pump = self.prepare_move(
+                        src=separator_pump,
+                        dest=lower_phase_target,
+                        dest_port=lower_phase_port,
+                        initial_pump_speed=initial_pump_speed,
+                        mid_pump_speed=(
+                            constants.SEPARATION_DEFAULT_MID_PUMP_SPEED),
+                        end_pump_speed=(
+                            constants.SEPARATION_DEFAULT_END_PUMP_SPEED),
+                        through_nodes=lower_phase_through
+                    )
+                empty_pump.run(self.graph[separator_pump]['current_volume'])
+            withdraw.run(step_size_milliliters)
 
             if self.simulation:
                 self.logger.info("This is where the magic happens")
@@ -356,8 +386,7 @@ class PumpExecutioner(object):
             valve {str} -- Name of the valve
             port {int} -- Port to turn to
         """
-        if (("route", src_port, dest_port)
-                in self.graph[valve]["obj"].capabilities):
+        if self.graph.node_can_route(valve, (src_port, dest_port)):
             valve_obj = self.graph.obj(valve)
             valve_obj.execute(**{"cmd": ("route", src_port, dest_port)})
             self.logger.info(
@@ -419,16 +448,8 @@ class PumpExecutioner(object):
             ChemputerPump -- ChemputerPump object
         """
 
-        # Should only ever return 1 pump, else the topology is broken
-        pump = [
-            n for n in self.graph.neighbors(valve_name)
-            if self.graph.node_can_pump(n)
-        ]
-
-        if pump:
-            # Return first pump object
-            return self.graph[pump[0]]["obj"]
-        return None
+        # Should only ever be 1 pump, else the topology is broken
+        return self.graph.get_pump_from_valve_name(valve_name)
 
     def get_max_syringe_volume(self) -> float:
         """Gets the smallest volume pump in the graph.
@@ -607,70 +628,26 @@ class PumpExecutioner(object):
         mid_pump_speed: float = constants.DEFAULT_MID_PUMP_SPEED,
         end_pump_speed: float = constants.DEFAULT_END_PUMP_SPEED,
         through_nodes: Union[str, List] = "",
-        use_backbone: bool = True
+        use_backbone: bool = True,
+        prefer_large_syringes: bool = False,
+        parallel_routes: bool = False
     ):
 
         """Get estimated duration of move command."""
-        if speed:
-            initial_pump_speed = speed
-            mid_pump_speed = speed
-            end_pump_speed = speed
-
-        # Get path from src to dest
-        movement_path = self.graph.find_path(
-            src, dest, src_port, dest_port, through_nodes, use_backbone
-        )
-
-        # Alt path is a list of paths, but a normal path is just a single path
-        # so put it in a list so that it can be used in for loop below.
-        if type(movement_path[0]) != list:
-            movement_path = [movement_path]
-
-        total_duration = 0
-        for path in movement_path:
-            # If moving to a pump, remove the last step as it is causes the
-            # valve to try and route from -1 to -1 and the pump to dispense the
-            # liquid that has already been moved to it.
-            if self.graph.node_can_pump(path[-1].dest):
-                path.pop()
-
-            elif self.graph.node_can_pump(path[0].src):
-                path.pop(0)
-
-            # No path, just return or raise Exception
-            if not path:
-                self.logger.info(f"No valid path found for {src} -- {dest}")
-                return
-
-            # Get all nodes that are classed as a route
-            route_nodes, route_valves = self.routing_nodes(path)
-
-            # Connect all valves that act as routes
-            self.connect_routing_valves(route_valves, path)
-
-            # Clean up the steps, ensuring only pump steps remain
-            path = self.prune_steps(path, route_nodes)
-
-            pipelined_steps = self.pipeline_step_list(
-                path,
-                volume,
-                initial_pump_speed,
-                mid_pump_speed,
-                end_pump_speed
-            )
-
-            path_duration = 0
-            for step_group in pipelined_steps:
-                group_duration = 0
-                for _, cmd in step_group:
-                    cmd_duration = self.cmd_duration(cmd)
-                    if cmd_duration > group_duration:
-                        group_duration = cmd_duration
-                path_duration += group_duration
-
-            total_duration += path_duration
-
-        return total_duration
+        return self.prepare_move(
+            src,
+            dest,
+            src_port=src_port,
+            dest_port=dest_port,
+            speed=speed,
+            initial_pump_speed=initial_pump_speed,
+            mid_pump_speed=mid_pump_speed,
+            end_pump_speed=end_pump_speed,
+            through_nodes=through_nodes,
+            use_backbone=use_backbone,
+            prefer_large_syringes=prefer_large_syringes,
+            parallel_routes=parallel_routes
+        ).duration(volume)
 
     def cmd_duration(self, cmd: Dict[str, Any]):
         """Get estimated duration of given cmd.
@@ -693,50 +670,14 @@ class PumpExecutioner(object):
         use_backbone: bool = True
     ):
         """Get lock nodes associated with move commands."""
-        # Get path from src to dest
-        movement_path = self.graph.find_path(
-            src, dest, src_port, dest_port, through_nodes, use_backbone
-        )
-
-        # Alt path is a list of paths, but a normal path is just a single path
-        # so put it in a list so that it can be used in for loop below.
-        if type(movement_path[0]) != list:
-            movement_path = [movement_path]
-
-        for path in movement_path:
-            # If moving to a pump, remove the last step as it is causes the
-            # valve to try and route from -1 to -1 and the pump to dispense the
-            # liquid that has already been moved to it.
-            if self.graph.node_can_pump(path[-1].dest):
-                path.pop()
-
-            elif self.graph.node_can_pump(path[0].src):
-                path.pop(0)
-
-            # No path, just return or raise Exception
-            if not path:
-                self.logger.info(f"No valid path found for {src} -- {dest}")
-                return
-
-            # Get all nodes that are classed as a route
-            route_nodes, route_valves = self.routing_nodes(path)
-
-            locks = []
-            for i, step in enumerate(path):
-                if i == len(path) - 1:
-                    locks.append(step.src)
-                else:
-                    locks.extend([step.src, step.dest])
-                pump_src = self.get_pump_from_valve_name(step.src)
-                pump_dest = self.get_pump_from_valve_name(step.dest)
-                if pump_src:
-                    locks.append(pump_src.name)
-                if pump_dest:
-                    locks.append(pump_dest.name)
-            locks = list(set(locks))
-            ongoing_locks = [path[-1].dest]
-            unlocks = []
-            return locks, ongoing_locks, unlocks
+        return self.prepare_move(
+            src,
+            dest,
+            src_port=src_port,
+            dest_port=dest_port,
+            through_nodes=through_nodes,
+            use_backbone=use_backbone
+        ).locks(volume)
 
     def validate_port(self, node, port):
         if node and port not in [None, '']:
@@ -766,6 +707,24 @@ class PumpExecutioner(object):
         self.validate_port(src, src_port)
         self.validate_port(dest, dest_port)
 
+        self.check_move_volume(src, dest, volume)
+
+        # Check speeds are all legal
+        for speed in [initial_pump_speed, mid_pump_speed, end_pump_speed]:
+            if speed <= 0:
+                raise ChempilerError("Move speeds must be greater than 0.")
+
+            elif speed > 200:
+                raise ChempilerError(
+                    "Move speed too high. Max speed 200 mL/min.")
+
+        # Check src/dest are different
+        if src == dest and not through_nodes:
+            raise ChempilerError(f"Trying to move to/from same node ({src}).")
+
+    def check_move_volume(self, src: str, dest: str, volume: float):
+        """Check volume fits in src and dest if they are pumps."""
+
         # Check not trying to move greater than max volume.
         if self.graph.node_can_pump(src):
             pump_max_volume = self.graph[src]['max_volume']
@@ -781,19 +740,6 @@ class PumpExecutioner(object):
                 raise ChempilerError(f"Trying to pump {volume} to pump with\
  max volume {dest_max_volume}")
 
-        # Check speeds are all legal
-        for speed in [initial_pump_speed, mid_pump_speed, end_pump_speed]:
-            if speed <= 0:
-                raise ChempilerError("Move speeds must be greater than 0.")
-
-            elif speed > 200:
-                raise ChempilerError(
-                    "Move speed too high. Max speed 200 mL/min.")
-
-        # Check src/dest are different
-        if src == dest and not through_nodes:
-            raise ChempilerError(f"Trying to move to/from same node ({src}).")
-
     def assign_default_ports(
             self, src, dest, src_port, dest_port, connect=False):
         """If no port is given assign default port for that node class."""
@@ -836,7 +782,9 @@ class PumpExecutioner(object):
         mid_pump_speed: float = constants.DEFAULT_MID_PUMP_SPEED,
         end_pump_speed: float = constants.DEFAULT_END_PUMP_SPEED,
         through_nodes: Union[str, List] = "",
-        use_backbone: bool = True
+        use_backbone: bool = True,
+        prefer_large_syringes: bool = False,
+        parallel_routes: bool = False
     ):
         """Moves liquid from one node to another
 
@@ -854,22 +802,88 @@ class PumpExecutioner(object):
             dest_port (str): Destination port to use, if available
             use_backbone (bool): Find a path using the backbone of the\
                 Chemputer (default: {True})
+            prefer_large_syringes (bool): Take a longer path through larger\
+                syringes if that takes fewer strokes (default: {False})
+            parallel_routes (bool): Split the volume across a second route\
+                sharing no pumps or valves with the first if that is\
+                estimated to be faster (default: {False})
         """
         if volume <= 0:
             self.logger.info(
                 f'Trying to move volume <= 0 ({volume}). Not doing anything...')
             return
 
+        return self.prepare_move(
+            src,
+            dest,
+            src_port=src_port,
+            dest_port=dest_port,
+            speed=speed,
+            initial_pump_speed=initial_pump_speed,
+            mid_pump_speed=mid_pump_speed,
+            end_pump_speed=end_pump_speed,
+            through_nodes=through_nodes,
+            use_backbone=use_backbone,
+            prefer_large_syringes=prefer_large_syringes,
+            parallel_routes=parallel_routes
+        ).run(volume)
+
+    def prepare_move(
+        self,
+        src: str,
+        dest: str,
+        src_port: str = "",
+        dest_port: str = "",
+        speed=None,
+        initial_pump_speed: float = constants.DEFAULT_INITIAL_PUMP_SPEED,
+        mid_pump_speed: float = constants.DEFAULT_MID_PUMP_SPEED,
+        end_pump_speed: float = constants.DEFAULT_END_PUMP_SPEED,
+        through_nodes: Union[str, List] = "",
+        use_backbone: bool = True,
+        prefer_large_syringes: bool = False,
+        parallel_routes: bool = False
+    ) -> 'PreparedMove':
+        """Finds and compiles the path of a move once, so that the same
+        transfer can be run many times with different volumes.
+
+        The path is found when the move is prepared, so a prepared move
+        doesn't see node locks taken after that.
+
+        Arguments:
+            src (str): Source node
+            dest (str): Destination node
+            initial_pump_speed (float): Speed to pull in liquid @ start
+            mid_pump_speed (float): Speed to move liquid in the middle
+            end_pump_speed (float): Speed to dispense liquid @ end
+
+        Keyword Arguments:
+            through_nodes (Optional[str, List]): Nodes to pass through
+            src_port (str): Source port to use, if available
+            dest_port (str): Destination port to use, if available
+            use_backbone (bool): Find a path using the backbone of the\
+                Chemputer (default: {True})
+            prefer_large_syringes (bool): Also find paths avoiding the\
+                smaller syringes on the path. Every run takes whichever path\
+                needs the fewest strokes for its volume (default: {False})
+            parallel_routes (bool): Also find a route sharing no pumps or\
+                valves with the path. Every run splits its volume across\
+                both routes if that is estimated to be faster\
+                (default: {False})
+
+        Returns:
+            PreparedMove: Handle to run the move, or get its duration and
+                locks, for any volume.
+        """
         if speed:
             initial_pump_speed = speed
             mid_pump_speed = speed
             end_pump_speed = speed
 
-        # Check for illegal args
+        # Check for illegal args, volumes are checked for every run.
         self.check_move_args(
             src=src,
             dest=dest,
-            volume=volume,
+            volume=0,
             src_port=src_port,
             dest_port=dest_port,
             speed=speed,
@@ -884,125 +898,429 @@ class PumpExecutioner(object):
         src_port, dest_port = self.assign_default_ports(
             src, dest, src_port, dest_port)
 
-        pipelined_steps = []
-
         # Get path from src to dest
         movement_path = self.graph.find_path(
             src, dest, src_port, dest_port, through_nodes, use_backbone
         )
+        paths = self.compile_movement_path(movement_path)
+
+        alternatives = []
+        if prefer_large_syringes:
+            alternatives = self.large_syringe_paths(
+                src, dest, src_port, dest_port, through_nodes, use_backbone,
+                paths)
+
+        parallel_paths = None
+        if parallel_routes:
+            parallel_paths = self.parallel_paths(
+                src, dest, src_port, dest_port, through_nodes, use_backbone,
+                paths)
+
+        return PreparedMove(
+            self,
+            src,
+            dest,
+            src_port,
+            dest_port,
+            paths,
+            initial_pump_speed,
+            mid_pump_speed,
+            end_pump_speed,
+            through_nodes,
+            use_backbone,
+            alternatives=alternatives,
+            parallel_paths=parallel_paths
+        )
 
-        # Alt path is a list of paths, but a normal path is just a single path
-        # so put it in a list so that it can be used in for loop below.
-        if type(movement_path[0]) != list:
-            movement_path = [movement_path]
-
-        if len(movement_path) == 1:
-            movement_path = self.split_movement_path(movement_path[0])
+    def move_split(
+        self,
+        src: str,
+        dests: List[Tuple],
+        src_port: str = "",
+        speed=None,
+        initial_pump_speed: float = constants.DEFAULT_INITIAL_PUMP_SPEED,
+        mid_pump_speed: float = constants.DEFAULT_MID_PUMP_SPEED,
+        end_pump_speed: float = constants.DEFAULT_END_PUMP_SPEED,
+        use_backbone: bool = True
+    ):
+        """Moves liquid from one node to several destinations, aspirating it
+        only once.
 
-        self.logger.debug(f'Movement path: {movement_path}')
+        The liquid is drawn up to the last pump the paths to all destinations
+        pass, up to as much as that pump and the path to it hold, and then
+        dispensed from there to every destination in turn. Dispensing to a
+        destination starts as soon as the pumps it needs are free, and valves
+        already in position aren't switched again. If src is a pump or the
+        paths share no pump, every destination gets a move of its own.
 
-        # Alternative paths
-        if len(movement_path) > 1:
-            vol_added = 0
-            try:
-                pump_max_volume = self.max_volume
-            except KeyError:
-                raise KeyError(
-                    f'Node "{movement_path[0][-1].dest}" has no max volume\
- attribute.')
+        Arguments:
+            src (str): Source node
+            dests (List[Tuple]): (dest, volume) or (dest, volume, dest_port)
+                of every destination, in the order to dispense to them.
 
-            while vol_added < volume:
-                vol_to_add = min(pump_max_volume, volume - vol_added)
-                new_pipelined_steps = []
-                for item in movement_path:
-                    new_pipelined_steps += self.pipeline_path(
-                        item,
-                        vol_to_add,
-                        initial_pump_speed,
-                        mid_pump_speed,
-                        end_pump_speed
-                    )
+        Keyword Arguments:
+            src_port (str): Source port to use, if available
+            speed (float): Speed to use for all pump moves, if given.
+            initial_pump_speed (float): Speed to pull in liquid @ start
+            mid_pump_speed (float): Speed to move liquid in the middle
+            end_pump_speed (float): Speed to dispense liquid @ end
+            use_backbone (bool): Find paths using the backbone of the\
+                Chemputer (default: {True})
 
-                # Get most efficient offset
-                offset = 1
-                # if added_first_vol:
-                while len(pipelined_steps) - offset >= 0:
-                    test_steps = copy.deepcopy(pipelined_steps)
-                    test_steps = self.insert_steps(
-                        test_steps, new_pipelined_steps, offset)
-                    try:
-                        self.validate_one_command_per_group_per_node(test_steps)
-                    except ChempilerError:
-                        break
-                    offset += 1
-                offset = max(offset - 1, 0)
+        Returns:
+            List[List[Tuple[Any, Dict]]]: Pipelined step list executed.
+        """
+        dests = [
+            (dest[0], dest[1], dest[2] if len(dest) > 2 else "")
+            for dest in dests
+        ]
+        dests = [dest for dest in dests if dest[1] > 0]
+        if not dests:
+            self.logger.info(
+                'Trying to move volume <= 0 to every destination. Not doing\
+ anything...')
+            return
 
-                # Add pipelined steps at offset
-                pipelined_steps = self.insert_steps(
-                    pipelined_steps, new_pipelined_steps, offset)
-                vol_added += vol_to_add
+        speeds = dict(
+            speed=speed,
+            initial_pump_speed=initial_pump_speed,
+            mid_pump_speed=mid_pump_speed,
+            end_pump_speed=end_pump_speed,
+            use_backbone=use_backbone
+        )
+        moves = [
+            self.prepare_move(
+                src, dest, src_port=src_port, dest_port=dest_port, **speeds)
+            for dest, _, dest_port in dests
+        ]
+        for (dest, volume, _), move in zip(dests, moves):
+            self.check_move_volume(src, dest, volume)
+            if None in move.paths:
+                raise ChempilerError(
+                    f'No valid path found for {src} -- {dest}')
 
+        # Every destination fits in src on its own, check they do together.
+        total_volume = sum(volume for _, volume, _ in dests)
+        if self.graph.node_can_pump(src):
+            pump_max_volume = self.graph[src]['max_volume']
+            if total_volume > pump_max_volume:
+                raise ChempilerError(
+                    f"Trying to pump {total_volume} in total from pump with\
+ max volume {pump_max_volume}")
+
+        # Pipelined step lists of every aspiration and dispense, in order
+        legs = []
+        # A pump source already holds the liquid, so it is dispensed from
+        # there directly.
+        hub = None
+        if not self.graph.node_can_pump(src):
+            hub = self.split_hub(moves)
+        if hub is None:
+            for (_, volume, _), move in zip(dests, moves):
+                legs.append(move.pipeline(volume))
         else:
-            pipelined_steps.extend(self.pipeline_path(
-                movement_path[0],
-                volume,
-                initial_pump_speed,
-                mid_pump_speed,
-                end_pump_speed
-            ))
+            aspirate = self.prepare_move(
+                src, hub, src_port=src_port, **speeds)
+            capacity = min(
+                self.graph[hub]['max_volume'],
+                self.chunk_volume(aspirate.paths)
+            )
+            dispenses = [
+                self.prepare_move(hub, dest, dest_port=dest_port, **speeds)
+                for dest, _, dest_port in dests
+            ]
+
+            # Fill the hub pump, then empty it into the destinations in order
+            # until it is empty, until every destination has its volume.
+            # (volume aspirated, [(dispense, volume dispensed)]) of every fill
+            rounds = []
+            round_volume, round_legs = 0, []
+            for (_, volume, _), dispense in zip(dests, dispenses):
+                while volume > 0:
+                    part = min(volume, capacity - round_volume)
+                    round_legs.append((dispense, part))
+                    round_volume += part
+                    volume -= part
+                    if round_volume >= capacity:
+                        rounds.append((round_volume, round_legs))
+                        round_volume, round_legs = 0, []
+            if round_legs:
+                rounds.append((round_volume, round_legs))
+
+            # Every fill has to fit in the hub pump and be dispensed in full,
+            # and together they have to draw exactly the total volume.
+            for round_volume, round_legs in rounds:
+                self.check_move_volume(src, hub, round_volume)
+                if not math.isclose(
+                        round_volume, sum(part for _, part in round_legs)):
+                    raise ChempilerError(
+                        f'Potential Chempiler Bug: {round_volume} aspirated\
+ into {hub} but {sum(part for _, part in round_legs)} dispensed.')
+            aspirated = sum(round_volume for round_volume, _ in rounds)
+            if not math.isclose(aspirated, total_volume):
+                raise ChempilerError(
+                    f'Potential Chempiler Bug: {aspirated} aspirated from\
+ {src} but {total_volume} to dispense.')
 
-        self.print_pipelined_step_list(pipelined_steps)
+            for round_volume, round_legs in rounds:
+                legs.append(aspirate.pipeline(round_volume))
+                legs.extend(move.pipeline(part) for move, part in round_legs)
 
-        self.logger.info(self.move_log_message(
-            volume=volume, src=src, dest=dest, src_port=src_port,
-            dest_port=dest_port, initial_pump_speed=initial_pump_speed,
-            mid_pump_speed=mid_pump_speed, end_pump_speed=end_pump_speed,
-            through_nodes=through_nodes, use_backbone=use_backbone
-        ))
+        pipelined_steps, last_use = [], {}
+        for leg in legs:
+            self.append_pipeline(pipelined_steps, last_use, leg)
+        pipelined_steps = self.prune_valve_switches(pipelined_steps)
+        self.validate_one_command_per_group_per_node(pipelined_steps)
+        self.validate_pump_moves(pipelined_steps, src, None)
+
+        self.print_pipelined_step_list(pipelined_steps)
+        for (dest, volume, _), move in zip(dests, moves):
+            self.logger.info(self.move_log_message(
+                volume=volume, src=src, dest=dest, src_port=move.src_port,
+                dest_port=move.dest_port,
+                initial_pump_speed=move.initial_pump_speed,
+                mid_pump_speed=move.mid_pump_speed,
+                end_pump_speed=move.end_pump_speed,
+                through_nodes=None, use_backbone=use_backbone
+            ))
 
         self.execute_pipelined_steps(pipelined_steps)
-        self.graph[src]['current_volume'] -= volume
+        self.graph[src]['current_volume'] -= total_volume
         if self.graph[src]['current_volume'] < 0:
             self.logger.warning(
                 f'Negative flask volume: {src}\
  {self.graph[src]["current_volume"]} mL. Setting to 0.')
             self.graph[src]['current_volume'] = 0
-        self.graph[dest]['current_volume'] += volume
+        for dest, volume, _ in dests:
+            self.graph[dest]['current_volume'] += volume
         return pipelined_steps
 
-    def split_movement_path(self, movement_path):
-        """If movement path contains loop, split path into multiple paths at
-        appropriate points so that every path only goes over any node once.
+    def split_hub(self, moves) -> Optional[str]:
+        """Last pump on the paths of all moves, where they split up.
+
+        Args:
+            moves (List[PreparedMove]): Moves from the same source.
+
+        Returns:
+            Optional[str]: Name of the pump, None if the paths don't start
+                with the same pump.
         """
-        split_path = [[]]
-        passed_nodes = []
-        for step in movement_path:
-            if step.src in passed_nodes:
-                final_node = split_path[-1][-1].dest
-                if self.graph.node_can_route(final_node):
-                    final_node_pump = self.get_pump_from_valve_name(
-                        final_node).name
-                    split_path[-1].append(
-                        ChempilerPathStep(
-                            final_node,
-                            final_node_pump,
-                            src_port=-1,
-                            dest_port=0
-                        )
-                    )
+        topology = self.graph.topology
+        common = None
+        for move in moves:
+            pumps = []
+            for compiled_path in move.paths:
+                for step in compiled_path.steps:
+                    if topology.has_role(step.dest, VALVE):
+                        pump = topology.pump_name(step.dest)
+                        if pump:
+                            pumps.append(pump)
+            if common is None:
+                common = pumps
+            else:
+                n_common = 0
+                for pump, other in zip(common, pumps):
+                    if pump != other:
+                        break
+                    n_common += 1
+                common = common[:n_common]
+        if not common:
+            return None
+        return common[-1]
 
-                    split_path.append([ChempilerPathStep(
-                        final_node_pump,
-                        step.src,
-                        src_port=0,
-                        dest_port=-1,
-                    )])
-                else:
-                    split_path.append([])
-                passed_nodes = []
-            split_path[-1].append(step)
-            passed_nodes.append(step.src)
-        return split_path
+    def compile_movement_path(self, movement_path):
+        """Compile a path returned by find_path, splitting it at loops.
+
+        Args:
+            movement_path (List): Path, or list of paths, from find_path.
+
+        Returns:
+            List[Optional[CompiledPath]]: Compiled paths, executed one after
+                the other.
+        """
+        # Alt path is a list of paths, but a normal path is just a single path
+        # so put it in a list so that it can be used in for loop below.
+        if type(movement_path[0]) != list:
+            movement_path = [movement_path]
+
+        if len(movement_path) == 1:
+            movement_path = self.split_movement_path(movement_path[0])
+
+        self.logger.debug(f'Movement path: {movement_path}')
+
+        return [self.compile_path(path) for path in movement_path]
+
+    def large_syringe_paths(
+        self,
+        src,
+        dest,
+        src_port,
+        dest_port,
+        through_nodes,
+        use_backbone,
+        paths
+    ):
+        """Paths from src to dest avoiding pumps smaller than the smallest
+        syringe on paths, one for every larger syringe size reachable. Paths
+        passing through any node other than valves that paths doesn't pass
+        through, e.g. a cartridge, are not taken.
+
+        Args:
+            src (str): Source node.
+            dest (str): Destination node.
+            src_port (Union[int, str]): Source port.
+            dest_port (Union[int, str]): Destination port.
+            through_nodes (Union[str, List]): Nodes to pass through.
+            use_backbone (bool): Find paths using the backbone.
+            paths (List[Optional[CompiledPath]]): Compiled default path.
+
+        Returns:
+            List[List[Optional[CompiledPath]]]: Compiled paths, in order of
+                increasing chunk volume.
+        """
+        topology = self.graph.topology
+        pumps = [
+            pump for pump in self.graph.nodes
+            if self.graph.node_can_pump(pump)
+        ]
+        allowed_nodes = self.passed_nodes(paths) | {src, dest}
+        alternatives = []
+        best_volume = self.chunk_volume(paths)
+        for size in sorted({self.graph[pump]['max_volume'] for pump in pumps}):
+            if size <= best_volume:
+                continue
+            small_pumps = {
+                pump for pump in pumps
+                if self.graph[pump]['max_volume'] < size
+            }
+            avoid = {
+                node for node in self.graph.nodes
+                if node in small_pumps
+                or topology.pump_name(node) in small_pumps
+            } - {src, dest}
+            try:
+                movement_path = self.graph.find_path(
+                    src, dest, src_port, dest_port, through_nodes,
+                    use_backbone, avoid=frozenset(avoid))
+            except NetworkXNoPath:
+                continue
+            alternative = self.compile_movement_path(movement_path)
+            if not self.passed_nodes(alternative) <= allowed_nodes:
+                continue
+            alternative_volume = self.chunk_volume(alternative)
+            if alternative_volume > best_volume:
+                alternatives.append(alternative)
+                best_volume = alternative_volume
+        return alternatives
+
+    def parallel_paths(
+        self,
+        src,
+        dest,
+        src_port,
+        dest_port,
+        through_nodes,
+        use_backbone,
+        paths
+    ):
+        """Path from src to dest sharing no node other than src and dest with
+        paths, and not passing through any node other than valves.
+
+        Args:
+            src (str): Source node.
+            dest (str): Destination node.
+            src_port (Union[int, str]): Source port.
+            dest_port (Union[int, str]): Destination port.
+            through_nodes (Union[str, List]): Nodes to pass through.
+            use_backbone (bool): Find paths using the backbone.
+            paths (List[Optional[CompiledPath]]): Compiled default path.
+
+        Returns:
+            Optional[List[CompiledPath]]: Compiled parallel path, or None if
+                there is none.
+        """
+        if through_nodes or None in paths:
+            return None
+
+        topology = self.graph.topology
+        avoid = set()
+        for compiled_path in paths:
+            for step in compiled_path.path:
+                for node in (step.src, step.dest):
+                    avoid.add(node)
+                    if topology.pump_name(node):
+                        avoid.add(topology.pump_name(node))
+        avoid -= {src, dest}
+
+        try:
+            movement_path = self.graph.find_path(
+                src, dest, src_port, dest_port, through_nodes, use_backbone,
+                avoid=frozenset(avoid))
+        except NetworkXNoPath:
+            return None
+
+        parallel = self.compile_movement_path(movement_path)
+        if None in parallel or not self.passed_nodes(parallel) <= {src, dest}:
+            return None
+
+        # Alternative paths are found without avoiding nodes.
+        for compiled_path in parallel:
+            for step in compiled_path.path:
+                if {step.src, step.dest} & avoid:
+                    return None
+        return parallel
+
+    def passed_nodes(self, paths) -> set:
+        """Nodes other than valves on compiled paths, e.g. flasks and
+        cartridges.
+
+        Args:
+            paths (List[Optional[CompiledPath]]): Compiled paths.
+
+        Returns:
+            Set[str]: Node names.
+        """
+        return {
+            node
+            for compiled_path in paths if compiled_path
+            for step in compiled_path.path
+            for node in (step.src, step.dest)
+            if not self.graph.node_is_valve(node)
+        }
+
+    def split_movement_path(self, movement_path):
+        """If movement path contains loop, split path into multiple paths at
+        appropriate points so that every path only goes over any node once.
+        """
+        split_path = [[]]
+        passed_nodes = []
+        for step in movement_path:
+            if step.src in passed_nodes:
+                final_node = split_path[-1][-1].dest
+                if self.graph.node_can_route(final_node):
+                    final_node_pump = self.get_pump_from_valve_name(
+                        final_node).name
+                    split_path[-1].append(
+                        ChempilerPathStep(
+                            final_node,
+                            final_node_pump,
+                            src_port=-1,
+                            dest_port=0
+                        )
+                    )
+
+                    split_path.append([ChempilerPathStep(
+                        final_node_pump,
+                        step.src,
+                        src_port=0,
+                        dest_port=-1,
+                    )])
+                else:
+                    split_path.append([])
+                passed_nodes = []
+            split_path[-1].append(step)
+            passed_nodes.append(step.src)
+        return split_path
 
     def insert_steps(self, pipelined_steps, steps_to_add, offset):
         """Insert steps_to_add pipelined step list into pipelined_steps
@@ -1017,12 +1335,184 @@ class PumpExecutioner(object):
         else:
             for j, item in enumerate(steps_to_add):
                 pos = pipelined_steps_len - offset + j
-                if pos >= len(steps_to_add):
+                if pos >= pipelined_steps_len:
                     pipelined_steps.append(item)
                 else:
                     pipelined_steps[pos].extend(item)
         return pipelined_steps
 
+    def group_occupancy(self, step_group):
+        """Occupancy of a step group, for checking what
+        `validate_one_command_per_group_per_node` would say about merged step
+        groups without building them.
+
+        Args:
+            step_group (List[Tuple[ChemputerDevice, Dict]]): Step group.
+
+        Returns:
+            Tuple[int, int, bool]: Bitset of the node ids given commands,
+                bitset of the ids of the pumps attached to routing nodes given
+                commands, and whether the step group is valid on its own.
+        """
+        topology = self.graph.topology
+        nodes, valve_pumps = 0, 0
+        valid = True
+        for device, _ in step_group:
+            node_id = topology.ids[device.name]
+            if nodes >> node_id & 1:
+                valid = False
+            nodes |= 1 << node_id
+            if topology.roles[node_id] & ROUTING:
+                pump_id = topology.valve_pump[node_id]
+                if pump_id >= 0:
+                    valve_pumps |= 1 << pump_id
+        return nodes, valve_pumps, valid and not valve_pumps & nodes
+
+    def merge_occupancy(self, occupancy, other):
+        """Occupancy of the step group made by merging two step groups."""
+        nodes, valve_pumps, valid = occupancy
+        other_nodes, other_valve_pumps, other_valid = other
+        merged_nodes = nodes | other_nodes
+        merged_valve_pumps = valve_pumps | other_valve_pumps
+        return (
+            merged_nodes,
+            merged_valve_pumps,
+            (valid and other_valid and not nodes & other_nodes
+             and not merged_valve_pumps & merged_nodes)
+        )
+
+    def find_insert_offset(self, occupancy, new_occupancy):
+        """Find the largest offset at which `insert_steps` can insert a step
+        list with new_occupancy into one with occupancy such that the result
+        passes `validate_one_command_per_group_per_node`, trying offsets from
+        1 upwards and stopping at the first one that fails. Only the step
+        groups that would be merged are looked at.
+
+        Args:
+            occupancy (List[Tuple[int, int, bool]]): `group_occupancy` of
+                every step group of the step list to insert into.
+            new_occupancy (List[Tuple[int, int, bool]]): `group_occupancy` of
+                every step group of the step list to insert.
+
+        Returns:
+            int: Offset to pass to `insert_steps`.
+        """
+        n_existing = len(occupancy)
+        all_valid = (
+            all(valid for _, _, valid in occupancy)
+            and all(valid for _, _, valid in new_occupancy)
+        )
+
+        offset = 1
+        while n_existing - offset >= 0:
+            legal = all_valid
+            for j, new_group in enumerate(new_occupancy):
+                pos = n_existing - offset + j
+                # insert_steps appends this and every later step group.
+                if pos >= n_existing or not legal:
+                    break
+                if not self.merge_occupancy(occupancy[pos], new_group)[2]:
+                    legal = False
+            if not legal:
+                break
+            offset += 1
+        return max(offset - 1, 0)
+
+    def insert_occupancy(self, occupancy, new_occupancy, offset):
+        """Update occupancy the way `insert_steps` updates the step list with
+        the same arguments.
+        """
+        if not occupancy:
+            return list(new_occupancy)
+        n_existing = len(occupancy)
+        for j, new_group in enumerate(new_occupancy):
+            pos = n_existing - offset + j
+            if pos >= n_existing:
+                occupancy.append(new_group)
+            else:
+                occupancy[pos] = self.merge_occupancy(
+                    occupancy[pos], new_group)
+        return occupancy
+
+    def append_pipeline(self, pipelined_steps, last_use, new_steps):
+        """Add the step groups of new_steps to pipelined_steps, starting as
+        early as every pump, pump valve and routing valve it uses is done with
+        the step groups before.
+
+        A pump and its valve are one resource. Liquid may flow through a
+        routing valve without a pump at any point of the step list switching
+        it, so it is used from the first to the last step group.
+
+        Args:
+            pipelined_steps (List[List[Tuple[Any, Dict]]]): Pipelined step
+                list, extended in place.
+            last_use (Dict[str, int]): Last step group of pipelined_steps
+                using every resource, updated in place.
+            new_steps (List[List[Tuple[Any, Dict]]]): Pipelined step list to
+                add.
+
+        Returns:
+            int: Step group of pipelined_steps new_steps start at.
+        """
+        topology = self.graph.topology
+        first, last = {}, {}
+        for i, step_group in enumerate(new_steps):
+            for device, _ in step_group:
+                name = device.name
+                pump = None
+                if topology.has_role(name, VALVE):
+                    pump = topology.pump_name(name)
+                if pump:
+                    resource = pump
+                elif (topology.has_role(name, ROUTING)
+                      and not topology.has_role(name, PUMP)):
+                    first[name], last[name] = 0, len(new_steps) - 1
+                    continue
+                else:
+                    resource = name
+                first.setdefault(resource, i)
+                last[resource] = i
+
+        start = max(
+            (last_use[resource] + 1 - first[resource]
+             for resource in first if resource in last_use),
+            default=0
+        )
+        start = max(start, 0)
+        for i, step_group in enumerate(new_steps):
+            if start + i == len(pipelined_steps):
+                pipelined_steps.append([])
+            pipelined_steps[start + i].extend(step_group)
+        for resource in first:
+            last_use[resource] = start + last[resource]
+        return start
+
+    def prune_valve_switches(self, pipelined_steps):
+        """Pipelined step list without commands switching a valve to the
+        route it was last switched to, and without the step groups left
+        empty.
+
+        Args:
+            pipelined_steps (List[List[Tuple[Any, Dict]]]): Pipelined step
+                list.
+
+        Returns:
+            List[List[Tuple[Any, Dict]]]: Pruned pipelined step list.
+        """
+        routes = {}
+        pruned = []
+        for step_group in pipelined_steps:
+            new_group = []
+            for device, cmd in step_group:
+                if cmd['cmd'][0] == 'route':
+                    if routes.get(device.name) == cmd['cmd']:
+                        continue
+                    routes[device.name] = cmd['cmd']
+                new_group.append((device, cmd))
+            if new_group:
+                pruned.append(new_group)
+        return pruned
+
     def move_log_message(
         self,
         volume,
@@ -1064,8 +1554,29 @@ class PumpExecutioner(object):
         initial_pump_speed,
         mid_pump_speed,
         end_pump_speed,
+        trusted=False,
     ):
-        path = copy.deepcopy(path)
+        return self.pipeline_compiled_path(
+            self.compile_path(path),
+            volume,
+            initial_pump_speed,
+            mid_pump_speed,
+            end_pump_speed,
+            trusted=trusted
+        )
+
+    def compile_path(self, path) -> Optional['CompiledPath']:
+        """Does everything needed to pipeline a path that doesn't depend on the
+        volume moved.
+
+        Args:
+            path (List[ChempilerPathStep]): Path without loops.
+
+        Returns:
+            Optional[CompiledPath]: Compiled path, or None if there is no
+                path left once pump ends are removed.
+        """
+        path = list(path)
         path_src, path_dest = path[0].src, path[-1].dest
         # Get all nodes that are classed as a route
         route_nodes, route_valves = self.routing_nodes(path)
@@ -1097,28 +1608,122 @@ class PumpExecutioner(object):
         self.logger.debug(path_s)
 
         # Clean up the steps, ensuring only pump steps remain
-        path = self.prune_steps(path, route_nodes)
+        steps = self.prune_steps(list(path), route_nodes)
 
-        pipelined_step_list = self.pipeline_step_list(
+        return CompiledPath(
             path_src,
             path_dest,
             path,
+            steps,
+            connect_routing_valve_cmds,
+            self.path_max_volume(steps)
+        )
+
+    def path_pumps(self, steps) -> List[str]:
+        """Pumps attached to the valves of a pruned path.
+
+        Args:
+            steps (List[ChempilerPathStep]): Pruned path steps.
+
+        Returns:
+            List[str]: Pump names, in path order without duplicates.
+        """
+        pumps = []
+        for step in steps:
+            for node in (step.src, step.dest):
+                pump = self.graph.topology.pump_name(node)
+                if pump and pump not in pumps:
+                    pumps.append(pump)
+        return pumps
+
+    def path_max_volume(self, steps) -> float:
+        """Largest volume that can be moved along a pruned path at once, i.e.
+        the smallest syringe on it.
+
+        Args:
+            steps (List[ChempilerPathStep]): Pruned path steps.
+
+        Returns:
+            float: Smallest max volume of the pumps on the path, or the
+                smallest on the platform if there are none.
+        """
+        pumps = self.path_pumps(steps)
+        if not pumps:
+            return self.max_volume
+        return min(self.graph[pump]['max_volume'] for pump in pumps)
+
+    def chunk_volume(self, paths) -> float:
+        """Largest volume that can be moved along all of paths at once.
+
+        Args:
+            paths (List[Optional[CompiledPath]]): Compiled paths.
+
+        Returns:
+            float: Smallest syringe on paths.
+        """
+        volumes = [path.max_volume for path in paths if path is not None]
+        if not volumes:
+            return self.max_volume
+        return min(volumes)
+
+    def pipeline_compiled_path(
+        self,
+        compiled_path,
+        volume,
+        initial_pump_speed,
+        mid_pump_speed,
+        end_pump_speed,
+        trusted=False,
+    ):
+        """Pipelined step list moving volume along a compiled path, in chunks
+        of at most the smallest syringe on the path.
+
+        Args:
+            compiled_path (Optional[CompiledPath]): Path from compile_path.
+            volume (float): Volume to move.
+            initial_pump_speed (float): Speed to aspirate from src at.
+            mid_pump_speed (float): Speed to pump between pumps at.
+            end_pump_speed (float): Speed to dispense to dest at.
+            trusted (bool): If True, skip validation of the pipelined step
+                list.
+
+        Returns:
+            List[List[Tuple[Any, Dict[str, Any]]]]: Pipelined step list, or
+                None if compiled_path is None.
+        """
+        if compiled_path is None:
+            return
+
+        pipelined_step_list = self.pipeline_step_list(
+            compiled_path.src,
+            compiled_path.dest,
+            compiled_path.steps,
             volume,
             initial_pump_speed,
             mid_pump_speed,
-            end_pump_speed
+            end_pump_speed,
+            trusted=trusted,
+            max_volume=compiled_path.max_volume
         )
 
-        pipelined_step_list[0].extend(connect_routing_valve_cmds)
+        # Fresh dicts, so pipelines of the same compiled path share no state.
+        pipelined_step_list[0].extend(
+            (device, dict(cmd))
+            for device, cmd in compiled_path.route_cmds
+        )
 
         return pipelined_step_list
 
     def expected_n_pump_step_groups(
-        self, backbone_valves, n_pump_volumes, src, dest
+        self, backbone_valves, n_pump_volumes, src, dest, extra_groups=None
     ):
+        # Step groups the last chunk ends after the first one, half of them
+        # pump step groups. By default every chunk ends four step groups after
+        # the one before it.
+        if extra_groups is None:
+            extra_groups = 4 * (n_pump_volumes - 1)
         expected_n_pump_step_groups = (
-            (len(backbone_valves) + 1) + (2 * (n_pump_volumes - 1))
-        )
+            (len(backbone_valves) + 1) + extra_groups // 2)
         if self.graph.node_can_pump(src):
             expected_n_pump_step_groups -= 1
         if self.graph.node_can_pump(dest):
@@ -1132,7 +1737,8 @@ class PumpExecutioner(object):
         volume,
         pump_max_volume,
         src,
-        dest
+        dest,
+        extra_groups=None
     ):
         n_pump_step_groups = 0
         backbone_valves = []
@@ -1156,7 +1762,7 @@ class PumpExecutioner(object):
 
         try:
             assert n_pump_step_groups == self.expected_n_pump_step_groups(
-                backbone_valves, n_pump_volumes, src, dest
+                backbone_valves, n_pump_volumes, src, dest, extra_groups
             )
         except AssertionError:
             self.print_pipelined_step_list(pipelined_step_list)
@@ -1305,21 +1911,169 @@ class PumpExecutioner(object):
         volume,
         pump_max_volume,
         src,
-        dest
+        dest,
+        extra_groups=None
     ):
         """Sanity check on pipelined step list.
-        Implemented: Check length of pipeline is consistent with expected length
-                     after pipelining.
+
+        Does the checks of `validate_len_pipeline`,
+        `validate_src_dest_volumes`, `validate_one_command_per_group_per_node`,
+        `validate_pump_moves` and `validate_valve_switches` in a single pass
+        over the pipelined step list, looking up every node once. If several
+        checks fail, the error of the check first in that order is raised.
+
+        extra_groups is the number of step groups the last chunk ends after
+        the first one, see `schedule_chunks`.
 
         TODO:
         * Validate all valve switches -1 <-> (0...5)
         """
-        self.validate_len_pipeline(
-            step_list, pipelined_step_list, volume, pump_max_volume, src, dest)
-        self.validate_src_dest_volumes(src, dest, pipelined_step_list, volume)
-        self.validate_one_command_per_group_per_node(pipelined_step_list)
-        self.validate_pump_moves(pipelined_step_list, src, dest)
-        self.validate_valve_switches(pipelined_step_list)
+        topology = self.graph.topology
+
+        # (is pump, pump of routing node, is ChemputerValve) of every node
+        node_info = {}
+
+        def info(name):
+            if name not in node_info:
+                node_id = topology.ids[name]
+                valve_pump = None
+                if topology.roles[node_id] & ROUTING:
+                    valve_pump = topology.pump_name(name)
+                node_info[name] = (
+                    bool(topology.roles[node_id] & PUMP),
+                    valve_pump,
+                    self.graph[name]['class'] == 'ChemputerValve',
+                )
+            return node_info[name]
+
+        # validate_len_pipeline
+        n_pump_step_groups = 0
+
+        # validate_src_dest_volumes
+        check_volumes = not self.graph.node_can_pump(dest)
+        src_is_pump = self.graph.node_can_pump(src)
+        src_step, dest_step = (), ()
+        src_volume, dest_volume = 0, 0
+
+        # validate_one_command_per_group_per_node
+        group_error = None
+
+        # validate_pump_moves
+        pump_volumes = {}
+        pump_error = None
+
+        # validate_valve_switches
+        valve_error = None
+
+        for step_group in pipelined_step_list:
+            nodes_used = set()
+            valve_pumps = set()
+            pump_step_group = False
+            duplicate = False
+
+            for step in step_group:
+                name = step[0].name
+                is_pump, valve_pump, is_valve = info(name)
+                cmd = step[1]
+
+                if is_pump:
+                    pump_step_group = True
+
+                if name in nodes_used:
+                    duplicate = True
+                nodes_used.add(name)
+                if valve_pump:
+                    valve_pumps.add(valve_pump)
+
+                if check_volumes:
+                    if not src_step:
+                        if (src_is_pump
+                                and cmd['cmd'][0] == 'source'
+                                and is_pump):
+                            src_step = step
+                        elif is_pump and cmd['cmd'][0] == 'sink':
+                            src_step = step
+                        if src_step:
+                            src_volume += cmd['volume']
+                    elif (name == src_step[0].name
+                          and cmd['cmd'][0] == src_step[1]['cmd'][0]):
+                        src_volume += cmd['volume']
+
+                    if not dest_step:
+                        if is_pump and cmd['cmd'][0] == 'source':
+                            dest_step = step
+                        if dest_step:
+                            dest_volume += cmd['volume']
+                    elif (name == dest_step[0].name
+                          and cmd['cmd'][0] == dest_step[1]['cmd'][0]):
+                        dest_volume += cmd['volume']
+
+                if (pump_error is None and is_pump
+                        and name not in [src, dest]):
+                    direction = cmd['cmd'][0]
+                    pump_volume = pump_volumes.get(name, 0)
+                    if direction == 'sink':
+                        pump_volume += cmd['volume']
+                    elif direction == 'source':
+                        pump_volume -= cmd['volume']
+                    else:
+                        pump_error = ChempilerError(
+                            'Invalid command given to pump. Valid commands:\
+ "sink", "source"')
+                    pump_volumes[name] = pump_volume
+                    if pump_error is None and not (
+                            0 <= pump_volume <= self.graph[name]['max_volume']):
+                        pump_error = AssertionError()
+
+                if (valve_error is None and is_valve
+                        and str(cmd['cmd'][1])
+                        not in constants.VALID_PORTS['ChemputerValve']):
+                    valve_error = AssertionError()
+
+            if pump_step_group:
+                n_pump_step_groups += 1
+
+            if group_error is None:
+                if duplicate:
+                    group_error = ChempilerError(
+                        'Fatal error: Same node used multiple times in step\
+ group.')
+                elif valve_pumps & nodes_used:
+                    group_error = ChempilerError(
+                        'Fatal error: Pump valves switched during pump step\
+ group.')
+
+        # Length of pipeline
+        backbone_valves = []
+        for step in step_list[1:]:
+            if step.src in self.graph.backbone:
+                backbone_valves.append(step.src)
+        if step_list[0].src in self.graph.backbone:
+            backbone_valves.append(step_list[0].src)
+        if step_list[-1].dest in self.graph.backbone:
+            backbone_valves.append(step_list[-1].dest)
+        n_pump_volumes = math.ceil(volume / pump_max_volume)
+        if n_pump_step_groups != self.expected_n_pump_step_groups(
+                backbone_valves, n_pump_volumes, src, dest, extra_groups):
+            self.print_pipelined_step_list(pipelined_step_list)
+            raise ChempilerError(
+                'Potential Chempiler Bug: Suspicious pipelined step list length\
+ found. Likely is a pipelining error.')
+
+        # Volumes leaving src and arriving at dest
+        if check_volumes:
+            self.logger.debug(f'Validating src volume {src_step} {src_volume}')
+            self.logger.debug(
+                f'Validating dest volume {dest_step} {dest_volume}')
+            if not src_volume == dest_volume == volume:
+                self.print_pipelined_step_list(pipelined_step_list)
+                raise ChempilerError(
+                    f'Fatal error: Volume leaving src ({src}) != volume\
+ arriving at dest ({dest}) != target volume')
+
+        for error in [group_error, pump_error, valve_error]:
+            if error is not None:
+                raise error
 
     def pipeline_step_list(
         self,
@@ -1329,37 +2083,48 @@ class PumpExecutioner(object):
         volume,
         initial_pump_speed,
         mid_pump_speed,
-        end_pump_speed
+        end_pump_speed,
+        trusted=False,
+        max_volume=None
     ):
-        pipelined_step_list = []
-        pipeline_pos = 0
-
-        # Flag to know if recursive call has been made during path.
-        recursive = False
-
-        original_volume = volume
-        # Keep going as long as the volume is above 0
-        # while volume > 0:
-        # Minimal volume if volume is greater than that, else the current
-        # volume value
-        vol = self.max_volume if volume > self.max_volume else volume
-
-        # Subtract vol for first movement
-        volume -= vol
-        # Execute each step
-        for pos, step in enumerate(step_list):
-            if pipeline_pos >= len(pipelined_step_list):
-                pipelined_step_list.append([])
-            # Get speed to use for pumping
+        """Pipeline the pump steps of a path, moving volume in chunks of at
+        most max_volume.
+
+        Every step of every chunk is scheduled as soon as the pumps and
+        valves it uses are done with the chunks before it, see
+        `schedule_chunks`. On long paths every pump is kept busy with a
+        different chunk. `pipeline_depth` limits how many chunks are on the
+        path at once.
+
+        Args:
+            src (str): Source node of the move.
+            dest (str): Destination node of the move.
+            step_list (List[ChempilerPathStep]): Pruned path steps.
+            volume (float): Volume to move.
+            initial_pump_speed (float): Speed to aspirate from src at.
+            mid_pump_speed (float): Speed to pump between pumps at.
+            end_pump_speed (float): Speed to dispense to dest at.
+            trusted (bool): If True, skip validation of the pipelined step
+                list. Only for moves whose pipelining has already been
+                validated.
+            max_volume (float): Largest volume to move at once, usually the
+                smallest syringe on the path. Defaults to the smallest syringe
+                on the platform.
+
+        Returns:
+            List[List[Tuple[Any, Dict[str, Any]]]]: Pipelined step list.
+        """
+        if max_volume is None:
+            max_volume = self.max_volume
+
+        # Speed of every step
+        speeds = []
+        for pos in range(len(step_list)):
             speed = mid_pump_speed
 
-            if pos == 0:
-                # First step, src pump
-                if self.graph[src]['class'] == 'ChemputerPump':
-                    speed = mid_pump_speed
-                # First step, src not pump
-                else:
-                    speed = initial_pump_speed
+            # First step, src not pump
+            if pos == 0 and self.graph[src]['class'] != 'ChemputerPump':
+                speed = initial_pump_speed
 
             # Last step
             if pos == len(step_list) - 1:
@@ -1369,83 +2134,150 @@ class PumpExecutioner(object):
                 if self.graph[dest]['class'] == 'ChemputerPump':
                     speed = initial_pump_speed
 
-            # Start pumping again if the first 2 steps are cleared
-            # and only if the volume is greater than the max volume
-            if pos > 0 and pos == 2 and volume > 0:
-                # Subtract vol for every overlapped movement
-                next_step_list = self.pipeline_step_list(
-                    src,
-                    dest,
-                    step_list,
-                    volume,
-                    initial_pump_speed,
-                    mid_pump_speed,
-                    end_pump_speed
-                )
-                recursive = True
-                for i in range(len(next_step_list)):
-                    actual_i = pipeline_pos + i
-                    while actual_i >= len(pipelined_step_list):
-                        pipelined_step_list.append([])
-                    pipelined_step_list[actual_i].extend(next_step_list[i])
-
-            step.speed = speed
-            step.volume = vol
-
-            devices, cmds = self.execute_step(step, vol, speed)
-            for device_group, cmd_group in zip(devices, cmds):
-                if pipeline_pos >= len(pipelined_step_list):
-                    pipelined_step_list.append([])
-                for device, cmd in zip(device_group, cmd_group):
-                    pipelined_step_list[pipeline_pos].append((device, cmd))
-                pipeline_pos += 1
-
-        # If movement path is too short to be staggered, do recursive call here
-        # after end of path.
-        if not recursive and volume:
-            # Subtract vol for every overlapped movement
-            next_step_list = self.pipeline_step_list(
-                src,
-                dest,
+            speeds.append(speed)
+
+        # Volume of every chunk, no more than the max volume each
+        chunk_volumes = []
+        remaining = volume
+        while True:
+            vol = max_volume if remaining > max_volume else remaining
+            remaining -= vol
+            chunk_volumes.append(vol)
+            if not remaining:
+                break
+
+        # Step groups of every step of every chunk
+        chunks = []
+        for vol in chunk_volumes:
+            chunk = []
+            for step, speed in zip(step_list, speeds):
+                devices, cmds = self.execute_step(step, vol, speed)
+                chunk.append([
+                    list(zip(device_group, cmd_group))
+                    for device_group, cmd_group in zip(devices, cmds)
+                ])
+            chunks.append(chunk)
+        starts = self.schedule_chunks(chunks)
+        ends = [
+            chunk_starts[-1] + len(chunk[-1])
+            for chunk, chunk_starts in zip(chunks, starts)
+        ]
+
+        pipelined_step_list = [[] for _ in range(max(ends))]
+        # Commands of later chunks come first in shared step groups.
+        for i in reversed(range(len(chunks))):
+            for step, start in zip(chunks[i], starts[i]):
+                for j, step_group in enumerate(step):
+                    pipelined_step_list[start + j].extend(step_group)
+
+        if not trusted:
+            self.validate_pipelined_step_list(
                 step_list,
+                pipelined_step_list,
                 volume,
-                initial_pump_speed,
-                mid_pump_speed,
-                end_pump_speed
+                max_volume,
+                src,
+                dest,
+                ends[-1] - ends[0]
             )
-            for i in range(len(next_step_list)):
-                actual_i = pipeline_pos + i
-                while actual_i >= len(pipelined_step_list):
-                    pipelined_step_list.append([])
-                pipelined_step_list[actual_i].extend(next_step_list[i])
-
-        self.validate_pipelined_step_list(
-            step_list,
-            pipelined_step_list,
-            original_volume,
-            self.max_volume,
-            src,
-            dest
-        )
         return pipelined_step_list
 
+    def schedule_chunks(self, chunks, depth=None):
+        """Step group every step of every chunk starts at, pipelining the
+        chunks along the same path.
+
+        A pump and its valve are one resource, and so is every other node.
+        Chunks are scheduled in order, each of their steps as soon as the step
+        before it is done and every resource it uses is done with the chunks
+        before. A pump therefore takes the next chunk as soon as it has passed
+        the current one on, and a chunk waits in a pump until the pumps ahead
+        of it are free.
+
+        Args:
+            chunks (List[List[List[List[Tuple[Any, Dict]]]]]): Step groups of
+                every step of every chunk, all along the same path.
+            depth (Optional[int]): Most chunks on the path at once. Defaults
+                to `pipeline_depth`, None for as many as the pumps allow.
+
+        Returns:
+            List[List[int]]: Step group every step of every chunk starts at.
+        """
+        if depth is None:
+            depth = self.pipeline_depth
+
+        topology = self.graph.topology
+        step_resources = [
+            {
+                topology.pump_name(device.name) or device.name
+                for step_group in step for device, _ in step_group
+            }
+            for step in chunks[0]
+        ]
+
+        # Step group every resource is free from
+        free = {}
+        starts, ends = [], []
+        for i, chunk in enumerate(chunks):
+            time = ends[i - depth] if depth and i >= depth else 0
+            chunk_starts = []
+            for step, resources in zip(chunk, step_resources):
+                time = max([time] + [free.get(resource, 0)
+                                     for resource in resources])
+                chunk_starts.append(time)
+                time += len(step)
+                for resource in resources:
+                    free[resource] = time
+            starts.append(chunk_starts)
+            ends.append(time)
+        return starts
+
     def execute_pipelined_steps(
         self,
         pipelined_steps,
     ):
+        """Execute pipelined step list, either one step group at a time or as
+        a dependency graph in which every command only waits for earlier
+        commands on the same pump, valve or fluid path.
+
+        The wall time of the execution and the estimated duration with both
+        executors are logged and kept in `execution_times`.
+
+        Args:
+            pipelined_steps (List[List[Tuple[ChemputerDevice, Dict]]]):
+                Pipelined step list to execute.
+        """
+        dag = StepDAG(pipelined_steps, self.graph.topology)
+
+        start_time = time.time()
+        if self.lockstep:
+            self.execute_lockstep(pipelined_steps)
+        else:
+            dag.execute(self.execute_cmd_group)
+        wall_time = time.time() - start_time
+
+        self.execution_times = {
+            'executor': 'lockstep' if self.lockstep else 'dag',
+            'wall_time': wall_time,
+            'dag_estimate': dag.duration(self.cmd_duration),
+            'lockstep_estimate': lockstep_duration(
+                pipelined_steps, self.cmd_duration),
+        }
+        self.logger.info(
+            f'Executed {len(pipelined_steps)} step groups in {wall_time:.1f} s\
+ ({self.execution_times["executor"]}). Estimated duration: DAG\
+ {self.execution_times["dag_estimate"]:.1f} s, lockstep\
+ {self.execution_times["lockstep_estimate"]:.1f} s.')
+
+    def execute_lockstep(self, pipelined_steps):
+        """Execute pipelined step list one step group at a time, waiting for
+        every command in a group to finish before starting the next group.
+        """
         for step_group in pipelined_steps:
             # Blank log to separate command groups in log.
             self.logger.debug('')
-            devices = []
 
-            # Execute all commands in group
-            for device, cmd in step_group:
-                self.execute_cmd(device, cmd)
-                devices.append(device)
-
-            # Wait until all commands have finished executing
-            for device in devices:
-                device.wait_until_ready()
+            # Send all commands in group, then wait until all have finished
+            self.execute_cmd_group(step_group).result()
 
     def execute_cmd(self, device, cmd):
         """Execute command and log message at same time.
@@ -1455,6 +2287,26 @@ class PumpExecutioner(object):
                 for executing command.
             cmd (Dict[str, Any]): Command to execute.
         """
+        self.log_cmd(device, cmd)
+        device.execute(**cmd)
+
+    def execute_cmd_group(self, commands):
+        """Log and send commands to different devices all at once.
+
+        Args:
+            commands (List[Tuple[ChemputerDevice, Dict[str, Any]]]): Commands
+                to execute, at most one per device.
+
+        Returns:
+            CommandGroup: Handle finishing once every device has finished its
+                command.
+        """
+        for device, cmd in commands:
+            self.log_cmd(device, cmd)
+        return execute_group(commands)
+
+    def log_cmd(self, device, cmd):
+        """Log message describing command."""
         if cmd["cmd"][0] == "sink":
             self.logger.debug(
                 f"Pumping {cmd['volume']} mL (Speed: {cmd['speed']})\
@@ -1470,8 +2322,6 @@ class PumpExecutioner(object):
                 f"Switched valve {device.name} routing {cmd['cmd'][1]} to\
  {cmd['cmd'][2]}")
 
-        device.execute(**cmd)
-
     def execute_step(
         self,
         step: list,
@@ -1538,8 +2388,7 @@ class PumpExecutioner(object):
         return devices, cmds
 
     def connect_valve_cmd(self, valve, src_port, dest_port):
-        if (("route", src_port, dest_port)
-                in self.graph[valve]["obj"].capabilities):
+        if self.graph.node_can_route(valve, (src_port, dest_port)):
             return {"cmd": ("route", src_port, dest_port)}
 
         else:
@@ -1630,3 +2479,391 @@ class PumpExecutioner(object):
         ]
 
         return devices, cmds
+
+
+class CompiledPath(object):
+    """Volume independent part of pipelining a path, see
+    `PumpExecutioner.compile_path`.
+
+    Args:
+        src (str): Source node of the path.
+        dest (str): Destination node of the path.
+        path (List[ChempilerPathStep]): Path with pump ends removed.
+        steps (List[ChempilerPathStep]): Pruned pump steps of path.
+        route_cmds (List[Tuple[Any, Dict[str, Any]]]): Commands switching
+            routing valves without pumps, sent with the first step group.
+        max_volume (float): Smallest syringe on the path.
+    """
+    __slots__ = ("src", "dest", "path", "steps", "route_cmds", "max_volume")
+
+    def __init__(self, src, dest, path, steps, route_cmds, max_volume):
+        self.src = src
+        self.dest = dest
+        self.path = path
+        self.steps = steps
+        self.route_cmds = route_cmds
+        self.max_volume = max_volume
+
+
+class PreparedMove(object):
+    """Move from src to dest whose path has been found and compiled once, see
+    `PumpExecutioner.prepare_move`. Only the volume dependent chunking is
+    done every time the move is run.
+
+    Args:
+        executioner (PumpExecutioner): Executioner that prepared the move.
+        src (str): Source node.
+        dest (str): Destination node.
+        src_port (Union[int, str]): Source port.
+        dest_port (Union[int, str]): Destination port.
+        paths (List[Optional[CompiledPath]]): Compiled paths, one for every
+            part of a path split at loops.
+        initial_pump_speed (float): Speed to pull in liquid @ start
+        mid_pump_speed (float): Speed to move liquid in the middle
+        end_pump_speed (float): Speed to dispense liquid @ end
+        through_nodes (Union[str, List]): Nodes to pass through.
+        use_backbone (bool): Whether the path was found using the backbone.
+        alternatives (List[List[Optional[CompiledPath]]]): Paths through
+            larger syringes, used instead of paths for volumes they move in
+            fewer strokes.
+        parallel_paths (Optional[List[CompiledPath]]): Route sharing no
+            pumps or valves with paths. Volumes are split across both routes
+            if that is estimated to be faster.
+    """
+    def __init__(
+        self,
+        executioner,
+        src,
+        dest,
+        src_port,
+        dest_port,
+        paths,
+        initial_pump_speed,
+        mid_pump_speed,
+        end_pump_speed,
+        through_nodes,
+        use_backbone,
+        alternatives=(),
+        parallel_paths=None
+    ):
+        self.executioner = executioner
+        self.src = src
+        self.dest = dest
+        self.src_port = src_port
+        self.dest_port = dest_port
+        self.paths = paths
+        self.initial_pump_speed = initial_pump_speed
+        self.mid_pump_speed = mid_pump_speed
+        self.end_pump_speed = end_pump_speed
+        self.through_nodes = through_nodes
+        self.use_backbone = use_backbone
+        self.alternatives = list(alternatives)
+        self.parallel_paths = parallel_paths
+
+        # (id of paths, volume, pipeline depth) of pipelined step lists
+        # validated already. The pipeline only depends on these, so they are
+        # trusted next time.
+        self._validated = set()
+
+        # (volume, pipeline depth): (volume along paths, along parallel_paths)
+        self._splits = {}
+
+        # (volume, pipeline depth): (topology, plan), least recently used
+        # first. Plans refer to nodes by topology id, so they are only used
+        # with the topology they were made for.
+        self._plans = OrderedDict()
+
+    def paths_for(self, volume: float) -> List[Optional[CompiledPath]]:
+        """Compiled paths taking the fewest strokes to move volume, the
+        default paths if no alternative takes fewer.
+
+        Args:
+            volume (float): Volume to move.
+
+        Returns:
+            List[Optional[CompiledPath]]: Compiled paths.
+        """
+        best = self.paths
+        best_strokes = math.ceil(
+            volume / self.executioner.chunk_volume(best))
+        for paths in self.alternatives:
+            strokes = math.ceil(
+                volume / self.executioner.chunk_volume(paths))
+            if strokes < best_strokes:
+                best, best_strokes = paths, strokes
+        return best
+
+    def pipeline_paths(
+        self,
+        paths: List[Optional[CompiledPath]],
+        volume: float
+    ) -> List[List[Tuple[Any, Dict]]]:
+        """Pipelined step list moving volume along paths.
+
+        Args:
+            paths (List[Optional[CompiledPath]]): Compiled paths.
+            volume (float): Volume to move.
+
+        Returns:
+            List[List[Tuple[Any, Dict]]]: Pipelined step list.
+        """
+        executioner = self.executioner
+        key = (id(paths), volume, executioner.pipeline_depth)
+        trusted = key in self._validated
+        speeds = (
+            self.initial_pump_speed, self.mid_pump_speed, self.end_pump_speed)
+
+        pipelined_steps = []
+
+        # Alternative paths
+        if len(paths) > 1:
+            vol_added = 0
+            pump_max_volume = executioner.chunk_volume(paths)
+
+            # Nodes used by every step group of pipelined_steps
+            occupancy = []
+            while vol_added < volume:
+                vol_to_add = min(pump_max_volume, volume - vol_added)
+                new_pipelined_steps = []
+                for compiled_path in paths:
+                    new_pipelined_steps += executioner.pipeline_compiled_path(
+                        compiled_path, vol_to_add, *speeds, trusted=trusted)
+                new_occupancy = [
+                    executioner.group_occupancy(step_group)
+                    for step_group in new_pipelined_steps
+                ]
+
+                # Get most efficient offset
+                offset = executioner.find_insert_offset(
+                    occupancy, new_occupancy)
+
+                # Add pipelined steps at offset
+                occupancy = executioner.insert_occupancy(
+                    occupancy, new_occupancy, offset)
+                pipelined_steps = executioner.insert_steps(
+                    pipelined_steps, new_pipelined_steps, offset)
+                vol_added += vol_to_add
+
+        else:
+            pipelined_steps.extend(executioner.pipeline_compiled_path(
+                paths[0], volume, *speeds, trusted=trusted))
+
+        self._validated.add(key)
+        return pipelined_steps
+
+    def plan(self, volume: float) -> Plan:
+        """Plan moving volume, split across both routes if there is a
+        parallel route and that is estimated to be faster. The last
+        `PLAN_CACHE_SIZE` plans are cached, so running the move again with
+        the same volume doesn't chunk it again.
+
+        Args:
+            volume (float): Volume to move.
+
+        Returns:
+            Plan: Immutable, hashable plan.
+        """
+        executioner = self.executioner
+        topology = executioner.graph.topology
+        key = (volume, executioner.pipeline_depth)
+        cached = self._plans.get(key)
+        if cached is not None and cached[0] is topology:
+            self._plans.move_to_end(key)
+            return cached[1]
+
+        plan = compact_plan(
+            self.pipeline_split(*self.split(volume)), topology)
+        self._plans[key] = (topology, plan)
+        self._plans.move_to_end(key)
+        while len(self._plans) > constants.PLAN_CACHE_SIZE:
+            self._plans.popitem(last=False)
+        return plan
+
+    def pipeline(self, volume: float) -> List[List[Tuple[Any, Dict]]]:
+        """Pipelined step list moving volume, expanded from `plan`.
+
+        Args:
+            volume (float): Volume to move.
+
+        Returns:
+            List[List[Tuple[Any, Dict]]]: Pipelined step list.
+        """
+        return expand_plan(self.plan(volume), self.executioner.graph)
+
+    def pipeline_split(
+        self,
+        volume: float,
+        parallel_volume: float
+    ) -> List[List[Tuple[Any, Dict]]]:
+        """Pipelined step list moving volume along the default route and
+        parallel_volume along the parallel route at the same time.
+
+        Args:
+            volume (float): Volume to move along the default route.
+            parallel_volume (float): Volume to move along parallel_paths.
+
+        Returns:
+            List[List[Tuple[Any, Dict]]]: Pipelined step list.
+        """
+        if not parallel_volume:
+            return self.pipeline_paths(self.paths_for(volume), volume)
+        parallel_steps = self.pipeline_paths(
+            self.parallel_paths, parallel_volume)
+        if not volume:
+            return parallel_steps
+
+        # The routes share no nodes, so their step groups can be merged.
+        pipelined_steps = [
+            step_group + parallel_group
+            for step_group, parallel_group in zip_longest(
+                self.pipeline_paths(self.paths, volume), parallel_steps,
+                fillvalue=[])
+        ]
+        self.executioner.validate_one_command_per_group_per_node(
+            pipelined_steps)
+        return pipelined_steps
+
+    def split(self, volume: float) -> Tuple[float, float]:
+        """Split of volume across the default and the parallel route with the
+        shortest estimated duration. Only volumes filling whole strokes on
+        one of the routes are tried.
+
+        Args:
+            volume (float): Volume to move.
+
+        Returns:
+            Tuple[float, float]: Volume to move along the default route and
+                along the parallel route.
+        """
+        if not self.parallel_paths or volume <= 0:
+            return volume, 0
+        executioner = self.executioner
+        key = (volume, executioner.pipeline_depth)
+        if key in self._splits:
+            return self._splits[key]
+
+        chunk_volume = executioner.chunk_volume(self.paths)
+        parallel_chunk_volume = executioner.chunk_volume(self.parallel_paths)
+        candidates = [volume]
+        for i in range(1, math.ceil(volume / chunk_volume)):
+            candidates.append(i * chunk_volume)
+        for i in range(1, math.ceil(volume / parallel_chunk_volume) + 1):
+            candidates.append(max(volume - i * parallel_chunk_volume, 0))
+
+        best, best_duration = None, None
+        for candidate in dict.fromkeys(candidates):
+            split = (candidate, volume - candidate)
+            duration = lockstep_duration(
+                self.pipeline_split(*split), executioner.cmd_duration)
+            if best is None or duration < best_duration:
+                best, best_duration = split, duration
+
+        self._splits[key] = best
+        return best
+
+    def run(self, volume: float) -> List[List[Tuple[Any, Dict]]]:
+        """Moves volume from src to dest.
+
+        Args:
+            volume (float): Volume to move.
+
+        Returns:
+            List[List[Tuple[Any, Dict]]]: Pipelined step list executed.
+        """
+        executioner = self.executioner
+        graph = executioner.graph
+        src, dest = self.src, self.dest
+        if volume <= 0:
+            executioner.logger.info(
+                f'Trying to move volume <= 0 ({volume}). Not doing anything...')
+            return
+
+        executioner.check_move_volume(src, dest, volume)
+
+        pipelined_steps = self.pipeline(volume)
+
+        executioner.print_pipelined_step_list(pipelined_steps)
+
+        executioner.logger.info(executioner.move_log_message(
+            volume=volume, src=src, dest=dest, src_port=self.src_port,
+            dest_port=self.dest_port,
+            initial_pump_speed=self.initial_pump_speed,
+            mid_pump_speed=self.mid_pump_speed,
+            end_pump_speed=self.end_pump_speed,
+            through_nodes=self.through_nodes, use_backbone=self.use_backbone
+        ))
+
+        executioner.execute_pipelined_steps(pipelined_steps)
+        graph[src]['current_volume'] -= volume
+        if graph[src]['current_volume'] < 0:
+            executioner.logger.warning(
+                f'Negative flask volume: {src}\
+ {graph[src]["current_volume"]} mL. Setting to 0.')
+            graph[src]['current_volume'] = 0
+        graph[dest]['current_volume'] += volume
+        return pipelined_steps
+
+    def duration(self, volume: float) -> float:
+        """Estimated duration of moving volume, executing one step group at a
+        time.
+
+        Args:
+            volume (float): Volume to move.
+
+        Returns:
+            float: Estimated duration in seconds.
+        """
+        if volume <= 0:
+            return 0
+        return lockstep_duration(
+            self.pipeline(volume), self.executioner.cmd_duration)
+
+    def locks(self, volume: Optional[float] = None):
+        """Nodes to lock while the move is running.
+
+        Args:
+            volume (Optional[float]): Volume to move, if it is known. Only
+                needed to tell which paths are taken if there are
+                alternatives or a parallel route.
+
+        Returns:
+            Tuple[List[str], List[str], List[str]]: Nodes locked during the
+                move, nodes still locked afterwards and nodes unlocked
+                afterwards. None if there is no path.
+        """
+        executioner = self.executioner
+        if volume is None:
+            routes = [self.paths]
+            if self.parallel_paths:
+                routes.append(self.parallel_paths)
+        else:
+            volume, parallel_volume = self.split(volume)
+            routes = []
+            if volume:
+                routes.append(
+                    self.paths if parallel_volume else self.paths_for(volume))
+            if parallel_volume:
+                routes.append(self.parallel_paths)
+        paths = [compiled_path for route in routes for compiled_path in route]
+        locks = []
+        for compiled_path in paths:
+            if compiled_path is None:
+                executioner.logger.info(
+                    f"No valid path found for {self.src} -- {self.dest}")
+                return
+            path = compiled_path.path
+            for i, step in enumerate(path):
+                if i == len(path) - 1:
+                    locks.append(step.src)
+                else:
+                    locks.extend([step.src, step.dest])
+                pump_src = executioner.get_pump_from_valve_name(step.src)
+                pump_dest = executioner.get_pump_from_valve_name(step.dest)
+                if pump_src:
+                    locks.append(pump_src.name)
+                if pump_dest:
+                    locks.append(pump_dest.name)
+        locks = list(set(locks))
+        ongoing_locks = [paths[-1].path[-1].dest]
+        unlocks = []
+        return locks, ongoing_locks, unlocks
@@ -9,6 +9,8 @@ just wrapping the original class methods.
 import logging
 from time import sleep
 
+from SerialLabware import gather
+
 from chempiler.tools.constants import COOLING_THRESHOLD
 
 
@@ -204,6 +206,35 @@ class StirrerExecutioner(object):
         heater_obj.temperature_sp = temp
         self.logger.info("Done.")
 
+    def set_temps(self, temps):
+        """
+        Sets the temperatures of several stirrer plates at once. Heaters that
+        can submit commands without waiting for them (see
+        `SerialLabware.serial_labware.SerialDevice.submit`) are all sent their
+        setpoint before waiting for any reply.
+
+        Args:
+            temps (Dict[str, float]): Temperature to set for every stirrer
+
+        Raises:
+            Empty: A heater didn't reply within its reply_timeout. Setpoints
+                still queued are cancelled.
+        """
+        replies = []
+        timeout = 0
+        for node_name, temp in temps.items():
+            self.logger.info(
+                "Setting temperature for hotplate {0} to {1}°C...".format(
+                    node_name, temp))
+            heater_obj = self._get_heater_object(node_name)
+            if hasattr(heater_obj, "submit"):
+                replies.append(heater_obj.submit("temperature_sp", temp))
+                timeout = max(timeout, heater_obj.reply_timeout)
+            else:
+                heater_obj.temperature_sp = temp
+        gather(*replies, timeout=timeout)
+        self.logger.info("Done.")
+
     def set_stir_rate(self, node_name, stir_rate):
         """
         Sets the stirring rate of the stirrer
@@ -0,0 +1,410 @@
+"""
+(c) 2019 The Cronin Group, University of Glasgow
+
+Port-aware path search over the Chemputer graph. Instead of enumerating every
+simple path between two nodes and filtering the results afterwards, the search
+walks (node, port) states and applies the valve routing rule, the source and
+destination port constraints and the pump requirement while it searches.
+
+The search works in two stages:
+
+1. A breadth-first sweep backwards from the destination over
+   (node, in_port, pumped) states computes the minimum number of steps needed
+   to reach the destination from every state. This ignores the simple path
+   constraint so it is a lower bound on the true remaining path length. These
+   bounds only depend on the destination side of the query so they are cached
+   and shared by every query ending at the same destination. Nodes a query
+   avoids are ignored here, which only makes the bounds looser.
+2. A depth-first search in the same node order `nx.all_simple_paths` uses,
+   bounded by that lower bound (IDA*). Only steps that can still lie on a
+   shortest valid path are expanded, so the first path found is the first
+   shortest valid path the exhaustive enumeration would have produced.
+
+Parallel edges between two nodes are expanded exactly the way
+`ChempilerGraph.get_full_paths` expands them, so paths found here are identical
+to those found by enumerating and filtering every simple path.
+"""
+
+from collections import deque
+from typing import Callable, Dict, FrozenSet, List, Optional, Tuple, Union
+
+INF = float("inf")
+
+# (src, dest, (src_port, dest_port))
+Edge = Tuple[str, str, Tuple[Union[int, str], Union[int, str]]]
+
+NodePredicate = Optional[Callable[[str], bool]]
+
+
+class PathQuery:
+    """Parameters of a single path search.
+
+    Args:
+        src (str): Source node.
+        dest (str): Destination node.
+        src_port (Union[int, str]): Port the path must leave src from. Falsy
+            values mean any port.
+        dest_port (Union[int, str]): Port the path must arrive at dest on.
+            Falsy values mean any port.
+        connect (bool): True if just connecting valves, not moving liquid.
+        partial_path (bool): True if the path is part of a larger path, in
+            which case it doesn't need to pass a valve with a pump attached.
+        first_pred (Callable[[str], bool]): Optional predicate the second node
+            of the path must satisfy.
+        last_pred (Callable[[str], bool]): Optional predicate the second to
+            last node of the path must satisfy.
+        avoid (FrozenSet[str]): Nodes the path must not pass through.
+    """
+    def __init__(
+        self,
+        src: str,
+        dest: str,
+        src_port: Optional[Union[int, str]] = None,
+        dest_port: Optional[Union[int, str]] = None,
+        connect: bool = False,
+        partial_path: bool = False,
+        first_pred: NodePredicate = None,
+        last_pred: NodePredicate = None,
+        avoid: FrozenSet[str] = frozenset(),
+    ) -> None:
+        self.src = src
+        self.dest = dest
+        self.src_port = src_port
+        self.dest_port = dest_port
+        self.connect = connect
+        self.require_pump = not partial_path and not connect
+        self.first_pred = first_pred
+        self.last_pred = last_pred
+        self.avoid = avoid
+
+
+class PortStateSearch:
+    """Search for valid movement paths between nodes of a ChempilerGraph.
+
+    Adjacency, pump and routing information is read from the graph once when
+    the search is created, so a new search must be created if the graph
+    changes.
+
+    Args:
+        graph (ChempilerGraph): Graph to search.
+    """
+    def __init__(self, graph) -> None:
+        self.graph = graph
+
+        # node: [(neighbor, [ports, ...]), ...] in adjacency order, with the
+        # ports of parallel edges in the order `edges.data()` yields them.
+        # Edges without ports (e.g. stirrer -> flask) can't carry liquid and
+        # are left out.
+        self.successors = {}
+        # (node, in_port): [(predecessor, out_port), ...]
+        self.predecessors = {}
+        # node: [in_port, ...]
+        self.in_ports = {}
+        # node: True if a pump is attached to node
+        self.has_pump = {}
+        # node: {(in_port, out_port), ...} for routing valves, else None
+        self.routes = {}
+
+        # Number of port variants `get_full_paths` can generate for one simple
+        # path, i.e. the largest number of parallel edges between two nodes.
+        self.n_variants = 1
+
+        # Cached lower bounds, see `lower_bounds`.
+        self._bounds = {}
+
+        in_ports = {node: set() for node in graph.graph}
+        for node, neighbors in graph.graph.adj.items():
+            successors = []
+            for neighbor, keys in neighbors.items():
+                port_list = [
+                    data["port"] for data in keys.values() if "port" in data]
+                if not port_list:
+                    continue
+                successors.append((neighbor, port_list))
+                self.n_variants = max(self.n_variants, len(port_list))
+                for out_port, in_port in port_list:
+                    in_ports[neighbor].add(in_port)
+                    self.predecessors.setdefault(
+                        (neighbor, in_port), []).append((node, out_port))
+            self.successors[node] = successors
+
+            self.has_pump[node] = bool(graph.topology.pump_name(node))
+            if graph.node_can_route(node):
+                self.routes[node] = graph.topology.routes[
+                    graph.topology.ids[node]]
+            else:
+                self.routes[node] = None
+
+        self.in_ports = {
+            node: list(ports) for node, ports in in_ports.items()}
+
+    ###############
+    # Node lookup #
+    ###############
+
+    def constrained(self, node: str, connect: bool) -> bool:
+        """True if routing through node must use one of its route
+        capabilities, i.e. it is a routing valve (or a valve being connected).
+        """
+        return (
+            self.routes[node] is not None
+            and (connect or not self.has_pump[node]))
+
+    def can_route(
+        self,
+        node: str,
+        in_port: Union[int, str],
+        out_port: Union[int, str],
+        connect: bool,
+    ) -> bool:
+        """True if liquid can pass through node from in_port to out_port."""
+        return (
+            not self.constrained(node, connect)
+            or (in_port, out_port) in self.routes[node])
+
+    def can_step(
+        self,
+        query: PathQuery,
+        node: str,
+        in_port: Union[int, str],
+        neighbor: str,
+        ports: Tuple,
+    ) -> bool:
+        """Check if the edge node -> neighbor with the given ports can be taken
+        having arrived at node on in_port.
+        """
+        out_port, next_in_port = ports
+        if neighbor == query.src or node == query.dest:
+            return False
+        if neighbor in query.avoid:
+            return False
+
+        if node == query.src:
+            if query.src_port and out_port != query.src_port:
+                return False
+            if query.first_pred and not query.first_pred(neighbor):
+                return False
+
+        elif not self.can_route(node, in_port, out_port, query.connect):
+            return False
+
+        if neighbor == query.dest:
+            if query.last_pred and not query.last_pred(node):
+                return False
+            if query.dest_port and next_in_port != query.dest_port:
+                return False
+        return True
+
+    ##############
+    # Heuristics #
+    ##############
+
+    def lower_bounds(
+        self,
+        dest: str,
+        dest_port: Optional[Union[int, str]] = None,
+        connect: bool = False,
+        require_pump: bool = True,
+        last_pred: NodePredicate = None,
+    ) -> Dict[Tuple, int]:
+        """Minimum number of steps from every (node, in_port, pumped) state to
+        dest, ignoring the simple path constraint and the source of the path.
+        pumped is True if a pump has been passed before leaving node.
+        """
+        key = (dest, dest_port, connect, require_pump, last_pred)
+        if key in self._bounds:
+            return self._bounds[key]
+
+        bounds = {}
+        queue = deque()
+
+        def add_predecessors(node, in_port, pumped, steps):
+            for prev_node, out_port in self.predecessors.get(
+                    (node, in_port), []):
+                if prev_node == dest:
+                    continue
+                if steps == 1 and last_pred and not last_pred(prev_node):
+                    continue
+                has_pump = self.has_pump[prev_node]
+                for prev_in_port in self.in_ports[prev_node]:
+                    if not self.can_route(
+                            prev_node, prev_in_port, out_port, connect):
+                        continue
+                    for prev_pumped in (False, True):
+                        if steps == 1:
+                            if require_pump and not (prev_pumped or has_pump):
+                                continue
+                        elif (prev_pumped or has_pump) != pumped:
+                            continue
+                        state = (prev_node, prev_in_port, prev_pumped)
+                        if state not in bounds:
+                            bounds[state] = steps
+                            queue.append(state)
+
+        for in_port in self.in_ports[dest]:
+            if not dest_port or in_port == dest_port:
+                add_predecessors(dest, in_port, None, 1)
+
+        while queue:
+            node, in_port, pumped = state = queue.popleft()
+            add_predecessors(node, in_port, pumped, bounds[state] + 1)
+
+        self._bounds[key] = bounds
+        return bounds
+
+    def root_bound(self, query: PathQuery, bounds: Dict[Tuple, int]) -> int:
+        """Lower bound on the length of any valid path for query."""
+        root_bound = INF
+        for neighbor, port_list in self.successors[query.src]:
+            for ports in port_list:
+                if not self.can_step(query, query.src, None, neighbor, ports):
+                    continue
+                if neighbor == query.dest:
+                    if not query.require_pump:
+                        return 1
+                    continue
+                root_bound = min(
+                    root_bound,
+                    1 + bounds.get((neighbor, ports[1], False), INF))
+        return root_bound
+
+    ##########
+    # Search #
+    ##########
+
+    def find(
+        self,
+        query: PathQuery,
+        count: bool = False,
+    ) -> Tuple[Optional[List[Edge]], int]:
+        """Find the shortest valid path, taking the one `all_simple_paths`
+        followed by `get_full_paths` would have generated first if there is a
+        tie.
+
+        Args:
+            query (PathQuery): Path to search for.
+            count (bool): If True, also count the shortest valid paths
+                (including duplicates generated by parallel edges). Counting
+                stops at 2.
+
+        Returns:
+            Tuple[Optional[List[Edge]], int]: Shortest path as list of
+                (src, dest, (src_port, dest_port)) tuples, or None if there is
+                no valid path, and the number of shortest paths found.
+        """
+        if query.src == query.dest:
+            return None, 0
+
+        bounds = self.lower_bounds(
+            query.dest, query.dest_port, query.connect, query.require_pump,
+            query.last_pred)
+        root_bound = self.root_bound(query, bounds)
+        if root_bound == INF:
+            return None, 0
+
+        max_len = len(self.successors) - 1
+        for bound in range(root_bound, max_len + 1):
+            result = {"path": None, "count": 0}
+            self._bounded_search(
+                query=query,
+                node=query.src,
+                in_ports=(None,) * self.n_variants,
+                pumped=False,
+                visited={query.src},
+                steps=[],
+                multiplicity=1,
+                bound=bound,
+                bounds=bounds,
+                count=count,
+                result=result,
+            )
+            if result["path"]:
+                return result["path"], result["count"]
+        return None, 0
+
+    def _bounded_search(
+        self,
+        query,
+        node,
+        in_ports,
+        pumped,
+        visited,
+        steps,
+        multiplicity,
+        bound,
+        bounds,
+        count,
+        result,
+    ) -> bool:
+        """Depth first search for valid paths no longer than bound. Returns
+        True when the search can stop.
+
+        in_ports holds the port node was entered on for every port variant
+        `get_full_paths` could generate, or None if that variant is invalid.
+        """
+        at_src = node == query.src
+        next_pumped = pumped or (not at_src and self.has_pump[node])
+        depth = len(steps) + 1
+
+        for neighbor, port_list in self.successors[node]:
+            if neighbor in visited:
+                continue
+
+            n_ports = len(port_list)
+            next_in_ports = []
+            for variant, in_port in enumerate(in_ports):
+                ports = port_list[max(n_ports - 1 - variant, 0)]
+                if in_port is not None or at_src:
+                    if self.can_step(query, node, in_port, neighbor, ports):
+                        next_in_ports.append(ports[1])
+                        continue
+                next_in_ports.append(None)
+
+            if all(port is None for port in next_in_ports):
+                continue
+
+            next_steps = steps + [(node, neighbor, port_list)]
+            next_multiplicity = multiplicity * n_ports
+
+            if neighbor == query.dest:
+                if query.require_pump and not next_pumped:
+                    continue
+                if self._record(
+                        next_steps, next_in_ports, next_multiplicity, count,
+                        result):
+                    return True
+                continue
+
+            lower_bound = min(
+                bounds.get((neighbor, port, next_pumped), INF)
+                for port in next_in_ports if port is not None)
+            if depth + lower_bound > bound:
+                continue
+
+            visited.add(neighbor)
+            done = self._bounded_search(
+                query, neighbor, tuple(next_in_ports), next_pumped, visited,
+                next_steps, next_multiplicity, bound, bounds, count, result)
+            visited.remove(neighbor)
+            if done:
+                return True
+        return False
+
+    def _record(self, steps, in_ports, multiplicity, count, result) -> bool:
+        """Record a complete path. Returns True when the search can stop."""
+        # Variants beyond the largest number of parallel edges in this path
+        # all collapse onto the last variant.
+        n_path_variants = max(len(port_list) for _, _, port_list in steps)
+        valid_variants = sorted({
+            min(variant, n_path_variants - 1)
+            for variant, port in enumerate(in_ports) if port is not None
+        })
+
+        if result["path"] is None:
+            variant = valid_variants[0]
+            result["path"] = [
+                (src, dest, port_list[max(len(port_list) - 1 - variant, 0)])
+                for src, dest, port_list in steps
+            ]
+        result["count"] += multiplicity * len(valid_variants)
+        return not count or result["count"] > 1
@@ -0,0 +1,140 @@
+"""
+(c) 2019 The Cronin Group, University of Glasgow
+
+Compact, immutable pipelined step lists. A pipelined step list as executed is
+a list of step groups of (device object, command dict) tuples, which can't be
+hashed, and pickling it drags the device objects along. A `Plan` holds the
+same commands as `PlanCommand` records referring to nodes by their id in the
+`CompiledTopology`, so it can be hashed, cached and serialised cheaply, and
+expanded back into a pipelined step list for the graph it was made for.
+`PreparedMove` keeps the plans of the volumes it was last run with.
+"""
+
+from typing import Any, Dict, List, Optional, Tuple
+
+from .topology import CompiledTopology
+
+
+class PlanCommand:
+    """Command given to a node in a step group.
+
+    Args:
+        node (int): Id of the node in the topology.
+        cmd (Tuple): Command, e.g. ('route', 0, -1) or ('sink', 0).
+        volume (Optional[float]): Volume to move, for pump commands.
+        speed (Optional[float]): Speed to move at, for pump commands.
+    """
+    __slots__ = ("node", "cmd", "volume", "speed")
+
+    def __init__(
+        self,
+        node: int,
+        cmd: Tuple,
+        volume: Optional[float] = None,
+        speed: Optional[float] = None
+    ) -> None:
+        object.__setattr__(self, "node", node)
+        object.__setattr__(self, "cmd", tuple(cmd))
+        object.__setattr__(self, "volume", volume)
+        object.__setattr__(self, "speed", speed)
+
+    @classmethod
+    def from_command(
+        cls,
+        topology: CompiledTopology,
+        device: Any,
+        command: Dict[str, Any]
+    ) -> "PlanCommand":
+        """Record of a (device, command) tuple from a pipelined step list.
+
+        Raises:
+            KeyError: command has keys other than cmd, volume and speed.
+        """
+        unknown = set(command) - {"cmd", "volume", "speed"}
+        if unknown:
+            raise KeyError(f"Unknown command keys {sorted(unknown)}")
+        return cls(
+            topology.ids[device.name],
+            command["cmd"],
+            command.get("volume"),
+            command.get("speed"),
+        )
+
+    def command(self) -> Dict[str, Any]:
+        """Command dict as passed to the device's execute method."""
+        command = {"cmd": self.cmd}
+        if self.volume is not None:
+            command["volume"] = self.volume
+        if self.speed is not None:
+            command["speed"] = self.speed
+        return command
+
+    def as_tuple(self) -> Tuple:
+        return (self.node, self.cmd, self.volume, self.speed)
+
+    def __setattr__(self, name, value):
+        raise AttributeError(f"{type(self).__name__} is immutable")
+
+    def __delattr__(self, name):
+        raise AttributeError(f"{type(self).__name__} is immutable")
+
+    def __eq__(self, other):
+        if not isinstance(other, PlanCommand):
+            return NotImplemented
+        return self.as_tuple() == other.as_tuple()
+
+    def __hash__(self):
+        return hash(self.as_tuple())
+
+    def __reduce__(self):
+        return (PlanCommand, self.as_tuple())
+
+    def __repr__(self):
+        return f"PlanCommand{self.as_tuple()}"
+
+
+# Step groups of PlanCommands
+Plan = Tuple[Tuple[PlanCommand, ...], ...]
+
+
+def compact_plan(
+    pipelined_steps: List[List[Tuple[Any, Dict[str, Any]]]],
+    topology: CompiledTopology
+) -> Plan:
+    """Plan with the same commands as pipelined_steps.
+
+    Args:
+        pipelined_steps (List[List[Tuple[Any, Dict[str, Any]]]]): Pipelined
+            step list.
+        topology (CompiledTopology): Topology of the graph the device objects
+            belong to.
+
+    Returns:
+        Plan: Immutable, hashable plan.
+    """
+    return tuple(
+        tuple(
+            PlanCommand.from_command(topology, device, command)
+            for device, command in step_group
+        )
+        for step_group in pipelined_steps
+    )
+
+
+def expand_plan(plan: Plan, graph: Any) -> List[List[Tuple[Any, Dict]]]:
+    """Pipelined step list with the commands of plan, with fresh command dicts
+    so the plan itself can't be changed through it.
+
+    Args:
+        plan (Plan): Plan made for graph.
+        graph (ChempilerGraph): Graph to look the device objects up in.
+
+    Returns:
+        List[List[Tuple[Any, Dict]]]: Pipelined step list.
+    """
+    names = graph.topology.names
+    return [
+        [(graph.obj(names[command.node]), command.command())
+         for command in step_group]
+        for step_group in plan
+    ]
@@ -0,0 +1,74 @@
+"""
+(c) 2019 The Cronin Group, University of Glasgow
+
+Bounded least recently used cache of paths found by `ChempilerGraph.find_path`.
+
+Paths are handed out as copies. Callers such as `PumpExecutioner.pipeline_path`
+pop steps off the paths they are given, which must not corrupt the cached
+path. The steps themselves are immutable, so they are shared.
+"""
+
+from collections import OrderedDict
+from typing import Any, Dict, Hashable, Optional
+
+
+def copy_path(path: list) -> list:
+    """Copy a path, or list of paths, sharing the immutable steps."""
+    return [
+        copy_path(step) if isinstance(step, list) else step
+        for step in path
+    ]
+
+
+class RouteCache:
+    """LRU cache mapping find_path arguments to paths.
+
+    Args:
+        maxsize (int): Maximum number of paths to keep. 0 disables caching.
+    """
+    def __init__(self, maxsize: int) -> None:
+        self.maxsize = maxsize
+        self.hits = 0
+        self.misses = 0
+        self._paths = OrderedDict()
+
+    def __len__(self) -> int:
+        return len(self._paths)
+
+    def get(self, key: Hashable) -> Optional[list]:
+        """Return a copy of the path cached for key, or None if there isn't
+        one.
+        """
+        path = self._paths.get(key)
+        if path is None:
+            self.misses += 1
+            return None
+
+        self.hits += 1
+        self._paths.move_to_end(key)
+        return copy_path(path)
+
+    def put(self, key: Hashable, path: list) -> None:
+        """Cache a copy of path under key, evicting the least recently used
+        path if the cache is full.
+        """
+        if self.maxsize <= 0:
+            return
+
+        self._paths[key] = copy_path(path)
+        self._paths.move_to_end(key)
+        while len(self._paths) > self.maxsize:
+            self._paths.popitem(last=False)
+
+    def clear(self) -> None:
+        """Drop every cached path. Hit and miss counters are kept."""
+        self._paths.clear()
+
+    def info(self) -> Dict[str, Any]:
+        """Return hit/miss counters and the current and maximum size."""
+        return {
+            "hits": self.hits,
+            "misses": self.misses,
+            "size": len(self._paths),
+            "maxsize": self.maxsize,
+        }
@@ -0,0 +1,213 @@
+"""
+(c) 2019 The Cronin Group, University of Glasgow
+
+Precomputed table of paths between every pair of flask-like nodes using their
+default ports, i.e. the paths `PumpExecutioner.move` asks for when no ports or
+through nodes are given.
+
+Paths are found across CPU cores with a process pool. Device objects can't be
+sent to other processes, so the workers search a copy of the graph in which
+every device object is replaced with a `CapabilityStub` carrying only its
+capabilities.
+
+Tables are cached on disk keyed by a hash of the graph file and the device
+classes of every node, so later runs on the same rig only have to load the
+table.
+"""
+
+import os
+import json
+import pickle
+import hashlib
+import logging
+from concurrent.futures import ProcessPoolExecutor
+from typing import Any, Dict, List, Optional, Tuple, Union
+
+import networkx as nx
+from networkx.exception import NetworkXNoPath
+
+from .topology import FLASK
+
+# Bump whenever the table format or path finding changes.
+ROUTE_TABLE_VERSION = 1
+
+# (src, dest, src_port, dest_port, use_backbone)
+RouteKey = Tuple[str, str, Any, Any, bool]
+
+# Path as nested tuples of ChempilerPathStep.as_tuple()
+StepTuples = Tuple
+
+logger = logging.getLogger("chempiler")
+
+
+class CapabilityStub:
+    """Stand in for a device object in route table worker processes.
+
+    Args:
+        name (str): Name of the node.
+        capabilities (List): Capabilities of the device object.
+    """
+    def __init__(self, name: str, capabilities: List) -> None:
+        self.name = name
+        self.capabilities = capabilities
+
+
+def graph_hash(
+    graph_file: Union[str, Dict[str, Any]],
+    graph: nx.MultiDiGraph
+) -> str:
+    """Hash of the graph file and the device class of every node.
+
+    Args:
+        graph_file (Union[str, Dict[str, Any]]): Graph file path or JSON node
+            link graph dict.
+        graph (nx.MultiDiGraph): Populated graph.
+
+    Returns:
+        str: Hex digest.
+    """
+    sha = hashlib.sha256()
+    sha.update(f"route_table:{ROUTE_TABLE_VERSION}\n".encode())
+    if isinstance(graph_file, dict):
+        sha.update(json.dumps(graph_file, sort_keys=True, default=str).encode())
+    else:
+        with open(graph_file, "rb") as f:
+            sha.update(f.read())
+
+    for node in sorted(graph):
+        cls = type(graph.nodes[node].get("obj"))
+        sha.update(f"{node}:{cls.__module__}.{cls.__qualname__}\n".encode())
+    return sha.hexdigest()
+
+
+def stub_graph(graph: nx.MultiDiGraph) -> nx.MultiDiGraph:
+    """Copy of graph with device objects replaced by CapabilityStubs."""
+    stub = nx.MultiDiGraph()
+    for node, attrs in graph.nodes(data=True):
+        node_attrs = {
+            key: value for key, value in attrs.items() if key != "obj"}
+        node_attrs["obj"] = CapabilityStub(
+            node, list(getattr(attrs.get("obj"), "capabilities", [])))
+        stub.add_node(node, **node_attrs)
+    for src, dest, key, data in graph.edges(keys=True, data=True):
+        stub.add_edge(src, dest, key=key, **data)
+    return stub
+
+
+def path_to_tuples(path: list) -> StepTuples:
+    """Convert a path, or list of paths, to nested tuples."""
+    return tuple(
+        path_to_tuples(step) if isinstance(step, list) else step.as_tuple()
+        for step in path
+    )
+
+
+###########
+# Workers #
+###########
+
+_worker_graph = None
+
+
+def _init_worker(graph: nx.MultiDiGraph) -> None:
+    global _worker_graph
+    from .graph import ChempilerGraph
+    _worker_graph = ChempilerGraph.from_sanitised(graph, logger)
+
+
+def _routes_from(src: str, dests: List[str]) -> Dict[RouteKey, StepTuples]:
+    """Find default port paths from src to every node in dests."""
+    graph = _worker_graph
+    routes = {}
+    src_port = graph.assign_default_port("src", src, "")
+    for dest in dests:
+        dest_port = graph.assign_default_port("dest", dest, "")
+        try:
+            path = graph.find_path(src, dest, src_port, dest_port)
+        except NetworkXNoPath:
+            continue
+        routes[(src, dest, src_port, dest_port, True)] = path_to_tuples(path)
+    return routes
+
+
+###############
+# Route table #
+###############
+
+def compute_route_table(
+    graph,
+    processes: Optional[int] = None
+) -> Dict[RouteKey, StepTuples]:
+    """Find default port paths between every pair of flask-like nodes.
+
+    Args:
+        graph (ChempilerGraph): Populated graph.
+        processes (int): Number of worker processes. Defaults to the number of
+            CPUs. 1 finds all paths in this process.
+
+    Returns:
+        Dict[RouteKey, StepTuples]: Paths found, keyed by
+            (src, dest, src_port, dest_port, use_backbone).
+    """
+    ends = [
+        node for node in graph.graph if graph.topology.has_role(node, FLASK)]
+    jobs = [
+        (src, [dest for dest in ends if dest != src]) for src in ends]
+
+    stub = stub_graph(graph.graph)
+    table = {}
+    if processes == 1 or len(jobs) < 2:
+        _init_worker(stub)
+        for src, dests in jobs:
+            table.update(_routes_from(src, dests))
+        return table
+
+    with ProcessPoolExecutor(
+        max_workers=processes,
+        initializer=_init_worker,
+        initargs=(stub,),
+    ) as pool:
+        futures = [pool.submit(_routes_from, src, dests)
+                   for src, dests in jobs]
+        for future in futures:
+            table.update(future.result())
+    return table
+
+
+def load_route_table(
+    cache_file: str,
+    key: str
+) -> Optional[Dict[RouteKey, StepTuples]]:
+    """Load route table from cache_file if it was saved with key, otherwise
+    return None.
+    """
+    try:
+        with open(cache_file, "rb") as f:
+            cached = pickle.load(f)
+    except (OSError, EOFError, pickle.UnpicklingError):
+        return None
+
+    if not isinstance(cached, dict) or cached.get("key") != key:
+        return None
+    return cached["routes"]
+
+
+def save_route_table(
+    cache_file: str,
+    key: str,
+    routes: Dict[RouteKey, StepTuples]
+) -> None:
+    """Save route table to cache_file under key. Failure to write the cache is
+    logged but otherwise ignored.
+    """
+    tmp_file = f"{cache_file}.{os.getpid()}.tmp"
+    try:
+        with open(tmp_file, "wb") as f:
+            pickle.dump(
+                {"key": key, "routes": routes}, f,
+                protocol=pickle.HIGHEST_PROTOCOL)
+        os.replace(tmp_file, cache_file)
+    except OSError as e:
+        logger.warning(f"Unable to write route table cache {cache_file}: {e}")
+        if os.path.exists(tmp_file):
+            os.remove(tmp_file)
@@ -0,0 +1,101 @@
+"""
+(c) 2019 The Cronin Group, University of Glasgow
+
+Binary snapshots of sanitised graphs. Loading and sanitising a graph file,
+GraphML in particular, is slow compared to unpickling the result, so the
+sanitised graph and its backbone are saved next to the graph file and reused
+as long as the graph file is unchanged.
+
+The backbone depends on the capabilities of the device objects, so it is only
+reused if every node has the same device class as when the snapshot was saved.
+"""
+
+import os
+import pickle
+import hashlib
+import logging
+from typing import Any, Dict, List, Optional, Tuple
+
+import networkx as nx
+
+# Bump whenever the snapshot format or graph sanitisation changes.
+SNAPSHOT_VERSION = 1
+
+logger = logging.getLogger("chempiler")
+
+
+def snapshot_file(graph_file: str) -> str:
+    """Path of the snapshot for graph_file."""
+    return f"{graph_file}.snapshot"
+
+
+def file_hash(graph_file: str) -> str:
+    """Hex digest of the contents of graph_file."""
+    sha = hashlib.sha256()
+    sha.update(f"snapshot:{SNAPSHOT_VERSION}\n".encode())
+    with open(graph_file, "rb") as f:
+        sha.update(f.read())
+    return sha.hexdigest()
+
+
+def device_classes(graph: nx.MultiDiGraph) -> Tuple[Tuple[str, str], ...]:
+    """(node, device class) of every node in a populated graph."""
+    result = []
+    for node in graph:
+        cls = type(graph.nodes[node].get("obj"))
+        result.append((node, f"{cls.__module__}.{cls.__qualname__}"))
+    return tuple(result)
+
+
+def load_snapshot(graph_file: str, key: str) -> Optional[Dict[str, Any]]:
+    """Load the snapshot of graph_file if it was saved with key.
+
+    Returns:
+        Optional[Dict[str, Any]]: None if there is no valid snapshot, else
+            dict with keys 'graph' (pickled sanitised graph), 'device_classes'
+            and 'backbone'.
+    """
+    try:
+        with open(snapshot_file(graph_file), "rb") as f:
+            snapshot = pickle.load(f)
+    except (OSError, EOFError, pickle.UnpicklingError):
+        return None
+
+    if not isinstance(snapshot, dict) or snapshot.get("key") != key:
+        return None
+    return snapshot
+
+
+def save_snapshot(
+    graph_file: str,
+    key: str,
+    graph_bytes: bytes,
+    classes: Tuple[Tuple[str, str], ...],
+    backbone: List[str]
+) -> None:
+    """Save snapshot of graph_file. Failure to write the snapshot is logged
+    but otherwise ignored.
+
+    Args:
+        graph_file (str): Graph file the snapshot is of.
+        key (str): file_hash of graph_file.
+        graph_bytes (bytes): Pickled sanitised graph, without device objects.
+        classes (Tuple[Tuple[str, str], ...]): device_classes of the
+            populated graph.
+        backbone (List[str]): Backbone of the populated graph.
+    """
+    path = snapshot_file(graph_file)
+    tmp_file = f"{path}.{os.getpid()}.tmp"
+    try:
+        with open(tmp_file, "wb") as f:
+            pickle.dump({
+                "key": key,
+                "graph": graph_bytes,
+                "device_classes": classes,
+                "backbone": backbone,
+            }, f, protocol=pickle.HIGHEST_PROTOCOL)
+        os.replace(tmp_file, path)
+    except OSError as e:
+        logger.warning(f"Unable to write graph snapshot {path}: {e}")
+        if os.path.exists(tmp_file):
+            os.remove(tmp_file)
@@ -0,0 +1,316 @@
+"""
+(c) 2019 The Cronin Group, University of Glasgow
+
+Dependency graph execution of pipelined step lists. A pipelined step list is a
+list of step groups, and executing it in lockstep means every command of a
+group has to finish before the next group starts, so a quick valve switch on
+one branch waits for a long syringe stroke on another.
+
+`StepDAG` instead makes every command wait only for the commands that touch
+the same hardware before it:
+
+* A pump and the valve it is attached to are one resource. A command waits
+  for the last earlier command on its resource.
+* A stroke pushing liquid out of a pump and the strokes in the same group
+  drawing it in, i.e. whose valves are joined directly or through routing
+  valves without pumps on the ports they were last switched to, are coupled
+  into one unit and always started together.
+* Routing valves without pumps can sit on the fluid path of any stroke, so
+  switching them is a barrier. It waits for everything before it and
+  everything after it waits for it.
+
+Units are then dispatched as soon as everything they depend on has finished,
+all commands of a unit at once.
+"""
+
+import queue
+from collections import deque
+from typing import Any, Callable, Dict, FrozenSet, List, Tuple
+
+from .topology import CompiledTopology, PUMP, ROUTING, VALVE
+
+# (device, command) as found in pipelined step lists
+Command = Tuple[Any, Dict[str, Any]]
+
+CommandDuration = Callable[[Dict[str, Any]], float]
+
+
+def lockstep_duration(
+    pipelined_steps: List[List[Command]],
+    duration: CommandDuration
+) -> float:
+    """Estimated time to execute pipelined_steps one step group at a time.
+
+    Args:
+        pipelined_steps (List[List[Command]]): Pipelined step list.
+        duration (CommandDuration): Estimated duration of a command.
+
+    Returns:
+        float: Estimated duration in seconds.
+    """
+    return sum(
+        max((duration(cmd) for _, cmd in step_group), default=0)
+        for step_group in pipelined_steps
+    )
+
+
+class StepDAG:
+    """Dependency graph of the commands in a pipelined step list.
+
+    Args:
+        pipelined_steps (List[List[Command]]): Pipelined step list.
+        topology (CompiledTopology): Topology of the graph the device objects
+            belong to.
+
+    Attributes:
+        units (List[List[Command]]): Commands started together, in an order in
+            which every unit comes after the units it depends on.
+        deps (List[FrozenSet[int]]): Indices of the units every unit waits
+            for.
+    """
+    def __init__(
+        self,
+        pipelined_steps: List[List[Command]],
+        topology: CompiledTopology
+    ) -> None:
+        self.topology = topology
+        self.units = []
+        self.deps = []
+
+        # Resource of every pump and pump valve, named after the pump.
+        self._resource = {}
+        for node_id, pump_id in enumerate(topology.valve_pump):
+            if pump_id >= 0 and topology.roles[node_id] & VALVE:
+                pump = topology.names[pump_id]
+                self._resource[topology.names[node_id]] = pump
+                self._resource[pump] = pump
+
+        last_use = {}
+        valve_ports = {}
+        barrier = None
+        since_barrier = []
+        for step_group in pipelined_steps:
+            routing = []
+            others = []
+            for device, cmd in step_group:
+                if self._is_routing_valve(device.name):
+                    routing.append((device, cmd))
+                else:
+                    others.append((device, cmd))
+
+            if routing:
+                deps = set(since_barrier)
+                if barrier is not None:
+                    deps.add(barrier)
+                barrier = self._add_unit(routing, deps)
+                since_barrier = []
+
+            for unit in self._couple(others, valve_ports):
+                deps = {
+                    last_use[resource]
+                    for resource in self._unit_resources(unit)
+                    if resource in last_use
+                }
+                if barrier is not None:
+                    deps.add(barrier)
+                index = self._add_unit(unit, deps)
+                for resource in self._unit_resources(unit):
+                    last_use[resource] = index
+                since_barrier.append(index)
+
+            for device, cmd in others:
+                if device.name in self._resource and cmd["cmd"][0] == "route":
+                    _, port_in, port_out = cmd["cmd"]
+                    valve_ports[device.name] = (
+                        port_in if port_out == -1 else port_out)
+
+    def _add_unit(self, unit: List[Command], deps: set) -> int:
+        self.units.append(unit)
+        self.deps.append(frozenset(deps))
+        return len(self.units) - 1
+
+    def _is_routing_valve(self, node: str) -> bool:
+        node_id = self.topology.ids[node]
+        return (bool(self.topology.roles[node_id] & ROUTING)
+                and self.topology.valve_pump[node_id] < 0
+                and not self.topology.roles[node_id] & PUMP)
+
+    def _unit_resources(self, unit: List[Command]) -> FrozenSet[str]:
+        return frozenset(
+            self._resource.get(device.name, device.name) for device, _ in unit)
+
+    def _couple(
+        self,
+        commands: List[Command],
+        valve_ports: Dict[str, Any]
+    ) -> List[List[Command]]:
+        """Split the commands of one step group into units, coupling every
+        pump stroke pushing liquid out with the strokes drawing it in.
+
+        Args:
+            commands (List[Command]): Commands of the step group.
+            valve_ports (Dict[str, Any]): Port every pump valve was last
+                switched to connect its pump to.
+        """
+        units = []
+        sources = []
+        sinks = {}
+        for device, cmd in commands:
+            direction = cmd["cmd"][0]
+            if (self.topology.has_role(device.name, PUMP)
+                    and direction in ("sink", "source")):
+                if direction == "source":
+                    sources.append((device, cmd))
+                else:
+                    sinks[device.name] = (device, cmd)
+            else:
+                units.append([(device, cmd)])
+
+        sink_valves = {
+            valve: pump for valve, pump in self._resource.items()
+            if valve != pump and pump in sinks
+        }
+        coupled = {}
+        for device, cmd in sources:
+            unit = [(device, cmd)]
+            for valve in self._fed_valves(
+                    device.name, sink_valves, valve_ports):
+                pump = sink_valves[valve]
+                if pump in coupled:
+                    # Sink already fed by another source, merge the units.
+                    other = coupled[pump]
+                    if other is not unit:
+                        unit.extend(other)
+                        units.remove(other)
+                        for fed_pump in list(coupled):
+                            if coupled[fed_pump] is other:
+                                coupled[fed_pump] = unit
+                else:
+                    unit.append(sinks[pump])
+                    coupled[pump] = unit
+            units.append(unit)
+
+        for pump, stroke in sinks.items():
+            if pump not in coupled:
+                units.append([stroke])
+        return units
+
+    def _fed_valves(
+        self,
+        pump: str,
+        sink_valves: Dict[str, str],
+        valve_ports: Dict[str, Any]
+    ) -> List[str]:
+        """Valves in sink_valves that liquid pushed out by pump can reach,
+        either directly or through routing valves without pumps.
+
+        Where the port a valve was last switched to is known, only edges
+        leaving or entering the valve on that port are followed.
+        """
+        topology = self.topology
+        valves = [
+            valve for valve, valve_pump in self._resource.items()
+            if valve_pump == pump and valve != pump]
+        fed = []
+        for valve in valves:
+            start_id = topology.ids[valve]
+            seen = {start_id}
+            queue = deque([start_id])
+            while queue:
+                node_id = queue.popleft()
+                for neighbor_id in topology.successors[node_id]:
+                    if neighbor_id in seen:
+                        continue
+                    name = topology.names[neighbor_id]
+                    ports = topology.ports.get((node_id, neighbor_id), ())
+                    if node_id == start_id and not self._port_used(
+                            ports, 0, valve_ports.get(valve)):
+                        continue
+                    if name in sink_valves:
+                        if self._port_used(
+                                ports, 1, valve_ports.get(name)):
+                            seen.add(neighbor_id)
+                            fed.append(name)
+                    elif self._is_routing_valve(name):
+                        seen.add(neighbor_id)
+                        queue.append(neighbor_id)
+        return fed
+
+    def _port_used(self, ports: Tuple, side: int, port: Any) -> bool:
+        """True if port is unknown, or one of the edge ports on side of the
+        edge is port.
+        """
+        if port is None or not ports:
+            return True
+        return any(str(edge_port[side]) == str(port) for edge_port in ports)
+
+    def duration(self, duration: CommandDuration) -> float:
+        """Estimated time to execute the graph if every unit starts as soon as
+        the units it depends on have finished.
+
+        Args:
+            duration (CommandDuration): Estimated duration of a command.
+
+        Returns:
+            float: Estimated duration in seconds.
+        """
+        finish = []
+        for unit, deps in zip(self.units, self.deps):
+            start = max((finish[dep] for dep in deps), default=0)
+            finish.append(
+                start + max(duration(cmd) for _, cmd in unit))
+        return max(finish, default=0)
+
+    def execute(self, dispatch: Callable[[List[Command]], Any]) -> None:
+        """Execute every unit as soon as the units it depends on are finished.
+
+        If a device raises an error, no new units are started and the error is
+        raised once all running units have finished.
+
+        Args:
+            dispatch (Callable[[List[Command]], CommandGroup]): Function
+                sending all commands of a unit at once and returning a handle
+                like `ChemputerAPI.CommandGroup`, with `add_done_callback`
+                and `result`.
+        """
+        remaining = [len(deps) for deps in self.deps]
+        dependents = [[] for _ in self.units]
+        for index, deps in enumerate(self.deps):
+            for dep in deps:
+                dependents[dep].append(index)
+
+        ready = deque(
+            index for index, count in enumerate(remaining) if count == 0)
+        finished = queue.Queue()
+        running = 0
+        error = None
+        while ready or running:
+            while ready and error is None:
+                index = ready.popleft()
+                try:
+                    group = dispatch(self.units[index])
+                except Exception as e:
+                    error = e
+                    break
+                running += 1
+                group.add_done_callback(
+                    lambda group, index=index: finished.put((index, group)))
+
+            if not running:
+                break
+
+            index, group = finished.get()
+            running -= 1
+            try:
+                group.result()
+            except Exception as e:
+                if error is None:
+                    error = e
+                continue
+            for dependent in dependents[index]:
+                remaining[dependent] -= 1
+                if remaining[dependent] == 0:
+                    ready.append(dependent)
+
+        if error is not None:
+            raise error
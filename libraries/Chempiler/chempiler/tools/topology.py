@@ -0,0 +1,176 @@
+"""
+(c) 2019 The Cronin Group, University of Glasgow
+
+Compiled, read only view of a populated Chemputer graph. Nodes are given
+integer ids and everything the path finding and pump execution helpers ask
+about a node or an edge is precomputed into tuples and dicts, so those
+questions no longer involve walking the networkx graph or rebuilding device
+capability lists.
+
+The compiled topology is only valid for the graph it was compiled from. It is
+rebuilt by `ChempilerGraph` whenever the graph changes.
+"""
+
+from collections import deque
+from typing import List, Optional, Tuple, Union
+
+import networkx as nx
+
+# Role bits
+VALVE = 1
+PUMP = 2
+FLASK = 4
+ROUTING = 8
+
+Ports = Tuple[Union[int, str], Union[int, str]]
+
+
+class CompiledTopology:
+    """Integer indexed topology of a Chemputer graph.
+
+    Args:
+        graph (nx.MultiDiGraph): Sanitised and populated graph.
+
+    Attributes:
+        names (Tuple[str]): Node name of every node id.
+        ids (Dict[str, int]): Node id of every node name.
+        capabilities (Tuple[FrozenSet]): Device capabilities of every node id.
+        routes (Tuple[FrozenSet[Ports]]): (in_port, out_port) pairs every
+            node id can route between.
+        roles (Tuple[int]): Bitmask of VALVE, PUMP, FLASK and ROUTING for
+            every node id.
+        valve_pump (Tuple[int]): Id of the first pump attached to every node
+            id, or -1 if no pump is attached.
+        ports (Dict[Tuple[int, int], Tuple[Ports]]): Ports of all edges
+            between two node ids, in the order `edges.data()` yields them.
+        portless (FrozenSet[Tuple[int, int]]): (src, dest) node id pairs
+            joined by at least one edge without ports, e.g. stirrer -> flask.
+        successors (Tuple[Tuple[int]]): Ids of the nodes every node id has an
+            edge to.
+    """
+    def __init__(self, graph: nx.MultiDiGraph) -> None:
+        self.names = tuple(graph.nodes)
+        self.ids = {name: i for i, name in enumerate(self.names)}
+
+        capabilities = []
+        roles = []
+        for name in self.names:
+            attrs = graph.nodes[name]
+            node_capabilities = frozenset(
+                getattr(attrs.get("obj"), "capabilities", ()))
+            capabilities.append(node_capabilities)
+
+            role = 0
+            if attrs.get("class") == "ChemputerValve":
+                role |= VALVE
+            if "pump" in node_capabilities:
+                role |= PUMP
+            elif any(capability[0] in ("sink", "source")
+                     for capability in node_capabilities):
+                role |= FLASK
+            if any(capability[0] == "route"
+                   for capability in node_capabilities):
+                role |= ROUTING
+            roles.append(role)
+
+        self.capabilities = tuple(capabilities)
+        self.roles = tuple(roles)
+        self.routes = tuple(
+            frozenset(
+                (capability[1], capability[2])
+                for capability in node_capabilities
+                if capability[0] == "route"
+            )
+            for node_capabilities in self.capabilities
+        )
+
+        ports = {}
+        portless = set()
+        for src, dest, data in graph.edges.data():
+            key = (self.ids[src], self.ids[dest])
+            if "port" in data:
+                ports.setdefault(key, []).append(data["port"])
+            else:
+                portless.add(key)
+        self.ports = {key: tuple(value) for key, value in ports.items()}
+        self.portless = frozenset(portless)
+        self.successors = tuple(
+            tuple(self.ids[neighbor] for neighbor in graph.neighbors(name))
+            for name in self.names
+        )
+
+        # Pumps ordered by distance, filled per source node on first use.
+        self._nearest_pumps = {}
+
+        valve_pump = []
+        for name in self.names:
+            pump_id = -1
+            for neighbor in graph.neighbors(name):
+                neighbor_id = self.ids[neighbor]
+                if self.roles[neighbor_id] & PUMP:
+                    pump_id = neighbor_id
+                    break
+            valve_pump.append(pump_id)
+        self.valve_pump = tuple(valve_pump)
+
+    def has_role(self, node: str, role: int) -> bool:
+        """True if node has any of the role bits in role."""
+        return bool(self.roles[self.ids[node]] & role)
+
+    def can_route(self, node: str, ports: Optional[Ports] = None) -> bool:
+        """True if node can route liquid, between ports if given."""
+        node_id = self.ids[node]
+        if ports:
+            return tuple(ports) in self.routes[node_id]
+        return bool(self.roles[node_id] & ROUTING)
+
+    def edge_ports(self, src: str, dest: str) -> Tuple[Ports]:
+        """Ports of all edges from src to dest.
+
+        Raises:
+            KeyError: There is an edge from src to dest without ports.
+        """
+        key = (self.ids[src], self.ids[dest])
+        if key in self.portless:
+            raise KeyError("port")
+        return self.ports.get(key, ())
+
+    def nearest_pumps(self, src: str, k: Optional[int] = None) -> List[str]:
+        """Pumps reachable from src, nearest first by number of edges. Pumps
+        the same distance away are in graph order.
+
+        Args:
+            src (str): Node to measure distances from.
+            k (int): Only return the k nearest pumps. None returns all.
+
+        Returns:
+            List[str]: Pump names.
+        """
+        src_id = self.ids[src]
+        if src_id not in self._nearest_pumps:
+            # Single BFS from src over all edges.
+            distances = {src_id: 0}
+            queue = deque([src_id])
+            while queue:
+                node_id = queue.popleft()
+                for neighbor_id in self.successors[node_id]:
+                    if neighbor_id not in distances:
+                        distances[neighbor_id] = distances[node_id] + 1
+                        queue.append(neighbor_id)
+
+            pump_ids = sorted(
+                (distance, node_id)
+                for node_id, distance in distances.items()
+                if self.roles[node_id] & PUMP
+            )
+            self._nearest_pumps[src_id] = tuple(
+                self.names[node_id] for _, node_id in pump_ids)
+
+        return list(self._nearest_pumps[src_id][:k])
+
+    def pump_name(self, valve: str) -> Optional[str]:
+        """Name of the pump attached to valve, or None."""
+        pump_id = self.valve_pump[self.ids[valve]]
+        if pump_id < 0:
+            return None
+        return self.names[pump_id]
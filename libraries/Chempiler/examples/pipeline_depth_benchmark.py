@@ -0,0 +1,142 @@
+"""
+(c) 2019 The Cronin Group, University of Glasgow
+
+Compare chunk schedules on the longest moves of a rig.
+
+For every graph, the moves between flask-like nodes passing the most pumps
+are pipelined without executing them, first with the baseline schedule the
+pipeliner used before `PumpExecutioner.schedule_chunks` (every chunk two steps
+after the one before it), then with schedule_chunks at every depth given.
+Depth 0 is automatic, as many chunks on the path as the pumps allow.
+
+Printed are the number of step groups, pump stroke rounds (step groups with
+strokes), strokes, how busy the pumps on the path are (strokes per pump and
+round) and the estimated durations of lockstep and dependency graph
+execution.
+
+Usage:
+    python pipeline_depth_benchmark.py [--depths 0 2 1] [graph files]
+"""
+
+import argparse
+import logging
+import os
+import tempfile
+
+import ChemputerAPI
+from chempiler import Chempiler
+from chempiler.tools.step_dag import StepDAG, lockstep_duration
+from chempiler.tools.topology import FLASK
+
+HERE = os.path.dirname(os.path.abspath(__file__))
+ROOT = os.path.join(HERE, "..", "..", "..")
+GRAPHS = [
+    os.path.join(HERE, "..", "tests", "graph_files", "bigrig.json"),
+    os.path.join(ROOT, "MIDA", "Convergence_MIDA_graph.json"),
+]
+
+
+def longest_moves(c, n_moves):
+    """Moves between flask-like nodes passing the most pumps."""
+    topology = c.graph.topology
+    nodes = [node for node in c.graph if topology.has_role(node, FLASK)]
+    moves = []
+    for src in nodes:
+        for dest in nodes:
+            if src == dest:
+                continue
+            try:
+                prepared = c.prepare_move(src, dest)
+            except Exception:
+                continue
+            if None in prepared.paths:
+                continue
+            pumps = sum(len(path.steps) for path in prepared.paths)
+            moves.append((pumps, src, dest))
+    moves.sort(key=lambda move: (-move[0], move[1], move[2]))
+    return moves[:n_moves]
+
+
+def baseline_schedule(chunks, depth=None):
+    """Schedule of the pipeliner before schedule_chunks: every chunk starts
+    once the first two steps of the one before it are done, or once it is
+    done if it has no more than two steps.
+    """
+    lengths = [len(step) for step in chunks[0]]
+    offset = sum(lengths[:2]) if len(lengths) > 2 else sum(lengths)
+    step_starts = [sum(lengths[:k]) for k in range(len(lengths))]
+    return [
+        [i * offset + start for start in step_starts]
+        for i in range(len(chunks))
+    ]
+
+
+def measure(c, src, dest, volume):
+    pipelined_steps = c.prepare_move(src, dest).pipeline(volume)
+    cmd_duration = c.pump.cmd_duration
+    strokes = [
+        (device.name, cmd)
+        for step_group in pipelined_steps for device, cmd in step_group
+        if cmd["cmd"][0] in ("sink", "source")
+    ]
+    rounds = sum(
+        any(cmd["cmd"][0] in ("sink", "source") for _, cmd in step_group)
+        for step_group in pipelined_steps
+    )
+    pumps = {name for name, _ in strokes}
+    dag = StepDAG(pipelined_steps, c.graph.topology)
+    return (
+        len(pipelined_steps),
+        rounds,
+        len(strokes),
+        100 * len(strokes) / (rounds * len(pumps)),
+        lockstep_duration(pipelined_steps, cmd_duration),
+        dag.duration(cmd_duration),
+    )
+
+
+def main():
+    parser = argparse.ArgumentParser(
+        description=__doc__,
+        formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("graphs", nargs="*", default=GRAPHS)
+    parser.add_argument("--depths", type=int, nargs="+", default=[0, 2, 1])
+    parser.add_argument("--moves", type=int, default=3,
+                        help="number of moves per graph")
+    parser.add_argument("--chunks", type=int, default=10,
+                        help="volume to move in syringe volumes")
+    args = parser.parse_args()
+
+    logging.disable(logging.CRITICAL)
+    output_dir = tempfile.mkdtemp()
+    for graph_file in args.graphs:
+        c = Chempiler(
+            "pipeline_depth_benchmark", graph_file, output_dir,
+            simulation=True, device_modules=[ChemputerAPI])
+        print(os.path.basename(graph_file))
+        print("  {:<40} {:>8} {:>7} {:>7} {:>7} {:>6} {:>10} {:>10}".format(
+            "move", "schedule", "groups", "rounds", "strokes", "busy",
+            "lockstep", "dag"))
+        for pumps, src, dest in longest_moves(c, args.moves):
+            volume = args.chunks * c.pump.chunk_volume(
+                c.prepare_move(src, dest).paths)
+            move = f"{src} -> {dest} ({pumps} steps)"
+
+            c.pump.schedule_chunks = baseline_schedule
+            try:
+                results = [("baseline", measure(c, src, dest, volume))]
+            finally:
+                del c.pump.schedule_chunks
+            for depth in args.depths:
+                c.pump.pipeline_depth = depth or None
+                results.append((
+                    f"depth {depth}" if depth else "auto",
+                    measure(c, src, dest, volume)))
+            c.pump.pipeline_depth = None
+
+            for schedule, result in results:
+                print("  {:<40} {:>8} {:>7} {:>7} {:>7} {:>5.0f}% {:>9.0f}s"
+                      " {:>9.0f}s".format(move, schedule, *result))
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,33 @@
+"""Helpers shared by the tests, comparing steps and paths by value."""
+
+
+def as_names(pipelined_steps):
+    """Pipelined steps with every device replaced by its name."""
+    return [[(device.name, cmd) for device, cmd in group]
+            for group in pipelined_steps]
+
+
+def as_tuples(path):
+    """Path, or list of paths, with every step replaced by its tuple."""
+    if path and isinstance(path[0], list):
+        return [as_tuples(p) for p in path]
+    return [step.as_tuple() for step in path]
+
+
+def strokes(pipelined_steps):
+    """Every plunger stroke of the pipelined steps as (pump, direction,
+    volume), direction being "sink" or "source".
+    """
+    return [
+        (device.name, cmd["cmd"][0], cmd["volume"])
+        for group in pipelined_steps for device, cmd in group
+        if cmd["cmd"][0] in ("sink", "source")
+    ]
+
+
+def stroke_volumes(pipelined_steps, pump, direction="sink"):
+    """Volumes of the strokes of one pump in one direction."""
+    return [
+        volume for name, stroke_direction, volume in strokes(pipelined_steps)
+        if name == pump and stroke_direction == direction
+    ]
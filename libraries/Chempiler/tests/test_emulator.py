@@ -0,0 +1,121 @@
+import time
+import threading
+
+import pytest
+from ChemputerAPI import ChemputerPump, ChemputerValve, execute_group
+from ChemputerAPI.device import ChemputerDeviceError
+from ChemputerAPI.emulator import FirmwareEmulator, STALL
+
+PUMP = "127.0.0.10"
+PUMP2 = "127.0.0.11"
+VALVE = "127.0.0.20"
+
+
+@pytest.fixture
+def emulator():
+    with FirmwareEmulator(valve_move_time=0.1) as emulator:
+        emulator.add_pump(PUMP)
+        emulator.add_pump(PUMP2)
+        emulator.add_valve(VALVE)
+        yield emulator
+
+
+def test_devices_initialise(emulator):
+    pump = ChemputerPump(PUMP, "pump")
+    valve = ChemputerValve(VALVE, "valve")
+    pump.wait_until_ready()
+    valve.wait_until_ready()
+
+    pump.read_device_configuration()
+    assert pump.device_cfg["microsteps"] == "256"
+    valve.read_network_configuration()
+    assert valve.network_cfg["ip_address"] == VALVE
+    pump.read_errors()
+    assert pump.errors_clean
+
+
+def test_motion_time(emulator):
+    pump = ChemputerPump(PUMP, "pump")
+    valve = ChemputerValve(VALVE, "valve")
+    pump.wait_until_ready()
+    valve.wait_until_ready()
+
+    # 1 mL at 120 mL/min
+    start = time.monotonic()
+    pump.execute(("sink", 0), volume=1, speed=120)
+    pump.wait_until_ready()
+    assert 0.45 < time.monotonic() - start < 0.7
+    assert emulator.devices[PUMP].position == 1000
+
+    start = time.monotonic()
+    valve.execute(("route", -1, 3))
+    valve.wait_until_ready()
+    assert 0.08 < time.monotonic() - start < 0.3
+    assert emulator.devices[VALVE].position == 3
+
+
+def test_stall(emulator):
+    pump = ChemputerPump(PUMP, "pump")
+    pump.wait_until_ready()
+
+    emulator.inject_fault(PUMP, STALL)
+    pump.execute(("sink", 0), volume=1, speed=600)
+    with pytest.raises(ChemputerDeviceError):
+        pump.wait_until_ready()
+    assert not pump.errors_clean
+
+    # errors are cleared before the next move
+    pump.execute(("sink", 0), volume=1, speed=600)
+    pump.wait_until_ready()
+    assert emulator.devices[PUMP].errors == 0
+
+
+def test_clear_errors(emulator):
+    pump = ChemputerPump(PUMP, "pump")
+    pump.wait_until_ready()
+
+    # a stall that was never raised is cleared with the device errors
+    emulator.inject_fault(PUMP, STALL)
+    pump.execute(("sink", 0), volume=1, speed=600)
+    pump.device_ready_flag.wait()
+    pump.clear_errors()
+    assert pump.errors_clean
+    pump.wait_until_ready()
+
+    # the device disconnects before replying
+    emulator.devices[PUMP].latency = 0.3
+    threading.Timer(0.1, emulator.stop).start()
+    with pytest.raises(ChemputerDeviceError):
+        pump.clear_errors()
+    assert not pump.errors_clean
+
+
+def test_group_started_together(emulator):
+    pumps = [ChemputerPump(PUMP, "pump"), ChemputerPump(PUMP2, "pump2")]
+    for pump in pumps:
+        pump.wait_until_ready()
+    for device in emulator.devices.values():
+        device.latency = 0.05
+    for pump in pumps:
+        pump.errors_clean = False
+
+    # 1 mL at 120 mL/min each, plus a round trip to clear errors first
+    start = time.monotonic()
+    group = execute_group([
+        (pump, {"cmd": ("sink", 0), "volume": 1, "speed": 120})
+        for pump in pumps
+    ])
+    group.result()
+    assert group.done()
+    assert time.monotonic() - start < 0.9
+    assert emulator.devices[PUMP].position == 1000
+    assert emulator.devices[PUMP2].position == 1000
+
+    emulator.inject_fault(PUMP2, STALL)
+    group = execute_group([
+        (pump, {"cmd": ("source", 0), "volume": 1, "speed": 600})
+        for pump in pumps
+    ])
+    with pytest.raises(ChemputerDeviceError):
+        group.result()
+    assert emulator.devices[PUMP].position == 0
@@ -0,0 +1,232 @@
+import os
+import time
+from queue import Empty
+
+import networkx as nx
+import pytest
+from ChemputerAPI import execute_group
+from ChemputerAPI.tricont import ChemputerTricontC3000, TricontBus
+from SerialLabware import (
+    C3000, CVC3000, ConductivitySensor, HeatingPad, Huber, IKARCTDigital,
+    IKARV10, JULABOCF41)
+from SerialLabware.devices.emulators import (
+    C3000Emulator, CVC3000Emulator, ConductivitySensorEmulator,
+    HeatingPadEmulator, HuberEmulator, IKARCTDigitalEmulator, IKARV10Emulator,
+    JULABOCF41Emulator)
+from chempiler.tools.module_execution.chiller_execution import (
+    ChillerExecutioner)
+from chempiler.tools.module_execution.stirrer_execution import (
+    StirrerExecutioner)
+
+pytestmark = pytest.mark.skipif(
+    not hasattr(os, "openpty"), reason="needs pseudo-terminals")
+
+
+def connect(device_class, emulator, **kwargs):
+    """Device on the emulator's terminal, without the device's I/O delays."""
+    device = device_class(emulator.port, **kwargs)
+    device.write_delay = device.read_delay = 0
+    return device
+
+
+class DeviceGraph(nx.DiGraph):
+    """Graph of devices attached to vessels, as executioners look them up."""
+
+    def obj(self, key):
+        return self.nodes[key]["obj"]
+
+
+def attach(devices):
+    """Graph attaching every device to the vessel of the same name."""
+    graph = DeviceGraph()
+    for vessel, device in devices.items():
+        graph.add_node(vessel + "_device", obj=device)
+        graph.add_edge(vessel + "_device", vessel)
+    return graph
+
+
+def test_ika():
+    with IKARCTDigitalEmulator(baudrate=0) as emulator:
+        hotplate = connect(IKARCTDigital, emulator)
+        try:
+            hotplate.temperature_sp = 60
+            assert hotplate.temperature_pv == ("20.0", "1")
+            hotplate.start_heater()
+            assert hotplate.temperature_pv == ("60.0", "1")
+            assert hotplate.name == "RCT digital"
+        finally:
+            hotplate.disconnect()
+
+    with IKARV10Emulator(baudrate=0) as emulator:
+        rotavap = connect(IKARV10, emulator)
+        try:
+            assert rotavap.initialise()
+            rotavap.rotation_speed_sp = 120
+            rotavap.start_rotation()
+            assert rotavap.rotation_speed_pv == ("120", "4")
+        finally:
+            rotavap.disconnect()
+
+
+def test_transfer_time():
+    with IKARCTDigitalEmulator(baudrate=300) as emulator:
+        hotplate = connect(IKARCTDigital, emulator)
+        try:
+            start = time.monotonic()
+            hotplate.temperature_pv
+            # "IN_PV_1\r\n" and "20.0 1\r\n" at 30 characters per second.
+            assert time.monotonic() - start >= 17 / 30
+        finally:
+            hotplate.disconnect()
+
+
+def test_cvc3000():
+    with CVC3000Emulator(baudrate=0) as emulator:
+        pump = connect(CVC3000, emulator)
+        try:
+            pump.initialise()
+            pump.vacuum_sp = 200
+            assert pump.vacuum_pv() == ("1013", "mbar")
+            pump.start()
+            assert pump.vacuum_pv() == ("200", "mbar")
+            assert pump.query_status()["Pump state"] == "1"
+            pump.runtime_sp = "01:30"
+            assert pump.runtime_sp == ("01:30", "h:m")
+            pump.stop()
+            pump.vent()
+        finally:
+            pump.disconnect()
+
+
+def test_chillers():
+    with JULABOCF41Emulator(baudrate=0) as emulator:
+        chiller = connect(JULABOCF41, emulator)
+        try:
+            chiller.set_temperature(-10.5)
+            chiller.start()
+            # No external sensor, falls back to the bath temperature.
+            assert chiller.get_temperature() == -10.5
+            assert chiller.get_setpoint() == -10.5
+            assert chiller.get_status() == "03 REMOTE START"
+        finally:
+            chiller.disconnect()
+
+    with HuberEmulator(baudrate=0) as emulator:
+        chiller = connect(Huber, emulator)
+        try:
+            chiller.set_temperature(-12.5)
+            assert chiller.get_temperature() == 20
+            chiller.start()
+            assert chiller.get_temperature() == -12.5
+            assert emulator.received[0] == "{M00FB1E"
+        finally:
+            chiller.disconnect()
+
+
+def test_cronin_devices():
+    with ConductivitySensorEmulator(baudrate=0, readings=(1, 2)) as emulator:
+        sensor = connect(ConductivitySensor, emulator)
+        try:
+            assert sensor.conductivity == 3
+            assert sensor.conductivity_multiple == (1, 2)
+        finally:
+            sensor.disconnect()
+
+    with HeatingPadEmulator(baudrate=0) as emulator:
+        pad = connect(HeatingPad, emulator)
+        try:
+            assert pad.get_set_temp() == -999
+            assert pad.set_temp(60) == 60
+            assert pad.start()
+            assert pad.get_is_temp() == 60
+        finally:
+            pad.disconnect()
+
+
+def test_no_reply():
+    with HuberEmulator(baudrate=0) as emulator:
+        chiller = connect(Huber, emulator)
+        try:
+            emulator.mute()
+            with pytest.raises(Exception, match="No responce"):
+                chiller.get_temperature()
+            assert chiller.get_temperature() == 20
+        finally:
+            chiller.disconnect()
+
+
+def test_c3000_bus():
+    with C3000Emulator(addresses=(0, 1), baudrate=0,
+                       time_scale=0.1) as emulator:
+        device = connect(C3000, emulator)
+        TricontBus.BUSES["emulated"] = TricontBus(device)
+        try:
+            pump1 = ChemputerTricontC3000("emulated", 0, name="pump1", max_volume=5)
+            pump2 = ChemputerTricontC3000("emulated", 1, name="pump2", max_volume=5)
+            execute_group([
+                (pump1, {"cmd": ("sink", 2), "volume": 2.5, "speed": 30}),
+                (pump2, {"cmd": ("sink", 0), "volume": 1, "speed": 60}),
+            ]).result()
+            pump1.wait_until_ready()
+            assert device.get_plunger_position(address=0) == 1500
+            assert device.get_valve_position(address=0) == "3"
+            assert device.get_plunger_position(address=1) == 600
+        finally:
+            TricontBus.BUSES.pop("emulated")
+            device.disconnect()
+
+
+def test_stirrer_set_temps():
+    with IKARCTDigitalEmulator(baudrate=0) as emulator1, \
+            IKARCTDigitalEmulator(baudrate=0) as emulator2:
+        hotplates = [connect(IKARCTDigital, emulator)
+                     for emulator in (emulator1, emulator2)]
+        stirrers = StirrerExecutioner(
+            attach({"reactor1": hotplates[0], "reactor2": hotplates[1]}),
+            simulation=False)
+        try:
+            for hotplate in hotplates:
+                hotplate.write_delay = 0.3
+            start = time.monotonic()
+            stirrers.set_temps({"reactor1": 40, "reactor2": 60})
+            # Both setpoints are written at the same time.
+            assert time.monotonic() - start < 0.5
+            assert emulator1.setpoints[1] == 40
+            assert emulator2.setpoints[1] == 60
+
+            # A heater whose command handler is gone never replies.
+            hotplates[1].disconnect()
+            for hotplate in hotplates:
+                hotplate.reply_timeout = 0.2
+            with pytest.raises(Empty):
+                stirrers.set_temps({"reactor1": 50, "reactor2": 70})
+            assert emulator2.setpoints[1] == 60
+        finally:
+            hotplates[0].disconnect()
+
+
+def test_chiller_set_temps():
+    with HuberEmulator(baudrate=0, response_time=0.3) as emulator1, \
+            HuberEmulator(baudrate=0, response_time=0.3) as emulator2:
+        chillers = [connect(Huber, emulator)
+                    for emulator in (emulator1, emulator2)]
+        executioner = ChillerExecutioner(
+            attach({"jacket1": chillers[0], "jacket2": chillers[1]}),
+            simulation=False)
+        try:
+            start = time.monotonic()
+            executioner.set_temps({"jacket1": -10, "jacket2": 5})
+            # Both chillers answer their setpoint at the same time.
+            assert time.monotonic() - start < 0.5
+            assert emulator1.variables[HuberEmulator.SETPOINT] == 0xFC18
+            assert emulator2.variables[HuberEmulator.SETPOINT] == 500
+
+            chillers[1].disconnect()
+            for chiller in chillers:
+                chiller.reply_timeout = 0.2
+            with pytest.raises(Empty):
+                executioner.set_temps({"jacket1": -5, "jacket2": 10})
+            assert emulator2.variables[HuberEmulator.SETPOINT] == 500
+        finally:
+            chillers[0].disconnect()
+
@@ -0,0 +1,83 @@
+import os
+import copy
+import random
+
+import ChemputerAPI
+from chempiler import Chempiler
+from chempiler.tools.errors import ChempilerError
+from helpers import as_names
+
+HERE = os.path.dirname(os.path.abspath(__file__))
+TEST_GRAPH = os.path.join(HERE, "graph_files", "bigrig.json")
+
+c = Chempiler(
+    experiment_code="test_insert_offset",
+    graph_file=TEST_GRAPH,
+    output_dir=".",
+    simulation=True,
+    device_modules=[ChemputerAPI]
+)
+
+NODES = [
+    node for node in c.graph
+    if c.graph.node_can_pump(node) or c.graph.node_can_route(node)
+]
+
+ROUTE = {"cmd": ("route", 0, -1)}
+
+
+def legacy_offset(pipelined_steps, new_pipelined_steps):
+    offset = 1
+    while len(pipelined_steps) - offset >= 0:
+        test_steps = copy.deepcopy(pipelined_steps)
+        test_steps = c.pump.insert_steps(
+            test_steps, new_pipelined_steps, offset)
+        try:
+            c.pump.validate_one_command_per_group_per_node(test_steps)
+        except ChempilerError:
+            break
+        offset += 1
+    return max(offset - 1, 0)
+
+
+def random_chunk(rng, n_groups):
+    return [
+        [(c.graph.obj(node), ROUTE)
+         for node in rng.sample(NODES, rng.randint(1, 3))]
+        for _ in range(n_groups)
+    ]
+
+
+def test_offsets_match_legacy_search():
+    rng = random.Random(0)
+    for _ in range(200):
+        n_groups = rng.randint(2, 8)
+        legacy_steps, steps, occupancy = [], [], []
+        for _ in range(rng.randint(2, 5)):
+            chunk = random_chunk(rng, n_groups)
+            new_occupancy = [c.pump.group_occupancy(group) for group in chunk]
+
+            offset = c.pump.find_insert_offset(occupancy, new_occupancy)
+            assert offset == legacy_offset(legacy_steps, chunk)
+
+            occupancy = c.pump.insert_occupancy(
+                occupancy, new_occupancy, offset)
+            steps = c.pump.insert_steps(
+                steps, [list(group) for group in chunk], offset)
+            legacy_steps = c.pump.insert_steps(
+                legacy_steps, [list(group) for group in chunk], offset)
+            assert as_names(steps) == as_names(legacy_steps)
+            assert occupancy == [
+                c.pump.group_occupancy(group) for group in steps]
+
+
+def test_insert_steps_merges_into_existing_groups():
+    existing = [[(c.graph.obj(node), ROUTE)] for node in NODES[:5]]
+    chunk = [[(c.graph.obj(node), ROUTE)] for node in NODES[5:7]]
+
+    steps = c.pump.insert_steps(existing, chunk, 1)
+
+    assert as_names(steps) == [
+        [(node, ROUTE) for node in group] for group in (
+            [NODES[0]], [NODES[1]], [NODES[2]], [NODES[3]],
+            [NODES[4], NODES[5]], [NODES[6]])]
@@ -0,0 +1,67 @@
+import os
+
+import pytest
+import ChemputerAPI
+from chempiler import Chempiler
+from chempiler.tools.errors import ChempilerError
+from chempiler.tools.step_dag import lockstep_duration
+from helpers import stroke_volumes
+
+HERE = os.path.dirname(os.path.abspath(__file__))
+# flask_a on valve1, waste_1 on valve2 and waste_2 and waste_3 on valve3, with
+# valve1, valve2 and valve3 in a row.
+TEST_GRAPH = os.path.join(HERE, "graph_files", "move_split.json")
+
+c = Chempiler(
+    experiment_code="test_move_split",
+    graph_file=TEST_GRAPH,
+    output_dir=".",
+    simulation=True,
+    device_modules=[ChemputerAPI]
+)
+
+
+def test_single_aspiration():
+    dests = [("waste_1", 2), ("waste_2", 3), ("waste_3", 2.5)]
+    separate = sum(
+        c.move_duration("flask_a", dest, volume) for dest, volume in dests)
+
+    steps = c.move_split("flask_a", dests)
+    assert stroke_volumes(steps, "pump1", "sink") == [7.5]
+    assert stroke_volumes(steps, "pump2", "source") == [2, 3, 2.5]
+    assert lockstep_duration(steps, c.pump.cmd_duration) < separate
+
+    # Valves are only switched if they aren't in position already.
+    routes = {}
+    for group in steps:
+        for device, cmd in group:
+            if cmd["cmd"][0] == "route":
+                assert routes.get(device.name) != cmd["cmd"]
+                routes[device.name] = cmd["cmd"]
+
+    assert c.graph["flask_a"]["current_volume"] == 500 - 7.5
+    assert c.graph["waste_1"]["current_volume"] == 2
+    assert c.graph["waste_2"]["current_volume"] == 3
+    assert c.graph["waste_3"]["current_volume"] == 2.5
+
+
+def test_aspirations_up_to_syringe_volume():
+    c.graph["flask_a"]["current_volume"] = 500
+    for i in range(1, 4):
+        c.graph[f"waste_{i}"]["current_volume"] = 0
+
+    steps = c.move_split("flask_a", [("waste_2", 14), ("waste_3", 9)])
+    assert stroke_volumes(steps, "pump1", "sink") == [10, 10, 3]
+    assert sum(stroke_volumes(steps, "pump3", "source")) == 23
+    assert c.graph["flask_a"]["current_volume"] == 477
+    assert c.graph["waste_2"]["current_volume"] == 14
+    assert c.graph["waste_3"]["current_volume"] == 9
+
+
+def test_total_volume_checked():
+    # Every destination fits in the 10 mL pump1 on its own, but not together.
+    with pytest.raises(ChempilerError):
+        c.move_split("pump1", [("waste_2", 6), ("waste_3", 6)])
+
+    steps = c.move_split("pump1", [("waste_2", 4), ("waste_3", 6)])
+    assert stroke_volumes(steps, "pump1", "source") == [4, 6]
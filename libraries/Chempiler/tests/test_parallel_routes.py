@@ -0,0 +1,67 @@
+import os
+
+import ChemputerAPI
+from chempiler import Chempiler
+
+HERE = os.path.dirname(os.path.abspath(__file__))
+# Two routes from flask_a to flask_b sharing no pumps or valves, one through
+# valve1 and valve2 and the other through valve3 and valve4.
+TEST_GRAPH = os.path.join(HERE, "graph_files", "parallel_routes.json")
+
+c = Chempiler(
+    experiment_code="test_parallel_routes",
+    graph_file=TEST_GRAPH,
+    output_dir=".",
+    simulation=True,
+    device_modules=[ChemputerAPI]
+)
+
+
+def withdrawn(pipelined_steps, pumps):
+    return sum(
+        cmd["volume"] for group in pipelined_steps for device, cmd in group
+        if device.name in pumps and cmd["cmd"][0] == "sink"
+    )
+
+
+def test_parallel_route_found():
+    prepared = c.prepare_move("flask_a", "flask_b", parallel_routes=True)
+    assert prepared.parallel_paths
+
+    default_nodes = {
+        step.src for path in prepared.paths for step in path.path}
+    parallel_nodes = {
+        step.src for path in prepared.parallel_paths for step in path.path}
+    assert default_nodes & parallel_nodes == {"flask_a"}
+
+    # Without the option no parallel route is looked for.
+    assert c.prepare_move("flask_a", "flask_b").parallel_paths is None
+
+
+def test_volume_split_across_routes():
+    c.graph["flask_a"]["current_volume"] = 500
+    c.graph["flask_b"]["current_volume"] = 0
+    volume = 210
+    prepared = c.prepare_move("flask_a", "flask_b", parallel_routes=True)
+    single = c.prepare_move("flask_a", "flask_b")
+
+    first, second = prepared.split(volume)
+    assert first and second
+    assert first + second == volume
+    assert prepared.duration(volume) < single.duration(volume)
+
+    steps = prepared.run(volume)
+    assert withdrawn(steps, {"pump1", "pump3"}) == volume
+    assert withdrawn(steps, {"pump1"}) == first
+    assert withdrawn(steps, {"pump3"}) == second
+    assert c.graph["flask_a"]["current_volume"] == 500 - volume
+    assert c.graph["flask_b"]["current_volume"] == volume
+
+    locks = prepared.locks(volume)[0]
+    assert {"pump1", "pump2", "pump3", "pump4"} <= set(locks)
+
+
+def test_small_volume_not_split():
+    prepared = c.prepare_move("flask_a", "flask_b", parallel_routes=True)
+    assert prepared.split(10) == (10, 0)
+    assert "pump3" not in prepared.locks(10)[0]
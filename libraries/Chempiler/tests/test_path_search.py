@@ -0,0 +1,111 @@
+import os
+import logging
+import pytest
+import networkx as nx
+from networkx.exception import NetworkXNoPath
+
+import ChemputerAPI
+from chempiler.tools.graph import ChempilerGraph
+from helpers import as_tuples
+
+HERE = os.path.dirname(os.path.abspath(__file__))
+GRAPH_FOLDER = os.path.join(HERE, "graph_files")
+
+# Graphs that don't load with the simulated ChemputerAPI devices.
+SKIP_GRAPHS = ["carousel.json", "duplicate_node_names.json"]
+
+logger = logging.getLogger("test_path_search")
+
+
+def exhaustive_optimal_path(
+    graph, src, dest, src_port="", dest_port="", use_backbone=True,
+    connect=False, partial_path=False
+):
+    """Reference implementation enumerating every simple path, expanding and
+    filtering them. This is how ChempilerGraph.find_optimal_path used to work.
+    Returns None where find_optimal_path would look for an alternative path.
+    """
+    full_paths = []
+    for path in nx.all_simple_paths(graph.graph, src, dest):
+        try:
+            full_paths.extend(graph.get_full_paths(path))
+        # Edges without ports, e.g. stirrer -> flask
+        except KeyError:
+            return None
+
+    valid_paths = graph.filter_invalid_paths(
+        full_paths, src_port, dest_port, connect=connect,
+        partial_path=partial_path)
+
+    if not valid_paths:
+        return None
+
+    if use_backbone:
+        backbone = graph.backbone
+        for group in [
+            [p for p in valid_paths
+             if p[0].dest in backbone and p[-1].src in backbone],
+            [p for p in valid_paths if p[0].dest in backbone],
+            [p for p in valid_paths if p[-1].src in backbone],
+            valid_paths,
+        ]:
+            if group:
+                return min(group, key=len)
+
+    shortest_path_length = min([len(p) for p in valid_paths])
+    shortest_paths = [
+        p for p in valid_paths if len(p) == shortest_path_length]
+    if len(shortest_paths) == 1:
+        return shortest_paths[0]
+    return exhaustive_optimal_path(
+        graph, src, dest, src_port, dest_port, use_backbone=True,
+        connect=connect)
+
+
+def graph_files():
+    return [
+        f for f in sorted(os.listdir(GRAPH_FOLDER)) if f not in SKIP_GRAPHS]
+
+
+@pytest.mark.parametrize("graph_file", graph_files())
+def test_matches_exhaustive_search(graph_file):
+    """Port state search returns the same path as enumerating every simple
+    path, for every pair of non routing nodes.
+    """
+    graph = ChempilerGraph(
+        os.path.join(GRAPH_FOLDER, graph_file), logger, [ChemputerAPI],
+        simulation=True)
+    ends = [node for node in graph.graph if not graph.node_can_route(node)]
+
+    for src in ends:
+        for dest in ends:
+            if src == dest:
+                continue
+            for kwargs in [
+                {"use_backbone": True},
+                {"use_backbone": False},
+                {"use_backbone": False, "partial_path": True},
+                {"use_backbone": False, "connect": True},
+            ]:
+                expected = exhaustive_optimal_path(graph, src, dest, **kwargs)
+                if expected is None:
+                    continue
+                found = graph.find_optimal_path(src, dest, **kwargs)
+                assert as_tuples(found) == as_tuples(expected), (
+                    src, dest, kwargs)
+
+
+def test_ports_applied_during_search():
+    graph = ChempilerGraph(
+        os.path.join(GRAPH_FOLDER, "DMP_graph_test.json"), logger,
+        [ChemputerAPI], simulation=True)
+
+    path = graph.find_optimal_path(
+        "flask_argon", "filter1", dest_port="bottom", use_backbone=False)
+    assert path[-1].dest_port == "bottom"
+
+    # Valves without pumps can only route through their central port.
+    with pytest.raises(NetworkXNoPath):
+        graph.find_optimal_path(
+            "flask_ether_anhydrous", "filter1", dest_port="top",
+            connect=True, use_backbone=False, src_port=5)
@@ -0,0 +1,41 @@
+import os
+import sys
+
+import ChemputerAPI
+from chempiler import Chempiler
+from helpers import as_names
+
+HERE = os.path.dirname(os.path.abspath(__file__))
+TEST_GRAPH = os.path.join(HERE, "graph_files", "bigrig.json")
+
+c = Chempiler(
+    experiment_code="test_pipeline_chunks",
+    graph_file=TEST_GRAPH,
+    output_dir=".",
+    simulation=True,
+    device_modules=[ChemputerAPI]
+)
+
+
+def test_many_chunks_without_recursion():
+    path = c.graph.find_path("flask_water", "reactor", None, None, [], True)
+    max_volume = c.graph["pump_rotavap"]["max_volume"]
+    recursion_limit = sys.getrecursionlimit()
+    c.graph["pump_rotavap"]["max_volume"] = 0.5
+    # Plenty of frames for the call itself, far fewer than 1000 chunks.
+    sys.setrecursionlimit(200)
+    try:
+        steps = c.pump.pipeline_path(path, 500, 10, 10, 10)
+        trusted_steps = c.pump.pipeline_path(path, 500, 10, 10, 10,
+                                             trusted=True)
+    finally:
+        sys.setrecursionlimit(recursion_limit)
+        c.graph["pump_rotavap"]["max_volume"] = max_volume
+
+    assert as_names(steps) == as_names(trusted_steps)
+    sinks = [
+        cmd["volume"] for group in steps for device, cmd in group
+        if device.name == "pump_rotavap" and cmd["cmd"][0] == "sink"
+    ]
+    assert len(sinks) == 1000
+    assert sum(sinks) == 500
@@ -0,0 +1,75 @@
+import os
+
+import ChemputerAPI
+from chempiler import Chempiler
+from helpers import strokes
+
+HERE = os.path.dirname(os.path.abspath(__file__))
+TEST_GRAPH = os.path.join(HERE, "graph_files", "bigrig.json")
+
+c = Chempiler(
+    experiment_code="test_pipeline_depth",
+    graph_file=TEST_GRAPH,
+    output_dir=".",
+    simulation=True,
+    device_modules=[ChemputerAPI]
+)
+
+
+def pipeline(depth, volume):
+    c.pump.pipeline_depth = depth
+    try:
+        return c.prepare_move("flask_water", "separator").pipeline(volume)
+    finally:
+        c.pump.pipeline_depth = None
+
+
+def test_pipeline_depth():
+    prepared = c.prepare_move("flask_water", "separator")
+    n_steps = len(prepared.paths[0].steps)
+    assert n_steps == 5
+    chunk_volume = c.pump.chunk_volume(prepared.paths)
+    volume = 10 * chunk_volume
+
+    sequential = pipeline(1, volume)
+    staggered = pipeline(2, volume)
+    automatic = pipeline(None, volume)
+
+    # Every chunk is a valve switch and a stroke group per step.
+    assert len(sequential) == 10 * 2 * n_steps
+    # Every chunk starts as soon as the one two before it is done, the second
+    # of each pair two steps after the first.
+    assert len(staggered) == 5 * 2 * n_steps + 4
+    # Each pump is done with a chunk after two steps.
+    assert len(automatic) == 2 * n_steps + 9 * 4
+    assert len(automatic) == len(prepared.pipeline(volume))
+
+    # Same strokes, only scheduled differently.
+    assert sorted(strokes(sequential)) == sorted(strokes(automatic))
+    assert sorted(strokes(staggered)) == sorted(strokes(automatic))
+
+    # Depth beyond what the pumps allow changes nothing.
+    assert len(pipeline(100, volume)) == len(automatic)
+
+
+def test_pumps_take_next_chunk_when_free():
+    def step(*pumps):
+        return [
+            [(c.graph.obj(f"valve_{pump}"), {"cmd": ("route", 0, -1)})
+             for pump in pumps],
+            [(c.graph.obj(f"pump_{pump}"), {"cmd": ("sink", 0)})
+             for pump in pumps],
+        ]
+
+    # pump_reactor is used by three steps, the other pumps by two.
+    chunk = [
+        step("rotavap"), step("rotavap", "reactor"), step("reactor"),
+        step("reactor", "filter"),
+    ]
+
+    # The second chunk is drawn into pump_rotavap as soon as it is free and
+    # waits there until pump_reactor is.
+    assert c.pump.schedule_chunks([chunk, chunk]) == [
+        [0, 2, 4, 6], [4, 8, 10, 12]]
+    assert c.pump.schedule_chunks([chunk, chunk], depth=1) == [
+        [0, 2, 4, 6], [8, 10, 12, 14]]
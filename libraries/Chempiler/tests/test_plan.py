@@ -0,0 +1,53 @@
+import os
+import pickle
+
+import pytest
+import ChemputerAPI
+from chempiler import Chempiler
+from chempiler.tools.graph import ChempilerPathStep
+from chempiler.tools.plan import PlanCommand, compact_plan, expand_plan
+from helpers import as_names
+
+HERE = os.path.dirname(os.path.abspath(__file__))
+TEST_GRAPH = os.path.join(HERE, "graph_files", "bigrig.json")
+
+c = Chempiler(
+    experiment_code="test_plan",
+    graph_file=TEST_GRAPH,
+    output_dir=".",
+    simulation=True,
+    device_modules=[ChemputerAPI]
+)
+
+
+def test_path_steps_immutable_and_hashable():
+    step = ChempilerPathStep("valve_reactor", "reactor", 1, 0)
+    with pytest.raises(AttributeError):
+        step.src = "reactor"
+    with pytest.raises(AttributeError):
+        step.speed = 10
+
+    same = ChempilerPathStep("valve_reactor", "reactor", 1, 0)
+    assert step == same
+    assert len({step, same}) == 1
+    assert pickle.loads(pickle.dumps(step)) == step
+
+
+def test_plan_round_trip():
+    path = c.graph.find_path("flask_water", "reactor", None, None, [], True)
+    before = list(path)
+    pipelined_steps = c.pump.pipeline_path(path, 60, 10, 10, 10)
+    # Path is shared with the route cache, so it mustn't change.
+    assert path == before
+
+    plan = compact_plan(pipelined_steps, c.graph.topology)
+    assert plan == compact_plan(pipelined_steps, c.graph.topology)
+    assert hash(plan) == hash(pickle.loads(pickle.dumps(plan)))
+    assert as_names(expand_plan(plan, c.graph)) == as_names(pipelined_steps)
+
+    command = plan[0][0]
+    assert isinstance(command, PlanCommand)
+    with pytest.raises(AttributeError):
+        command.volume = 1
+    expand_plan(plan, c.graph)[0][0][1]["cmd"] = ("route", 5, 5)
+    assert plan[0][0] == command
@@ -0,0 +1,91 @@
+import os
+import time
+import types
+import logging
+import threading
+
+import pytest
+import ChemputerAPI
+from ChemputerAPI.device import ChemputerDeviceError
+from SerialLabware.serial_labware import SerialDevice
+from chempiler.tools.graph import ChempilerGraph
+from chempiler.tools.errors import ChempilerError
+
+HERE = os.path.dirname(os.path.abspath(__file__))
+GRAPH_FILE = os.path.join(HERE, "graph_files", "pump_then_valves.json")
+
+logger = logging.getLogger("test_populate")
+
+
+def device_module(fail_valve=None):
+    """Module of fake valves and pumps that take a while to come up."""
+    lock = threading.Lock()
+    ready_valves = []
+    pump_saw = []
+
+    class ChemputerValve(ChemputerAPI.ChemputerDevice):
+        capabilities = ChemputerAPI.ChemputerValve.capabilities
+
+        def __init__(self, name, **kwargs):
+            super().__init__(name)
+            if name == fail_valve:
+                raise ChemputerDeviceError(f"{name} is broken")
+
+        def wait_until_ready(self):
+            time.sleep(0.2)
+            with lock:
+                ready_valves.append(self.name)
+
+    class ChemputerPump(ChemputerAPI.ChemputerDevice):
+        capabilities = ChemputerAPI.ChemputerPump.capabilities
+
+        def __init__(self, name, **kwargs):
+            super().__init__(name)
+            with lock:
+                pump_saw.append(list(ready_valves))
+
+    module = types.ModuleType("fake_devices")
+    module.ChemputerValve = ChemputerValve
+    module.ChemputerPump = ChemputerPump
+    return module, ready_valves, pump_saw
+
+
+def test_valves_ready_before_pumps():
+    module, ready_valves, pump_saw = device_module()
+
+    start = time.time()
+    ChempilerGraph(GRAPH_FILE, logger, [ChemputerAPI, module])
+    # Three valves wait 0.2 s each, concurrently.
+    assert time.time() - start < 0.5
+
+    assert len(ready_valves) == 3
+    assert pump_saw == [ready_valves]
+
+
+def test_failures_reported_together():
+    module, _, pump_saw = device_module(fail_valve="valve2")
+
+    with pytest.raises(ChempilerError) as e:
+        ChempilerGraph(GRAPH_FILE, logger, [ChemputerAPI, module])
+
+    assert "valve2 is broken" in str(e.value)
+    assert "pump" in str(e.value)
+    assert not pump_saw
+
+
+def test_serial_devices_concurrent():
+    module, _, _ = device_module()
+    threads = []
+
+    class ChemputerFilter(SerialDevice, ChemputerAPI.ChemputerFilter):
+        def __init__(self, name, **kwargs):
+            ChemputerAPI.ChemputerFilter.__init__(self, name)
+            threads.append(threading.current_thread())
+
+    module.ChemputerFilter = ChemputerFilter
+    graph = ChempilerGraph(GRAPH_FILE, logger, [ChemputerAPI, module])
+
+    # Commands from any thread are queued on the device's command handler,
+    # so SerialLabware devices come up in the pool like any other node.
+    assert threads[0].name.startswith("populate")
+    assert isinstance(graph.obj("filter"), ChemputerFilter)
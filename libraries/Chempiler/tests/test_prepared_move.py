@@ -0,0 +1,84 @@
+import os
+import pickle
+
+import ChemputerAPI
+from chempiler import Chempiler
+from chempiler.tools.step_dag import lockstep_duration
+from helpers import as_names
+
+HERE = os.path.dirname(os.path.abspath(__file__))
+TEST_GRAPH = os.path.join(HERE, "graph_files", "bigrig.json")
+
+c = Chempiler(
+    experiment_code="test_prepared_move",
+    graph_file=TEST_GRAPH,
+    output_dir=".",
+    simulation=True,
+    device_modules=[ChemputerAPI]
+)
+
+MOVES = [
+    ("flask_water", "reactor", {}),
+    ("flask_ether", "separator", {"dest_port": "top", "speed": 20}),
+    ("flask_water", "pump_filter", {}),
+]
+
+
+def test_run_matches_move():
+    for src, dest, kwargs in MOVES:
+        prepared = c.prepare_move(src, dest, **kwargs)
+        for volume in (3, 10, 27.5):
+            assert as_names(prepared.run(volume)) == as_names(
+                c.move(src, dest, volume, **kwargs))
+
+
+def test_path_found_once():
+    calls = []
+    find_path = c.graph.find_path
+
+    def counting_find_path(*args, **kwargs):
+        calls.append(args)
+        return find_path(*args, **kwargs)
+
+    c.graph.find_path = counting_find_path
+    try:
+        prepared = c.prepare_move("flask_water", "reactor")
+        for volume in (1, 5, 50):
+            prepared.run(volume)
+            prepared.duration(volume)
+        prepared.locks()
+    finally:
+        del c.graph.find_path
+    assert len(calls) == 1
+
+
+def test_duration_and_locks():
+    prepared = c.prepare_move("flask_water", "reactor", speed=30)
+    steps = prepared.run(40)
+    assert prepared.duration(40) == lockstep_duration(
+        steps, c.pump.cmd_duration)
+    assert prepared.duration(40) == c.move_duration(
+        "flask_water", "reactor", 40, speed=30)
+    assert prepared.duration(80) > prepared.duration(40)
+
+    locks, ongoing_locks, unlocks = prepared.locks()
+    move_locks = c.move_locks("flask_water", "reactor", 40)
+    assert set(locks) == set(move_locks[0])
+    assert (ongoing_locks, unlocks) == move_locks[1:]
+    used = {device.name for group in steps for device, _ in group}
+    assert used <= set(locks)
+    assert ongoing_locks == ["reactor"]
+
+
+def test_plans_cached():
+    prepared = c.prepare_move("flask_water", "reactor")
+    plan = prepared.plan(25)
+    assert prepared.plan(25) is plan
+    assert pickle.loads(pickle.dumps(plan)) == plan
+    assert as_names(prepared.pipeline(25)) == as_names(
+        c.move("flask_water", "reactor", 25))
+
+    # Plans made for an older topology aren't reused.
+    c.graph.invalidate_route_cache()
+    assert prepared.plan(25) is not plan
+    assert prepared.plan(25) == plan
@@ -0,0 +1,61 @@
+import os
+import pytest
+import ChemputerAPI
+from chempiler import Chempiler
+from helpers import as_tuples
+
+HERE = os.path.dirname(os.path.abspath(__file__))
+TEST_GRAPH = os.path.join(HERE, "graph_files", "DMP_graph_test.json")
+
+c = Chempiler(
+    experiment_code="test_suite",
+    graph_file=TEST_GRAPH,
+    output_dir=".",
+    simulation=True,
+    device_modules=[ChemputerAPI]
+)
+
+
+def test_cached_path_is_copy():
+    graph = c.graph
+    graph.invalidate_route_cache()
+    hits, misses = graph.route_cache.hits, graph.route_cache.misses
+
+    path = graph.find_path("flask_oxone_aq", "rotavap")
+    expected = as_tuples(path)
+    assert graph.route_cache.misses == misses + 1
+
+    # Mutating returned paths must not corrupt the cache.
+    path.pop()
+    with pytest.raises(AttributeError):
+        path[0].src = "nowhere"
+
+    cached_path = graph.find_path("flask_oxone_aq", "rotavap")
+    assert graph.route_cache.hits == hits + 1
+    assert as_tuples(cached_path) == expected
+
+
+def test_through_paths_cached():
+    graph = c.graph
+    graph.invalidate_route_cache()
+
+    path = graph.find_path(
+        "flask_oxone_aq", "rotavap", through=["valve_separator"])
+    hits = graph.route_cache.hits
+    cached_path = graph.find_path(
+        "flask_oxone_aq", "rotavap", through=["valve_separator"])
+    assert graph.route_cache.hits == hits + 1
+    assert as_tuples(cached_path) == as_tuples(path)
+
+
+def test_lock_change_invalidates_cache():
+    graph = c.graph
+    graph.find_path("flask_oxone_aq", "rotavap")
+    assert len(graph.route_cache)
+
+    c.acquire_lock(["valve_filter"], "test")
+    assert not len(graph.route_cache)
+
+    graph.find_path("flask_oxone_aq", "rotavap")
+    c.release_lock(["valve_filter"], "test")
+    assert not len(graph.route_cache)
@@ -0,0 +1,48 @@
+import os
+import logging
+
+import ChemputerAPI
+from chempiler.tools.graph import ChempilerGraph
+from helpers import as_tuples
+
+HERE = os.path.dirname(os.path.abspath(__file__))
+GRAPH_FILE = os.path.join(HERE, "graph_files", "DMP_graph_test.json")
+
+logger = logging.getLogger("test_route_table")
+
+
+def test_route_table_matches_live_search(tmp_path):
+    cache_file = str(tmp_path / "routes")
+    graph = ChempilerGraph(GRAPH_FILE, logger, [ChemputerAPI], simulation=True)
+    graph.precompute_route_table(processes=2, cache_file=cache_file)
+    assert graph.route_table
+    assert os.path.exists(cache_file)
+
+    live_graph = ChempilerGraph(
+        GRAPH_FILE, logger, [ChemputerAPI], simulation=True)
+    for key in graph.route_table:
+        src, dest, src_port, dest_port, use_backbone = key
+        misses = graph.route_cache.misses
+        path = graph.find_path(src, dest, src_port, dest_port)
+        assert graph.route_cache.misses == misses
+        assert as_tuples(path) == as_tuples(
+            live_graph.find_path(src, dest, src_port, dest_port))
+
+
+def test_route_table_loaded_from_cache(tmp_path):
+    cache_file = str(tmp_path / "routes")
+    graph = ChempilerGraph(GRAPH_FILE, logger, [ChemputerAPI], simulation=True)
+    graph.precompute_route_table(processes=1, cache_file=cache_file)
+
+    # Cache file from a different graph is ignored.
+    other_graph = ChempilerGraph(
+        os.path.join(HERE, "graph_files", "bigrig.json"), logger,
+        [ChemputerAPI], simulation=True)
+    other_graph.precompute_route_table(processes=1, cache_file=cache_file)
+    assert other_graph.route_table != graph.route_table
+
+    graph.precompute_route_table(processes=1, cache_file=cache_file)
+    cached_graph = ChempilerGraph(
+        GRAPH_FILE, logger, [ChemputerAPI], simulation=True)
+    cached_graph.precompute_route_table(cache_file=cache_file)
+    assert cached_graph.route_table == graph.route_table
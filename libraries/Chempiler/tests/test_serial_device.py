@@ -0,0 +1,194 @@
+import re
+import socket
+import threading
+import time
+from concurrent.futures import Future
+from queue import Empty
+
+import pytest
+from SerialLabware.serial_labware import SerialDevice, command, gather
+
+
+class EchoServer:
+    """Device on a local socket replying to every line with ECHO and the
+    line, after the number of seconds given by a line DELAY <seconds>.
+    SPLIT is echoed in two segments, LINES <n> is answered with n lines and
+    END.
+    """
+    def __init__(self):
+        self.server = socket.socket()
+        self.server.bind(("127.0.0.1", 0))
+        self.server.listen(1)
+        self.port = self.server.getsockname()[1]
+        self.received = []
+        threading.Thread(target=self.serve, daemon=True).start()
+
+    def serve(self):
+        connection, _ = self.server.accept()
+        buffer = b""
+        while True:
+            data = connection.recv(4096)
+            if not data:
+                break
+            buffer += data
+            while b"\r\n" in buffer:
+                line, buffer = buffer.split(b"\r\n", 1)
+                line = line.decode()
+                self.received.append(line)
+                if line.startswith("DELAY"):
+                    time.sleep(float(line.split()[1]))
+                if line == "SPLIT":
+                    connection.sendall(b"ECHO SP")
+                    time.sleep(0.1)
+                    connection.sendall(b"LIT\r\n")
+                elif line.startswith("LINES"):
+                    for i in range(int(line.split()[1])):
+                        connection.sendall(f"L{i}\r\n".encode())
+                        time.sleep(0.02)
+                    connection.sendall(b"END\r\n")
+                else:
+                    connection.sendall(f"ECHO {line}\r\n".encode())
+
+
+class EchoDevice(SerialDevice):
+    def __init__(self, port, timeout=0.05):
+        self.timeout = timeout
+        self.keepalive_interval = 0.1
+        self.keepalives = []
+        super().__init__("127.0.0.1", port, "ethernet", "echo", True)
+
+    def keepalive(self):
+        self.keepalives.append(time.monotonic())
+
+    @command
+    def echo(self, message):
+        return self.send_message(message, True)
+
+    @command
+    def lines(self, n):
+        return self.send_message(
+            f"LINES {n}", True, re.compile(r"((?:L\d+\r\n)*)END\r\n"), True)
+
+    @command
+    def fail(self):
+        raise ValueError("broken")
+
+    @property
+    @command
+    def delay(self):
+        return self.send_message("DELAY 0", True)
+
+    @delay.setter
+    @command
+    def delay(self, seconds):
+        self.send_message(f"DELAY {seconds}", True)
+
+
+@pytest.fixture
+def device():
+    device = EchoDevice(EchoServer().port)
+    yield device
+    device.disconnect()
+
+
+def test_keepalive_on_timer(device):
+    start = time.monotonic()
+    time.sleep(0.55)
+    # Commands are sent without waiting for a keepalive.
+    assert device.echo("a") == "ECHO a"
+    assert time.monotonic() - start < 1
+    assert 3 <= len(device.keepalives) <= 7
+
+
+def test_reply_goes_to_caller():
+    # The device takes longer to reply than the caller waits.
+    device = EchoDevice(EchoServer().port, timeout=0.5)
+    try:
+        device.reply_timeout = 0.1
+        with pytest.raises(Empty):
+            device.echo("DELAY 0.3")
+        device.reply_timeout = 10
+
+        # The late reply to the call that timed out isn't handed to the next
+        # one.
+        assert device.echo("b") == "ECHO b"
+    finally:
+        device.disconnect()
+
+
+def test_concurrent_callers(device):
+    replies = {}
+
+    def call(i):
+        replies[i] = device.echo(f"m{i}")
+
+    threads = [threading.Thread(target=call, args=(i,)) for i in range(8)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    assert replies == {i: f"ECHO m{i}" for i in range(8)}
+
+
+def test_exception_raised_to_caller(device):
+    with pytest.raises(ValueError, match="broken"):
+        device.fail()
+    assert device.echo("c") == "ECHO c"
+
+
+def test_submit_returns_future(device):
+    reply = device.echo.submit("d")
+    assert isinstance(reply, Future)
+    assert reply.result(timeout=1) == "ECHO d"
+
+
+def test_gather_runs_devices_at_once():
+    devices = [EchoDevice(EchoServer().port, timeout=0.5) for _ in range(3)]
+    try:
+        start = time.monotonic()
+        replies = gather(*(device.echo.submit("DELAY 0.3")
+                           for device in devices))
+        # Three 0.3 s commands on three devices, concurrently.
+        assert time.monotonic() - start < 0.6
+        assert replies == ["ECHO DELAY 0.3"] * 3
+    finally:
+        for device in devices:
+            device.disconnect()
+
+
+def test_gather_timeout(device):
+    device.timeout = 0.5
+    queued = device.echo.submit("DELAY 0.3")
+    with pytest.raises(Empty):
+        gather(device.echo.submit("e"), queued, timeout=0.1)
+
+
+def test_submit_by_name(device):
+    assert device.submit("echo", "f").result(timeout=1) == "ECHO f"
+    assert device.submit("delay", 0).result(timeout=1) is None
+    assert device.submit("delay").result(timeout=1) == "ECHO DELAY 0"
+    device.delay = 0
+    assert device.delay == "ECHO DELAY 0"
+
+
+def test_reply_framed_by_termination():
+    device = EchoDevice(EchoServer().port, timeout=1)
+    try:
+        start = time.monotonic()
+        assert device.echo("g") == "ECHO g"
+        assert device.echo("SPLIT") == "ECHO SPLIT"
+        # Replies don't wait for the 1 s timeout.
+        assert time.monotonic() - start < 0.5
+    finally:
+        device.disconnect()
+
+
+def test_multiline_reply_framed_by_pattern():
+    device = EchoDevice(EchoServer().port, timeout=1)
+    try:
+        start = time.monotonic()
+        assert device.lines(3) == ("L0\r\nL1\r\nL2\r\n",)
+        assert time.monotonic() - start < 0.5
+        assert device.echo("h") == "ECHO h"
+    finally:
+        device.disconnect()
@@ -0,0 +1,62 @@
+import os
+import shutil
+import logging
+
+import ChemputerAPI
+from chempiler.tools.graph import ChempilerGraph
+from chempiler.tools.snapshot import snapshot_file
+
+HERE = os.path.dirname(os.path.abspath(__file__))
+GRAPH_FILE = os.path.join(HERE, "graph_files", "AlkylFluor_graph.graphml")
+
+logger = logging.getLogger("test_snapshot")
+
+
+def graph_data(graph):
+    nodes = [
+        (node, {k: v for k, v in data.items() if k != "obj"})
+        for node, data in graph.graph.nodes(data=True)
+    ]
+    return nodes, list(graph.graph.edges(keys=True, data=True))
+
+
+def test_snapshot_matches_graph_file(tmp_path):
+    graph_file = str(tmp_path / "graph.graphml")
+    shutil.copy(GRAPH_FILE, graph_file)
+
+    expected = ChempilerGraph(
+        graph_file, logger, [ChemputerAPI], simulation=True)
+    assert not os.path.exists(snapshot_file(graph_file))
+
+    written = ChempilerGraph(
+        graph_file, logger, [ChemputerAPI], simulation=True,
+        use_snapshot=True)
+    assert os.path.exists(snapshot_file(graph_file))
+
+    loaded = ChempilerGraph(
+        graph_file, logger, [ChemputerAPI], simulation=True,
+        use_snapshot=True)
+    for graph in [written, loaded]:
+        assert graph_data(graph) == graph_data(expected)
+        assert sorted(graph.backbone) == sorted(expected.backbone)
+
+    # Raw graph is loaded on demand.
+    assert loaded._raw_graph is None
+    assert len(loaded.raw_graph) == len(expected.raw_graph)
+
+
+def test_snapshot_ignored_after_graph_file_changes(tmp_path):
+    graph_file = str(tmp_path / "graph.json")
+    shutil.copy(
+        os.path.join(HERE, "graph_files", "DMP_graph_test.json"), graph_file)
+    ChempilerGraph(
+        graph_file, logger, [ChemputerAPI], simulation=True,
+        use_snapshot=True)
+
+    shutil.copy(os.path.join(HERE, "graph_files", "bigrig.json"), graph_file)
+    graph = ChempilerGraph(
+        graph_file, logger, [ChemputerAPI], simulation=True,
+        use_snapshot=True)
+    expected = ChempilerGraph(
+        graph_file, logger, [ChemputerAPI], simulation=True)
+    assert graph_data(graph) == graph_data(expected)
@@ -0,0 +1,128 @@
+import os
+import time
+import threading
+
+import ChemputerAPI
+from chempiler import Chempiler
+from chempiler.tools.step_dag import StepDAG
+
+HERE = os.path.dirname(os.path.abspath(__file__))
+TEST_GRAPH = os.path.join(HERE, "graph_files", "bigrig.json")
+
+c = Chempiler(
+    experiment_code="test_step_dag",
+    graph_file=TEST_GRAPH,
+    output_dir=".",
+    simulation=True,
+    device_modules=[ChemputerAPI]
+)
+
+
+class TimedDevice:
+    """Takes volume / speed minutes, scaled down, to move liquid and a fixed
+    time to switch, and records when it was busy."""
+    def __init__(self, name, log, lock, scale):
+        self.name = name
+        self.scale = scale
+        self.log = log
+        self.lock = lock
+        self.done = 0
+
+    def execute(self, cmd, volume=None, speed=None, **kwargs):
+        start = time.monotonic()
+        if volume is None:
+            self.done = start + 0.02
+        else:
+            self.done = start + volume / speed * 60 * self.scale
+        with self.lock:
+            self.log.append((self.name, start, self.done))
+
+    def wait_until_ready(self):
+        time.sleep(max(self.done - time.monotonic(), 0))
+
+
+def timed(pipelined_steps, scale=0.001):
+    log, lock, devices = [], threading.Lock(), {}
+    steps = []
+    for step_group in pipelined_steps:
+        steps.append([])
+        for device, cmd in step_group:
+            if device.name not in devices:
+                devices[device.name] = TimedDevice(
+                    device.name, log, lock, scale)
+            steps[-1].append((devices[device.name], cmd))
+    return steps, log
+
+
+def resource(name):
+    pump = c.graph.get_pump_from_valve_name(name)
+    return pump.name if pump else name
+
+
+def test_transfers_coupled():
+    steps = c.pump.move("flask_water", "separator", 25)
+    dag = StepDAG(steps, c.graph.topology)
+    units = [sorted(device.name for device, _ in unit) for unit in dag.units]
+    assert ["pump_reactor", "pump_rotavap"] in units
+    assert ["pump_filter", "pump_reactor"] in units
+    assert c.pump.execution_times["executor"] == "dag"
+
+
+def test_commands_on_same_hardware_ordered():
+    steps = c.pump.move("flask_water", "separator", 120)
+    dag = StepDAG(steps, c.graph.topology)
+
+    ancestors = []
+    for deps in dag.deps:
+        ancestors.append(set(deps).union(*(ancestors[dep] for dep in deps)))
+
+    last = {}
+    for index, unit in enumerate(dag.units):
+        for device, _ in unit:
+            key = resource(device.name)
+            if key in last:
+                assert last[key] in ancestors[index]
+            last[key] = index
+
+
+def test_hardware_never_busy_twice():
+    steps, log = timed(c.pump.move("flask_water", "separator", 120))
+    c.pump.execute_pipelined_steps(steps)
+
+    intervals = {}
+    for name, start, end in log:
+        intervals.setdefault(resource(name), []).append((start, end))
+    for busy in intervals.values():
+        busy.sort()
+        for (_, end), (start, _) in zip(busy, busy[1:]):
+            assert start >= end - 1e-3
+
+
+def test_dag_faster_than_lockstep():
+    obj = c.graph.obj
+    route = {"cmd": ("route", 0, -1)}
+    # pump_rotavap does short strokes while pump_filter does a long one.
+    steps, _ = timed([
+        [(obj("valve_rotavap"), route), (obj("valve_filter"), route)],
+        [
+            (obj("pump_rotavap"), {"cmd": ("sink", 0), "volume": 1, "speed": 40}),
+            (obj("pump_filter"), {"cmd": ("sink", 0), "volume": 20, "speed": 40}),
+        ],
+        [(obj("valve_rotavap"), {"cmd": ("route", 1, -1)})],
+        [(obj("pump_rotavap"), {"cmd": ("source", 0), "volume": 1, "speed": 40})],
+        [(obj("valve_rotavap"), route)],
+        [(obj("pump_rotavap"), {"cmd": ("sink", 0), "volume": 1, "speed": 40})],
+    ], scale=0.01)
+
+    c.pump.lockstep = True
+    try:
+        c.pump.execute_pipelined_steps(steps)
+    finally:
+        c.pump.lockstep = False
+    lockstep_time = c.pump.execution_times["wall_time"]
+
+    c.pump.execute_pipelined_steps(steps)
+    times = c.pump.execution_times
+    assert times["executor"] == "dag"
+    assert times["dag_estimate"] < times["lockstep_estimate"]
+    assert times["wall_time"] < lockstep_time - 0.03
@@ -0,0 +1,49 @@
+import math
+import os
+
+import ChemputerAPI
+from chempiler import Chempiler
+from helpers import stroke_volumes
+
+HERE = os.path.dirname(os.path.abspath(__file__))
+# Two routes from flask_a to flask_b, the shorter through the 10 mL pump2 and
+# the other through the 50 mL pump4.
+TEST_GRAPH = os.path.join(HERE, "graph_files", "syringe_chunking.json")
+
+c = Chempiler(
+    experiment_code="test_syringe_chunking",
+    graph_file=TEST_GRAPH,
+    output_dir=".",
+    simulation=True,
+    device_modules=[ChemputerAPI]
+)
+
+
+def test_chunked_by_smallest_syringe_on_path():
+    assert c.pump.max_volume == 10
+
+    # Path only uses 50 mL pumps.
+    assert stroke_volumes(c.move("flask_a", "flask_c", 100), "pump1") == [50, 50]
+
+    # Path goes through the 10 mL pump.
+    assert stroke_volumes(c.move("flask_a", "flask_b", 30), "pump1") == [10] * 3
+
+
+def test_prefer_large_syringes():
+    prepared = c.prepare_move("flask_a", "flask_b", prefer_large_syringes=True)
+    assert len(prepared.alternatives) == 1
+
+    # No fewer strokes through pump4, so the shorter default path is used.
+    steps = prepared.run(8)
+    assert stroke_volumes(steps, "pump2") == [8]
+    assert not stroke_volumes(steps, "pump4")
+
+    steps = prepared.run(75)
+    assert stroke_volumes(steps, "pump4") == [50, 25]
+    assert not stroke_volumes(steps, "pump2")
+    assert "pump4" in prepared.locks(75)[0]
+    assert "pump4" not in prepared.locks(8)[0]
+
+    # Without the preference the default path is always used.
+    assert len(stroke_volumes(c.move("flask_a", "flask_b", 75), "pump1")) == (
+        math.ceil(75 / 10))
@@ -0,0 +1,69 @@
+import os
+import logging
+import networkx as nx
+
+import ChemputerAPI
+from chempiler.tools.graph import ChempilerGraph
+from chempiler.tools.topology import FLASK, PUMP, ROUTING, VALVE
+
+HERE = os.path.dirname(os.path.abspath(__file__))
+GRAPH_FILE = os.path.join(HERE, "graph_files", "DMP_graph_test.json")
+
+logger = logging.getLogger("test_topology")
+
+graph = ChempilerGraph(GRAPH_FILE, logger, [ChemputerAPI], simulation=True)
+
+
+def test_roles_match_capabilities():
+    topology = graph.topology
+    for node in graph.graph:
+        capabilities = getattr(graph[node]["obj"], "capabilities", [])
+        assert topology.has_role(node, PUMP) == ("pump" in capabilities)
+        assert topology.has_role(node, ROUTING) == any(
+            item[0] == "route" for item in capabilities)
+        assert topology.has_role(node, VALVE) == graph.node_is_valve(node)
+
+    assert topology.has_role("flask_argon", FLASK)
+    assert not topology.has_role("pump_filter", FLASK)
+
+
+def test_edge_ports_match_edges():
+    topology = graph.topology
+    for src, dest in set(graph.graph.edges()):
+        expected = [
+            data["port"] for u, v, data in graph.edges.data()
+            if u == src and v == dest
+        ]
+        assert list(topology.edge_ports(src, dest)) == expected
+
+
+def test_valve_pumps():
+    for node in graph.graph:
+        pumps = [
+            neighbor for neighbor in graph.graph.neighbors(node)
+            if graph.node_can_pump(neighbor)
+        ]
+        pump = graph.get_pump_from_valve_name(node)
+        if pumps:
+            assert pump is graph[pumps[0]]["obj"]
+        else:
+            assert pump is None
+
+
+def test_rebuilt_after_invalidation():
+    topology = graph.topology
+    assert graph.topology is topology
+
+    graph.invalidate_route_cache()
+    assert graph.topology is not topology
+
+
+def test_nearest_pumps():
+    pumps = [node for node in graph.graph if graph.node_can_pump(node)]
+    for src in graph.graph:
+        lengths = nx.single_source_shortest_path_length(graph.graph, src)
+        expected = sorted(
+            [pump for pump in pumps if pump in lengths],
+            key=lambda pump: (lengths[pump], pumps.index(pump)))
+        assert graph.topology.nearest_pumps(src) == expected
+        assert graph.topology.nearest_pumps(src, k=1) == expected[:1]
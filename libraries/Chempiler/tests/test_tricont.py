@@ -0,0 +1,95 @@
+import socket
+import threading
+import time
+
+import pytest
+from ChemputerAPI import execute_group
+from ChemputerAPI.tricont import ChemputerTricontC3000, TricontBus
+from SerialLabware import C3000
+from SerialLabware.devices.Tricontinent.C3000_commands import C3000ProtocolError
+
+
+class DTServer:
+    """RS-485 bus of Tricont pumps on a local socket. Every command makes the
+    pump busy for 0.2 s, a plunger move of 9999 increments overloads it.
+    """
+    def __init__(self):
+        self.server = socket.socket()
+        self.server.bind(("127.0.0.1", 0))
+        self.server.listen(1)
+        self.port = self.server.getsockname()[1]
+        self.received = []
+        self.busy_until = {}
+        self.errors = {}
+        threading.Thread(target=self.serve, daemon=True).start()
+
+    def status(self, address):
+        status = 0x40 | self.errors.get(address, 0)
+        if time.monotonic() >= self.busy_until.get(address, 0):
+            status |= 0x20
+        return chr(status)
+
+    def serve(self):
+        connection, _ = self.server.accept()
+        buffer = b""
+        while True:
+            data = connection.recv(4096)
+            if not data:
+                break
+            buffer += data
+            while b"\r\n" in buffer:
+                line, buffer = buffer.split(b"\r\n", 1)
+                line = line.decode()
+                address, commands = line[1], line[2:]
+                reply = f"/0{self.status(address)}\x03\r\n"
+                if commands != "?Q":
+                    self.received.append((address, commands))
+                    self.busy_until[address] = time.monotonic() + 0.2
+                    if "P9999" in commands:
+                        self.errors[address] = 0b1001
+                connection.sendall(reply.encode())
+
+
+@pytest.fixture
+def bus():
+    server = DTServer()
+    device = C3000(server.port, "tricont bus", address="127.0.0.1",
+                   mode="ethernet")
+    device.write_delay = device.read_delay = 0
+    TricontBus.BUSES["bus"] = TricontBus(device)
+    yield server
+    TricontBus.BUSES.pop("bus")
+    device.disconnect()
+
+
+def test_commands_reach_pumps(bus):
+    pump1 = ChemputerTricontC3000("bus", 0, name="pump1", max_volume=5)
+    pump2 = ChemputerTricontC3000("bus", 1, name="pump2", max_volume=5)
+    valve = ChemputerTricontC3000("bus", 2, name="valve", has_pump=False)
+
+    start = time.monotonic()
+    execute_group([
+        (pump1, {"cmd": ("sink", 1), "volume": 2.5, "speed": 30}),
+        (pump2, {"cmd": ("source", 0), "volume": 1, "speed": 10}),
+        (valve, {"cmd": ("route", -1, 3)}),
+    ]).result()
+    # All pumps move at once, one command each.
+    assert time.monotonic() - start < 1
+    assert sorted(bus.received) == [
+        ("1", "I2V300P1500R"), ("1", "Z0,0,0R"),
+        ("2", "I1V100D600R"), ("2", "Z0,0,0R"),
+        ("3", "I4R"), ("3", "Z0,0,0R"),
+    ]
+
+
+def test_pump_error_raised(bus):
+    pump = ChemputerTricontC3000("bus", 0, name="pump", max_volume=10)
+    pump.execute(("sink", 0), volume=10 * 9999 / 3000, speed=10)
+    with pytest.raises(C3000ProtocolError, match="overload"):
+        pump.wait_until_ready()
+
+
+def test_syringe_volume_required(bus):
+    with pytest.raises(ValueError):
+        ChemputerTricontC3000("bus", 0, name="pump")
+    assert not bus.received
@@ -1,4 +1,4 @@
-from .device import ChemputerDevice
+from .device import ChemputerDevice, CommandGroup, execute_group
 from .flasks import *
 from .pump_valve_api import ChemputerPump, ChemputerValve, SimChemputerPump, SimChemputerValve
 from .tricont import SimChemputerTricontC3000, ChemputerTricontC3000
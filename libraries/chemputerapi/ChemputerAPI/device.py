@@ -1,4 +1,10 @@
 import logging
+import threading
+from concurrent.futures import ThreadPoolExecutor
+
+# threads sending commands and waiting for devices in `execute_group`
+DISPATCH_WORKERS = 64
+
 
 class ChemputerDevice:
     """Fallback functionality for Chemputer devices."""
@@ -17,3 +23,99 @@ class ChemputerDevice:
 
 class ChemputerDeviceError(Exception):
     pass
+
+
+class CommandGroup:
+    """
+    Handle to a group of commands sent by `execute_group`. Finishes once every device in the group has finished its
+    command.
+
+    Args:
+        futures (List[concurrent.futures.Future]): One future per command, each finishing when its device is ready
+    """
+    def __init__(self, futures):
+        self.futures = futures
+        self._lock = threading.Lock()
+        self._callbacks = []
+        self._remaining = len(futures)
+        for future in futures:
+            future.add_done_callback(self._future_done)
+
+    def _future_done(self, future):
+        with self._lock:
+            self._remaining -= 1
+            if self._remaining:
+                return
+            callbacks, self._callbacks = self._callbacks, []
+        for callback in callbacks:
+            callback(self)
+
+    def done(self):
+        """ True once every command in the group has finished """
+        with self._lock:
+            return self._remaining == 0
+
+    def add_done_callback(self, callback):
+        """
+        Calls `callback(group)` once every command in the group has finished, straight away if they already have.
+
+        Args:
+            callback (Callable[[CommandGroup], None]): Function to call
+        """
+        with self._lock:
+            if self._remaining:
+                self._callbacks.append(callback)
+                return
+        callback(self)
+
+    def result(self, timeout=None):
+        """
+        Waits for every command in the group to finish.
+
+        Args:
+            timeout (float): Seconds to wait for each device, None waits indefinitely
+
+        Raises:
+            Exception: The first error, in command order, raised by a device while executing or waiting
+        """
+        errors = []
+        for future in self.futures:
+            error = future.exception(timeout)
+            if error is not None:
+                errors.append(error)
+        if errors:
+            raise errors[0]
+
+
+_dispatch_pool = None
+_dispatch_pool_lock = threading.Lock()
+
+
+def _get_dispatch_pool():
+    global _dispatch_pool
+    with _dispatch_pool_lock:
+        if _dispatch_pool is None:
+            _dispatch_pool = ThreadPoolExecutor(max_workers=DISPATCH_WORKERS, thread_name_prefix="device dispatch")
+        return _dispatch_pool
+
+
+def _execute_and_wait(device, cmd):
+    device.execute(**cmd)
+    device.wait_until_ready()
+
+
+def execute_group(commands):
+    """
+    Sends a group of commands to different devices at the same time. Each device runs `execute` and then
+    `wait_until_ready` on a shared thread pool, so no command waits on another device before being sent, and round
+    trips made by `execute` before sending overlap.
+
+    Args:
+        commands (List[Tuple[ChemputerDevice, Dict]]): (device, keyword arguments for `device.execute`) pairs. Every
+            device must only appear once.
+
+    Returns:
+        group (CommandGroup): Handle finishing when every device has finished its command
+    """
+    pool = _get_dispatch_pool()
+    return CommandGroup([pool.submit(_execute_and_wait, device, cmd) for device, cmd in commands])
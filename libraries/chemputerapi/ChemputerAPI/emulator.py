@@ -0,0 +1,462 @@
+# coding=utf-8
+# !/usr/bin/env python
+"""
+"emulator" -- Local firmware emulator for Chemputer pumps and valves
+====================================================================
+
+.. module:: emulator
+   :platform: Unix
+   :synopsis: Serve the Chemputer pump and valve firmware protocol over local TCP connections.
+
+(c) 2019 The Cronin Group, University of Glasgow. This work is licensed under BSD 3-clause.
+
+`SimChemputerPump` and `SimChemputerValve` skip the network entirely. The emulator instead listens on the firmware's
+TCP port and speaks its null-terminated protocol, so the real `ChemputerPump` and `ChemputerValve` can be driven, and
+benchmarked, end to end without hardware.
+
+The device classes always connect to port 5000, so every emulated device needs an address of its own. On Linux the
+whole of 127.0.0.0/8 is routed to the loopback interface, so addresses like 127.0.0.10, 127.0.0.11... can be used
+without any network configuration.
+
+Commands to a device are executed one after the other, as on the firmware: a motion command is acknowledged with
+SUCCESS and completes with DONE once the plunger or rotor would have arrived, and replies to anything sent in the
+meantime are held back until then. Motion time follows from volume and speed for pumps and from a fixed switching
+time for valves, and can be scaled down with `time_scale`. `latency` and `jitter` are added to every reply.
+
+Example:
+    with FirmwareEmulator(time_scale=0.01) as emulator:
+        emulator.add_pump("127.0.0.10")
+        emulator.add_valve("127.0.0.20")
+        pump = ChemputerPump("127.0.0.10", "pump")
+        valve = ChemputerValve("127.0.0.20", "valve")
+"""
+
+import heapq
+import logging
+import random
+import selectors
+import socket
+import threading
+import time
+
+from .configs import *
+from .reactor import BUFFER_SIZE, TERMINATOR
+
+TCP_PORT = 5000
+
+SUCCESS = "SUCCESS"
+FAILURE = "FAILURE"
+STALL = "Stall"
+DONE = "DONE"
+
+# error flags, as decoded by `_ChemputerEthernetDevice`
+CONFIGURATION_ERROR = 1 << 1
+COMMUNICATION_ERROR = 1 << 2
+WATCHDOG_ERROR = 1 << 3
+MOTOR_STALL_ERROR = 1 << 4
+ACTUATION_ERROR = 1 << 5
+SHUTDOWN_ERROR = 1 << 6
+
+# flags set on a freshly powered up board
+POWER_ON_ERRORS = WATCHDOG_ERROR | SHUTDOWN_ERROR
+
+
+class EmulatedDevice:
+    """
+    State of a single emulated pump or valve.
+
+    Args:
+        address (str): Address the device listens on
+        device_type (str): "pump" or "valve"
+        syringe_size (int): Syringe volume in mL, pumps only
+        valve_move_time (float): Time to switch to another position in seconds, valves only
+        latency (float): Delay added to every reply in seconds
+        jitter (float): Upper bound of a random delay added to every reply in seconds
+        time_scale (float): Factor applied to all motion times
+    """
+    def __init__(self, address, device_type, syringe_size=10, valve_move_time=0.5, latency=0.0, jitter=0.0,
+                 time_scale=1.0):
+        if device_type == "pump" and syringe_size not in SYRINGE_VOL_TO_MM:
+            raise ValueError("Syringe size {0} not recognised!".format(syringe_size))
+        self.address = address
+        self.device_type = device_type
+        self.syringe_volume = syringe_size * 1000   # uL
+        self.valve_move_time = valve_move_time
+        self.latency = latency
+        self.jitter = jitter
+        self.time_scale = time_scale
+
+        self.position = 0       # uL for pumps, port for valves
+        self.errors = POWER_ON_ERRORS
+        self.adc = 512
+        self.device_cfg = self._default_config()
+        self.network_cfg = [
+            "{0}A:{1}:B0:0B:5A:55".format(0 if device_type == "pump" else 1, address.split(".")[-1]),
+            address,
+            DEFAULT_NETWORK_CONFIG["gateway_ip"],
+            DEFAULT_NETWORK_CONFIG["subnet_mask"],
+            DEFAULT_NETWORK_CONFIG["dns_server_ip"],
+            str(DEFAULT_NETWORK_CONFIG["dhcp_flag"]),
+        ]
+
+        # time the device finishes executing the commands received so far, from `time.monotonic()`
+        self.busy_until = 0.0
+        # reply to send instead of DONE at the end of the next motion
+        self.fault = None
+        # number of commands received, by command
+        self.commands = {}
+
+    def _default_config(self):
+        """ Configuration values in the order the firmware reports them """
+        if self.device_type == "pump":
+            cfg = dict(DEFAULT_PUMP_CONFIG)
+            steps_per_ml = int(360 / ANGLE_PER_STEP * cfg["microsteps"] / THREAD_PITCH *
+                               SYRINGE_VOL_TO_MM[self.syringe_volume // 1000])
+            cfg["syringe_volume_steps"] = steps_per_ml * self.syringe_volume // 1000
+            cfg["steps_per_ml"] = steps_per_ml
+            items = PUMP_CONFIG_ITEMS
+        else:
+            cfg = dict(DEFAULT_VALVE_CONFIG)
+            cfg["full_revolution"] = int(360 / ANGLE_PER_STEP * cfg["microsteps"])
+            cfg["clearing_distance"] = cfg["full_revolution"] // (2 * cfg["number_of_positions"])
+            items = VALVE_CONFIG_ITEMS
+        cfg["motor_profile"] = MOTOR_PROFILE_MAP[cfg["motor_profile"]]
+        return [str(int(cfg[item])) for item in items]
+
+    @property
+    def number_of_positions(self):
+        return int(self.device_cfg[VALVE_CONFIG_ITEMS.index("number_of_positions")])
+
+    def pump_move_time(self, target, speed):
+        """
+        Time the plunger takes to move to a position.
+
+        Args:
+            target (float): Position to move to in uL
+            speed (float): Speed in uL/min
+
+        Returns:
+            duration (float): Motion time in seconds
+        """
+        if speed <= 0:
+            raise ValueError("Speed must be positive.")
+        return abs(target - self.position) / speed * 60 * self.time_scale
+
+    def valve_move_duration(self, target):
+        """ Time the rotor takes to switch to `target` in seconds """
+        if target == self.position:
+            return 0.0
+        return self.valve_move_time * self.time_scale
+
+
+class FirmwareEmulator:
+    """
+    Emulates any number of Chemputer pumps and valves on one thread.
+
+    Args:
+        port (int): Port every device listens on
+        latency (float): Default delay added to every reply in seconds
+        jitter (float): Default upper bound of a random delay added to every reply in seconds
+        time_scale (float): Default factor applied to all motion times
+        valve_move_time (float): Default time for a valve to switch position in seconds
+        seed (int): Seed for the jitter, for repeatable runs
+    """
+    def __init__(self, port=TCP_PORT, latency=0.0, jitter=0.0, time_scale=1.0, valve_move_time=0.5, seed=None):
+        self.port = port
+        self.defaults = {
+            "latency": latency,
+            "jitter": jitter,
+            "time_scale": time_scale,
+            "valve_move_time": valve_move_time,
+        }
+        self.devices = {}
+        self.logger = logging.getLogger("main_logger.emulator_logger")
+
+        self._random = random.Random(seed)
+        self._selector = selectors.DefaultSelector()
+        self._lock = threading.Lock()
+        # (send time, sequence number, socket, message)
+        self._replies = []
+        self._sequence = 0
+        self._running = False
+        self._thread = None
+
+        self._wakeup_recv, self._wakeup_send = socket.socketpair()
+        self._wakeup_recv.setblocking(False)
+        self._selector.register(self._wakeup_recv, selectors.EVENT_READ, None)
+
+    def __enter__(self):
+        self.start()
+        return self
+
+    def __exit__(self, *args):
+        self.stop()
+
+    def add_pump(self, address, syringe_size=10, **kwargs):
+        """
+        Starts listening for connections to an emulated pump.
+
+        Args:
+            address (str): Address to listen on
+            syringe_size (int): Syringe volume in mL
+            kwargs: Overrides for the emulator defaults, see `EmulatedDevice`
+
+        Returns:
+            device (EmulatedDevice): The emulated pump
+        """
+        return self._add_device(address, "pump", syringe_size=syringe_size, **kwargs)
+
+    def add_valve(self, address, **kwargs):
+        """
+        Starts listening for connections to an emulated valve.
+
+        Args:
+            address (str): Address to listen on
+            kwargs: Overrides for the emulator defaults, see `EmulatedDevice`
+
+        Returns:
+            device (EmulatedDevice): The emulated valve
+        """
+        return self._add_device(address, "valve", **kwargs)
+
+    def _add_device(self, address, device_type, **kwargs):
+        if address in self.devices:
+            raise ValueError("A device is already emulated at {0}.".format(address))
+        params = dict(self.defaults)
+        params.update(kwargs)
+        device = EmulatedDevice(address, device_type, **params)
+
+        server = socket.socket(socket.AF_INET, socket.SOCK_STREAM)
+        server.setsockopt(socket.SOL_SOCKET, socket.SO_REUSEADDR, 1)
+        server.bind((address, self.port))
+        server.listen()
+        server.setblocking(False)
+
+        with self._lock:
+            self.devices[address] = device
+            self._selector.register(server, selectors.EVENT_READ, ("server", device))
+        self._wakeup()
+        return device
+
+    def inject_fault(self, address, reply=STALL):
+        """
+        Makes the next motion of a device end in a fault instead of DONE.
+
+        Args:
+            address (str): Address of the device
+            reply (str): STALL or FAILURE
+        """
+        if reply not in (STALL, FAILURE):
+            raise ValueError("Fault must be {0} or {1}.".format(STALL, FAILURE))
+        self.devices[address].fault = reply
+
+    def start(self):
+        """ Starts serving the emulated devices """
+        if self._running:
+            return
+        self._running = True
+        self._thread = threading.Thread(target=self._run, name="Chemputer firmware emulator")
+        self._thread.daemon = True
+        self._thread.start()
+
+    def stop(self):
+        """ Closes all connections and listening sockets """
+        self._running = False
+        self._wakeup()
+        if self._thread is not None:
+            self._thread.join()
+            self._thread = None
+        with self._lock:
+            for key in list(self._selector.get_map().values()):
+                if key.data is not None:
+                    self._selector.unregister(key.fileobj)
+                    key.fileobj.close()
+            self._replies.clear()
+            self.devices.clear()
+
+    def _wakeup(self):
+        try:
+            self._wakeup_send.send(b"\0")
+        except OSError:
+            pass
+
+    def _run(self):
+        while self._running:
+            with self._lock:
+                timeout = None
+                if self._replies:
+                    timeout = max(self._replies[0][0] - time.monotonic(), 0)
+            for key, _ in self._selector.select(timeout):
+                if key.data is None:
+                    try:
+                        while self._wakeup_recv.recv(BUFFER_SIZE):
+                            pass
+                    except BlockingIOError:
+                        pass
+                elif key.data[0] == "server":
+                    self._accept(key.fileobj, key.data[1])
+                else:
+                    self._receive(key.fileobj, *key.data[1:])
+            self._send_due()
+
+    def _accept(self, server, device):
+        try:
+            conn, _ = server.accept()
+        except OSError:
+            return
+        conn.setblocking(False)
+        with self._lock:
+            self._selector.register(conn, selectors.EVENT_READ, ("conn", device, bytearray()))
+
+    def _receive(self, conn, device, buffer):
+        try:
+            data = conn.recv(BUFFER_SIZE)
+        except (BlockingIOError, InterruptedError):
+            return
+        except OSError:
+            data = b""
+
+        if not data:
+            self._close(conn)
+            return
+
+        buffer += data
+        while True:
+            end = buffer.find(TERMINATOR)
+            if end < 0:
+                break
+            command = bytes(buffer[:end]).decode(errors="replace")
+            del buffer[:end + 1]
+            if command:
+                self._execute(conn, device, command)
+
+    def _close(self, conn):
+        with self._lock:
+            try:
+                self._selector.unregister(conn)
+            except (KeyError, ValueError):
+                pass
+            self._replies = [reply for reply in self._replies if reply[2] is not conn]
+            heapq.heapify(self._replies)
+        conn.close()
+
+    def _send_due(self):
+        now = time.monotonic()
+        while True:
+            with self._lock:
+                if not self._replies or self._replies[0][0] > now:
+                    return
+                _, _, conn, message = heapq.heappop(self._replies)
+            try:
+                conn.sendall(message.encode() + TERMINATOR)
+            except OSError:
+                self._close(conn)
+
+    def _reply(self, conn, device, message, delay=0.0):
+        """
+        Queues a reply, keeping the replies of a device in order.
+
+        Args:
+            conn (socket.socket): Connection to reply on
+            device (EmulatedDevice): Device replying
+            message (str): Reply, without the terminator
+            delay (float): Time the device takes to execute the command in seconds
+        """
+        start = max(time.monotonic(), device.busy_until)
+        device.busy_until = start + delay
+        send_time = device.busy_until + device.latency
+        if device.jitter:
+            send_time += self._random.uniform(0, device.jitter)
+        with self._lock:
+            self._sequence += 1
+            heapq.heappush(self._replies, (send_time, self._sequence, conn, message))
+
+    def _execute(self, conn, device, command):
+        """
+        Executes a single command the way the firmware would.
+
+        Args:
+            conn (socket.socket): Connection the command was received on
+            device (EmulatedDevice): Device addressed
+            command (str): Command, without the terminator
+        """
+        name, *args = command.split(" ")
+        device.commands[name] = device.commands.get(name, 0) + 1
+        self.logger.debug("{0} received {1}".format(device.address, command))
+
+        try:
+            if name == "read_config":
+                prefix = "PUMP_CFG" if device.device_type == "pump" else "VALVE_CFG"
+                self._reply(conn, device, "{0} {1}".format(prefix, " ".join(device.device_cfg)))
+            elif name == "write_config":
+                device.device_cfg = args
+                self._reply(conn, device, DONE)
+            elif name == "read_netcfg":
+                self._reply(conn, device, "NETCFG {0}".format(" ".join(device.network_cfg)))
+            elif name == "write_netcfg":
+                device.network_cfg = args
+                self._reply(conn, device, DONE)
+            elif name == "read_errors":
+                self._reply(conn, device, "ERRORS: {0}".format(device.errors))
+            elif name == "clear_errors":
+                device.errors = 0
+                self._reply(conn, device, DONE)
+            elif name == "read_ADC":
+                self._reply(conn, device, "ADC: {0}".format(device.adc))
+            elif device.device_type == "pump" and name in ("move_abs", "move_rel", "move_home", "hard_home"):
+                self._move_pump(conn, device, name, [float(arg) for arg in args])
+            elif device.device_type == "valve" and name in ("pos", "home", "cfg"):
+                self._move_valve(conn, device, name, [int(arg) for arg in args])
+            else:
+                self._fail(conn, device, CONFIGURATION_ERROR, "unknown command {0}".format(command))
+        except (IndexError, ValueError) as e:
+            self._fail(conn, device, CONFIGURATION_ERROR, "invalid command {0}: {1}".format(command, e))
+
+    def _fail(self, conn, device, error, reason):
+        device.errors |= error
+        self._reply(conn, device, "{0} {1}".format(FAILURE, reason))
+
+    def _move_pump(self, conn, device, name, args):
+        if name == "move_abs":
+            target, speed = args
+        elif name == "move_rel":
+            target, speed = device.position + args[0], args[1]
+        else:
+            target, speed = 0, args[0]
+
+        if not 0 <= target <= device.syringe_volume:
+            self._fail(conn, device, ACTUATION_ERROR, "position {0} out of range".format(int(target)))
+            return
+
+        self._motion(conn, device, target, device.pump_move_time(target, speed))
+
+    def _move_valve(self, conn, device, name, args):
+        if name == "pos":
+            target = args[0]
+            if not 0 <= target < device.number_of_positions:
+                self._fail(conn, device, ACTUATION_ERROR, "position {0} out of range".format(target))
+                return
+            duration = device.valve_move_duration(target)
+        elif name == "home":
+            target = 0
+            duration = device.valve_move_time * device.time_scale
+        else:
+            # auto configuration turns the rotor all the way round
+            target = 0
+            duration = device.valve_move_time * device.number_of_positions * device.time_scale
+
+        self._motion(conn, device, target, duration)
+
+    def _motion(self, conn, device, target, duration):
+        """ Acknowledges a motion and completes it after `duration`, or ends it in the injected fault """
+        self._reply(conn, device, SUCCESS)
+        fault, device.fault = device.fault, None
+        if fault == STALL:
+            device.errors |= MOTOR_STALL_ERROR
+            self._reply(conn, device, STALL, duration / 2)
+        elif fault == FAILURE:
+            device.errors |= ACTUATION_ERROR
+            self._reply(conn, device, FAILURE, duration / 2)
+        else:
+            device.position = target
+            self._reply(conn, device, DONE, duration)
@@ -0,0 +1,90 @@
+# coding=utf-8
+# !/usr/bin/env python
+"""
+"emulator_benchmark" -- Drive many emulated pumps and valves through the real API
+=================================================================================
+
+.. module:: emulator_benchmark
+   :platform: Unix
+   :synopsis: Measure command throughput of the Chemputer API against the local firmware emulator
+
+(c) 2019 The Cronin Group, University of Glasgow. This work is licensed under BSD 3-clause.
+
+Starts a firmware emulator with a number of pumps and valves on loopback addresses, connects the real `ChemputerPump`
+and `ChemputerValve` classes to them and has every pair run a series of valve switches and pump strokes at the same
+time. The wall time is compared to the time the same motions take on the emulated hardware, so whatever is left is
+overhead in the API and the emulator.
+
+For style guide used see http://xkcd.com/1513/
+"""
+
+import argparse
+import threading
+import time
+
+from ChemputerAPI import ChemputerPump, ChemputerValve
+from ChemputerAPI.emulator import FirmwareEmulator
+
+
+def cycle(pump, valve, strokes, volume, speed):
+    """ Fills the pump from one valve port and empties it to the next """
+    for stroke in range(strokes):
+        valve.execute(("route", -1, stroke % 6))
+        valve.wait_until_ready()
+        pump.execute(("sink", 0), volume=volume, speed=speed)
+        pump.wait_until_ready()
+        valve.execute(("route", -1, (stroke + 1) % 6))
+        valve.wait_until_ready()
+        pump.execute(("source", 0), volume=volume, speed=speed)
+        pump.wait_until_ready()
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--pairs", type=int, default=24, help="number of pump/valve pairs")
+    parser.add_argument("--strokes", type=int, default=10, help="strokes per pump")
+    parser.add_argument("--volume", type=float, default=5, help="stroke volume in mL")
+    parser.add_argument("--speed", type=float, default=50, help="pump speed in mL/min")
+    parser.add_argument("--valve-time", type=float, default=0.5, help="valve switching time in s")
+    parser.add_argument("--time-scale", type=float, default=0.01, help="factor applied to all motion times")
+    parser.add_argument("--latency", type=float, default=0.001, help="reply latency in s")
+    parser.add_argument("--jitter", type=float, default=0.002, help="maximum reply jitter in s")
+    args = parser.parse_args()
+
+    emulator = FirmwareEmulator(
+        latency=args.latency, jitter=args.jitter, time_scale=args.time_scale, valve_move_time=args.valve_time, seed=0)
+    with emulator:
+        pairs = []
+        for i in range(args.pairs):
+            emulator.add_pump("127.0.1.{0}".format(i + 1))
+            emulator.add_valve("127.0.2.{0}".format(i + 1))
+
+        start = time.monotonic()
+        for i in range(args.pairs):
+            pump = ChemputerPump("127.0.1.{0}".format(i + 1), "pump{0}".format(i + 1))
+            valve = ChemputerValve("127.0.2.{0}".format(i + 1), "valve{0}".format(i + 1))
+            pairs.append((pump, valve))
+        for pump, valve in pairs:
+            pump.wait_until_ready()
+            valve.wait_until_ready()
+        print("Connected {0} devices in {1:.3f} s.".format(2 * args.pairs, time.monotonic() - start))
+
+        threads = [
+            threading.Thread(target=cycle, args=(pump, valve, args.strokes, args.volume, args.speed))
+            for pump, valve in pairs
+        ]
+        start = time.monotonic()
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+        elapsed = time.monotonic() - start
+
+        motion = args.strokes * 2 * (args.volume / args.speed * 60 + args.valve_time) * args.time_scale
+        commands = sum(sum(device.commands.values()) for device in emulator.devices.values())
+        print("{0} commands in {1:.3f} s ({2:.0f} commands/s).".format(commands, elapsed, commands / elapsed))
+        print("Motion time per pair {0:.3f} s, overhead {1:.3f} s.".format(motion, elapsed - motion))
+
+
+if __name__ == "__main__":
+    main()
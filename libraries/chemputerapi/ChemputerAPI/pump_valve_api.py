@@ -19,13 +19,13 @@ For style guide used see http://xkcd.com/1513/
 
 import logging
 import socket
-import sys
 import threading
 import time
 import re
 from collections import OrderedDict
 
 from .device import ChemputerDevice, ChemputerDeviceError
+from .reactor import EthernetReactor
 from .configs import *
 
 """ CONSTANTS """
@@ -109,6 +109,13 @@ class _ChemputerEthernetDevice:
         self.device_cfg = {}
         self.network_cfg = {}
         self.device_ready_flag = threading.Event()
+        # error reported by the device while executing the last command, raised by `wait_until_ready`
+        self.device_error = None
+        # True if the device hasn't reported any errors since they were last cleared
+        self.errors_clean = False
+        # time between sending the last command and the device reporting it done, in seconds
+        self.settle_latency = None
+        self._command_sent_time = None
 
         self.device_type = None
 
@@ -117,9 +124,9 @@ class _ChemputerEthernetDevice:
         self.tcp = socket.socket(socket.AF_INET, socket.SOCK_STREAM)
         self._connect_to_server()
 
-        self.tcp_response_thread = threading.Thread(target=self._receive_response, name="{0} TCP thread".format(name))
-        self.tcp_response_thread.daemon = True
-        self.tcp_response_thread.start()
+        # replies are received on the shared reactor thread
+        self.reactor = EthernetReactor.get()
+        self.reactor.register(self.tcp, self._handle_response, self._handle_disconnect)
 
         """ COMMAND STRINGS """
         # common
@@ -154,134 +161,138 @@ class _ChemputerEthernetDevice:
 
     def __del__(self):
         """
-        Destructor that closes the server connection and joins the listening thread
+        Destructor that stops receiving from and closes the server connection
         """
-        self.tcp.close()
         try:
-            self.tcp_response_thread.join()
+            self.reactor.unregister(self.tcp)
         except AttributeError:
             pass
+        self.tcp.close()
 
     def _connect_to_server(self):
         """
         Attempts to connect to the TCP server.
 
         Raises:
-            Exception (OSException): The connection has failed.
+            ChemputerDeviceError: The connection has failed.
         """
         try:
             self.tcp.connect((self.address, TCP_PORT))
             # self.tcp.setsockopt(socket.SOL_SOCKET, socket.SO_KEEPALIVE, 1)  # turn on the TCP keepalive
             # self.tcp.ioctl(socket.SIO_KEEPALIVE_VALS, (1, 1000, 1000))  # configure to send a keepalive packet every second
-        except Exception:
+        except Exception as e:
             self.logger.exception("Unable to connect to host device: IP {0} did not respond.".format(self.address))
-            sys.exit(1)
+            raise ChemputerDeviceError("{0} ({1}) - unable to connect: {2}".format(self.name, self.address, e)) from e
 
-    def _receive_response(self):
+    def _handle_response(self, response):
         """
-        Received the response from the server and prints out the response to screen.
+        Handles a single null-terminated message from the server. Called on the reactor thread.
         Specific cases are present for reading configurations (device/network) and for checking the completion flag.
+
+        Args:
+            response (str): Message received, without the terminator
         """
-        while True:
+        if READ_PUMP_CFG in response:
+            split = response.split(READ_PUMP_CFG)
+            cfg_string = split[1]
+
+            self.device_cfg = self._parse_device_config_string(cfg_string, PUMP_CFG)
+
+            for k, v in self.device_cfg.items():
+                self.logger.debug("{0} {1}".format(k, v))
+
+            self._set_ready()
+
+        elif READ_VALVE_CFG in response:
+            split = response.split(READ_VALVE_CFG)
+            cfg_string = split[1]
+
+            self.device_cfg = self._parse_device_config_string(cfg_string, VALVE_CFG)
+
+            for k, v in self.device_cfg.items():
+                self.logger.debug("{0} {1}".format(k, v))
+
+            self._set_ready()
+
+        elif READ_NETWORK_CFG in response:
+            split = response.split(READ_NETWORK_CFG)
+            network_cfg_string = split[1]
+            self.network_cfg = self._parse_network_config_string(network_cfg_string)
+            for k, v in self.network_cfg.items():
+                self.logger.debug("{0} {1}".format(k, v))
+            self._set_ready()
+
+        elif ERRORS in response:
+            split = response.split(ERRORS)
+            try:
+                error_byte = int(split[1])
+                error_list = []
+                if error_byte & (1 << 1):
+                    error_list.append("CONFIGURATION_ERROR")
+                if error_byte & (1 << 2):
+                    error_list.append("COMMUNICATION_ERROR")
+                if error_byte & (1 << 3):
+                    error_list.append("WATCHDOG_ERROR")
+                if error_byte & (1 << 4):
+                    error_list.append("MOTOR_STALL_ERROR")
+                if error_byte & (1 << 5):
+                    error_list.append("ACTUATION_ERROR")
+                if error_byte & (1 << 6):
+                    error_list.append("SHUTDOWN_ERROR")
+                if error_byte & (1 << 7):
+                    error_list.append("UNDEFINED_ERROR")
+                self.logger.debug(error_list)
+                self.errors_clean = error_byte == 0
+                self._set_ready()
+            except (TypeError, ValueError):
+                self.logger.exception("Invalid response: {0}".format(split[1]))
+
+        elif ADC in response:
+            split = response.split(ADC)
             try:
-                response = self.tcp.recv(BUFFER_SIZE).decode()
-            except(TimeoutError, ConnectionResetError):
-                self.logger.exception("Device {0} has disconnected.".format(self.name))
-                break  # TODO raise disconnection error
-
-            # response = self.tcp.recv(BUFFER_SIZE).decode()
-
-            if not response:
-                continue
-
-            elif READ_PUMP_CFG in response:
-                split = response.split(READ_PUMP_CFG)
-                cfg_string = split[1]
-
-                self.device_cfg = self._parse_device_config_string(cfg_string, PUMP_CFG)
-
-                for k, v in self.device_cfg.items():
-                    self.logger.debug("{0} {1}".format(k, v))
-
-                self.device_ready_flag.set()
-                continue
-
-            elif READ_VALVE_CFG in response:
-                split = response.split(READ_VALVE_CFG)
-                cfg_string = split[1]
-
-                self.device_cfg = self._parse_device_config_string(cfg_string, VALVE_CFG)
-
-                for k, v in self.device_cfg.items():
-                    self.logger.debug("{0} {1}".format(k, v))
-
-                self.device_ready_flag.set()
-                continue
-
-            elif READ_NETWORK_CFG in response:
-                split = response.split(READ_NETWORK_CFG)
-                network_cfg_string = split[1]
-                self.network_cfg = self._parse_network_config_string(network_cfg_string)
-                for k, v in self.network_cfg.items():
-                    self.logger.debug("{0} {1}".format(k, v))
-                self.device_ready_flag.set()
-                continue
-
-            elif ERRORS in response:
-                split = response.split(ERRORS)
-                try:
-                    error_byte = int(split[1])
-                    error_list = []
-                    if error_byte & (1 << 1):
-                        error_list.append("CONFIGURATION_ERROR")
-                    if error_byte & (1 << 2):
-                        error_list.append("COMMUNICATION_ERROR")
-                    if error_byte & (1 << 3):
-                        error_list.append("WATCHDOG_ERROR")
-                    if error_byte & (1 << 4):
-                        error_list.append("MOTOR_STALL_ERROR")
-                    if error_byte & (1 << 5):
-                        error_list.append("ACTUATION_ERROR")
-                    if error_byte & (1 << 6):
-                        error_list.append("SHUTDOWN_ERROR")
-                    if error_byte & (1 << 7):
-                        error_list.append("UNDEFINED_ERROR")
-                    self.logger.debug(error_list)
-                    self.device_ready_flag.set()
-                except TypeError:
-                    self.logger.exception("Invalid response: {0}".format(split[1]))
-                continue
-
-            elif ADC in response:
-                split = response.split(ADC)
-                try:
-                    ADC_reading = int(split[1])
-                    self.logger.debug("ADC reading: {0}".format(ADC_reading))
-                    self.device_ready_flag.set()
-                except TypeError:
-                    self.logger.exception("Invalid response: {0}".format(split[1]))
-                continue
-
-            elif STALL in response:
-                self.logger.critical("Error! Device has stalled!")  # TODO maybe raise an error?
-                self.device_ready_flag.set()
-                raise ChemputerDeviceError(f"{self.name} ({self.address}) - stall failure: {response}.")
-
-            elif SUCCESS in response:
-                self.logger.debug(response)
-
-            elif FAILURE in response:
-                self.logger.debug(response)
-                self.device_ready_flag.set()
-                raise ChemputerDeviceError(f"{self.name} ({self.address}) - actuation failure: {response}.")
-
-            elif DONE in response:
-                self.logger.debug(response)
-                self.device_ready_flag.set()
+                ADC_reading = int(split[1])
+                self.logger.debug("ADC reading: {0}".format(ADC_reading))
+                self._set_ready()
+            except (TypeError, ValueError):
+                self.logger.exception("Invalid response: {0}".format(split[1]))
+
+        elif STALL in response:
+            self.logger.critical("Error! Device has stalled!")
+            self.errors_clean = False
+            self.device_error = ChemputerDeviceError(f"{self.name} ({self.address}) - stall failure: {response}.")
+            self._set_ready()
+
+        elif SUCCESS in response:
+            self.logger.debug(response)
+
+        elif FAILURE in response:
+            self.logger.debug(response)
+            self.errors_clean = False
+            self.device_error = ChemputerDeviceError(f"{self.name} ({self.address}) - actuation failure: {response}.")
+            self._set_ready()
+
+        elif DONE in response:
+            self.logger.debug(response)
+            self._set_ready()
 
-            else:
-                self.logger.info(response)
-                continue
+        else:
+            self.logger.info(response)
+
+    def _handle_disconnect(self):
+        """
+        Called on the reactor thread when the server closes the connection. Releases anyone waiting on the device.
+        """
+        self.logger.error("Device {0} has disconnected.".format(self.name))
+        self.errors_clean = False
+        self.device_error = ChemputerDeviceError(f"{self.name} ({self.address}) - disconnected.")
+        self._set_ready()
+
+    def _set_ready(self):
+        """ Records how long the last command took to complete and releases anyone waiting on the device """
+        if self._command_sent_time is not None:
+            self.settle_latency = time.monotonic() - self._command_sent_time
+            self._command_sent_time = None
+        self.device_ready_flag.set()
 
     def _build_command(self, *cmds):
         """
@@ -305,6 +316,7 @@ class _ChemputerEthernetDevice:
         """
         self.device_ready_flag.clear()
         cmd = self._build_command(*cmds)
+        self._command_sent_time = time.monotonic()
         try:
             self.tcp.send(cmd.encode())
         except ConnectionResetError:
@@ -540,11 +552,22 @@ class _ChemputerEthernetDevice:
     def wait_until_ready(self):
         """
         Waits until the device is ready by listening for a DONE command from the server.
-        This then sets the flag that the operation has completed.
+        This then sets the flag that the operation has completed. The time the last command took to complete is
+        available as `settle_latency`.
+
+        Raises:
+            ChemputerDeviceError: The device reported a stall or actuation failure, or disconnected.
         """
-        # set = self.device_ready_flag.is_set()  # TODO statement seems to have no effect
         self.device_ready_flag.wait()
-        time.sleep(0.1)
+        if self.settle_latency is not None:
+            self.logger.debug("{0} settled after {1:.3f} s.".format(self.name, self.settle_latency))
+        self._raise_device_error()
+
+    def _raise_device_error(self):
+        """ Raises, and clears, the error the device reported while executing the last command, if any """
+        error, self.device_error = self.device_error, None
+        if error is not None:
+            raise error
 
     def send_and_wait_reply(self, msg):
         """
@@ -617,9 +640,23 @@ class _ChemputerEthernetDevice:
         self.device_ready_flag.wait()
 
     def clear_errors(self):
-        """ Clears the previously set errors """
+        """
+        Clears the previously set errors, including one reported while executing the last command and not raised yet.
+
+        Raises:
+            ChemputerDeviceError: The device failed to clear its errors, or disconnected.
+        """
+        self.errors_clean = False
+        self.device_error = None
         self._send_command(self.CLEAR_ERRORS)
         self.device_ready_flag.wait()
+        self._raise_device_error()
+        self.errors_clean = True
+
+    def clear_errors_if_reported(self):
+        """ Clears errors unless the device hasn't reported any since they were last cleared """
+        if not self.errors_clean:
+            self.clear_errors()
 
     def read_ADC(self):
         """ Reads ADC """
@@ -754,7 +791,7 @@ class ChemputerPump(_ChemputerEthernetDevice, AbstractPump):
 
     def execute(self, cmd, volume, speed, **kwargs):
         super().execute(cmd, volume=volume, speed=speed, **kwargs)
-        self.clear_errors()
+        self.clear_errors_if_reported()
         self.wait_until_ready()
         if cmd[0] == "sink":
             self.move_relative(volume, speed_in_milliliters_per_min=speed)
@@ -852,7 +889,7 @@ class ChemputerValve(_ChemputerEthernetDevice, AbstractValve):
 
     def execute(self, cmd, **kwargs):
         super().execute(cmd, **kwargs)
-        self.clear_errors()
+        self.clear_errors_if_reported()
         self.wait_until_ready()
         _, port_in, port_out = cmd
         # one of `port_in` and `port_out` should be equal to -1 signifying
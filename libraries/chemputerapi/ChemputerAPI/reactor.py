@@ -0,0 +1,161 @@
+# coding=utf-8
+# !/usr/bin/env python
+"""
+"reactor" -- Shared I/O loop for Chemputer pump and valve connections
+=====================================================================
+
+.. module:: reactor
+   :platform: Unix, Windows
+   :synopsis: Receive and frame replies from all Chemputer ethernet devices on one thread.
+
+(c) 2019 The Cronin Group, University of Glasgow. This work is licensed under BSD 3-clause.
+
+Instead of every pump and valve running its own receive thread, a single reactor thread waits on all device sockets
+with `selectors`. Replies are buffered per connection and split on the firmware's null terminator, so replies split
+across, or coalesced into, TCP segments are handed to the device one complete message at a time.
+
+Sending is still done from the caller's thread, directly on the device socket.
+"""
+
+import logging
+import selectors
+import socket
+import threading
+
+BUFFER_SIZE = 4096
+TERMINATOR = b"\0"
+
+
+class _Connection:
+    """
+    Per-socket state held by the reactor.
+
+    Args:
+        sock (socket.socket): Connected device socket
+        on_message (Callable[[str], None]): Called with every complete message received
+        on_disconnect (Callable[[], None]): Called once when the connection is closed by the device
+    """
+    def __init__(self, sock, on_message, on_disconnect):
+        self.sock = sock
+        self.on_message = on_message
+        self.on_disconnect = on_disconnect
+        self.buffer = bytearray()
+
+
+class EthernetReactor:
+    """
+    Single thread receiving from all registered device sockets. Use `EthernetReactor.get()` to obtain the shared
+    instance.
+    """
+    _instance = None
+    _instance_lock = threading.Lock()
+
+    def __init__(self):
+        self.logger = logging.getLogger("main_logger.pv_logger")
+
+        self._selector = selectors.DefaultSelector()
+        self._lock = threading.Lock()
+
+        # Writing to this socket pair wakes the selector up so that (un)registrations take effect immediately
+        self._wakeup_recv, self._wakeup_send = socket.socketpair()
+        self._wakeup_recv.setblocking(False)
+        self._selector.register(self._wakeup_recv, selectors.EVENT_READ, None)
+
+        self._thread = threading.Thread(target=self._run, name="Chemputer ethernet reactor")
+        self._thread.daemon = True
+        self._thread.start()
+
+    @classmethod
+    def get(cls):
+        """
+        Returns the shared reactor, starting it if necessary.
+
+        Returns:
+            reactor (EthernetReactor): Shared reactor
+        """
+        with cls._instance_lock:
+            if cls._instance is None:
+                cls._instance = cls()
+            return cls._instance
+
+    def register(self, sock, on_message, on_disconnect):
+        """
+        Starts receiving from a connected socket.
+
+        Args:
+            sock (socket.socket): Connected device socket
+            on_message (Callable[[str], None]): Called on the reactor thread with every complete message, without the
+                terminator
+            on_disconnect (Callable[[], None]): Called on the reactor thread when the device closes the connection
+        """
+        with self._lock:
+            self._selector.register(sock, selectors.EVENT_READ, _Connection(sock, on_message, on_disconnect))
+        self._wakeup()
+
+    def unregister(self, sock):
+        """
+        Stops receiving from a socket. Does nothing if the socket isn't registered.
+
+        Args:
+            sock (socket.socket): Device socket
+        """
+        with self._lock:
+            try:
+                self._selector.unregister(sock)
+            except (KeyError, ValueError):
+                return
+        self._wakeup()
+
+    def _wakeup(self):
+        try:
+            self._wakeup_send.send(b"\0")
+        except OSError:
+            pass
+
+    def _run(self):
+        while True:
+            for key, _ in self._selector.select():
+                if key.data is None:
+                    try:
+                        while self._wakeup_recv.recv(BUFFER_SIZE):
+                            pass
+                    except BlockingIOError:
+                        pass
+                    continue
+                self._receive(key.data)
+
+    def _receive(self, connection):
+        """
+        Reads from a ready socket and dispatches every complete message in its buffer.
+
+        Args:
+            connection (_Connection): Connection to read from
+        """
+        try:
+            data = connection.sock.recv(BUFFER_SIZE)
+        except (BlockingIOError, InterruptedError):
+            return
+        except OSError:
+            data = b""
+
+        if not data:
+            self.unregister(connection.sock)
+            self._dispatch(connection.on_disconnect)
+            return
+
+        connection.buffer += data
+        while True:
+            end = connection.buffer.find(TERMINATOR)
+            if end < 0:
+                break
+            message = bytes(connection.buffer[:end]).decode(errors="replace")
+            del connection.buffer[:end + 1]
+            if message:
+                self._dispatch(connection.on_message, message)
+
+    def _dispatch(self, callback, *args):
+        """ Runs a device callback, making sure a misbehaving device can't take the reactor thread down """
+        try:
+            callback(*args)
+        except Exception:
+            self.logger.exception("Error handling device message {0}.".format(args))
@@ -1,4 +1,7 @@
 import logging
+import threading
+from concurrent.futures import Future
+from time import sleep
 
 from SerialLabware import C3000
 from .device import ChemputerDevice
@@ -35,27 +38,191 @@ class SimChemputerTricontC3000(ChemputerDevice):
         super().execute(cmd, **kwargs)
 
 
+class TricontBus:
+    """
+    RS-485 port shared by Tricont pumps. Commands to all pumps on the port go through a single `C3000` connection, one
+    at a time, and a single thread polls the busy bit of every pump someone is waiting for, one after the other in each
+    sweep, instead of every pump polling the bus on its own. Use `TricontBus.get(port)` to obtain the bus of a port.
+
+    Args:
+        device (C3000): Connection to the port
+    """
+    # class variable holding the buses of the various serial ports
+    BUSES = {}
+    _buses_lock = threading.Lock()
+
+    # seconds between two sweeps of busy bit queries
+    POLL_INTERVAL = 0.1
+
+    def __init__(self, device):
+        self.device = device
+        self.logger = logging.getLogger("main_logger.serial_device_logger")
+
+        self._lock = threading.Lock()
+        # address -> futures finishing when the pump is idle
+        self._waiting = {}
+        self._poller = None
+
+    @classmethod
+    def get(cls, port, name=""):
+        """
+        Returns the bus of a serial port, opening the connection if necessary.
+
+        Args:
+            port (str): Serial port the pumps are connected to
+            name (str): Name of the connection, used for logging
+
+        Returns:
+            bus (TricontBus): Bus of the port
+        """
+        with cls._buses_lock:
+            if port not in cls.BUSES:
+                logging.getLogger("main_logger.serial_device_logger").debug(f"Openning new serial connection on port {port}.")
+                device = C3000(port, name)
+                device.open_connection()
+                cls.BUSES[port] = cls(device)
+            return cls.BUSES[port]
+
+    def run(self, address, command_string):
+        """
+        Sends a string of DT protocol commands to a pump and waits for its reply, not for the pump to finish them.
+
+        Args:
+            address (int or str): Rotary switch position of the pump
+            command_string (str): Commands, e.g. 'I1V500P300'
+
+        Returns:
+            reply (str): Raw reply from the pump
+        """
+        return self.device.run_command_string(command_string, address=address)
+
+    def when_idle(self, address):
+        """
+        Starts polling a pump until its busy bit is clear.
+
+        Args:
+            address (int or str): Rotary switch position of the pump
+
+        Returns:
+            idle (concurrent.futures.Future): Finishing when the pump is idle, or with the error it reports
+        """
+        idle = Future()
+        with self._lock:
+            self._waiting.setdefault(address, []).append(idle)
+            if self._poller is None:
+                self._poller = threading.Thread(target=self._poll, name=f"{self.device.device_name} busy poller", daemon=True)
+                self._poller.start()
+        return idle
+
+    def wait_until_idle(self, address):
+        """
+        Waits until a pump has finished all its commands.
+
+        Args:
+            address (int or str): Rotary switch position of the pump
+
+        Raises:
+            C3000Error: The pump reported an error
+        """
+        self.when_idle(address).result()
+
+    def _poll(self):
+        while True:
+            with self._lock:
+                addresses = list(self._waiting)
+                if not addresses:
+                    self._poller = None
+                    return
+            for address in addresses:
+                try:
+                    busy = self.device.is_pump_busy(address=address)
+                except Exception as e:
+                    self._finish(address, error=e)
+                    continue
+                if not busy:
+                    self._finish(address)
+            sleep(self.POLL_INTERVAL)
+
+    def _finish(self, address, error=None):
+        with self._lock:
+            waiting = self._waiting.pop(address, [])
+        for idle in waiting:
+            if error is None:
+                idle.set_result(None)
+            else:
+                idle.set_exception(error)
+
+
 class ChemputerTricontC3000(SimChemputerTricontC3000):
+    """
+    Tricont C3000 pump, or valve if has_pump is False, on an RS-485 port shared with other Tricont pumps.
 
-    # class variable holding the shared connections to the various
-    # serial ports
-    CONNECTIONS = {}
+    Args:
+        port (str): Serial port the pump is connected to
+        address (int or str): Rotary switch position of the pump
+        clockwise (bool): Number the valve ports clockwise from the syringe
+        name (str): Optional name of the device
+        num_positions (int): Number of valve ports
+        has_pump (bool): False if only the valve is used
+        max_volume (float): Syringe volume in milliliters, required if has_pump is True
 
-    def __init__(self, port, address, clockwise=True, name="", num_positions=6, has_pump=True, **kwargs):
-        super().__init__(port, address, name, num_positions, has_pump, **kwargs)
+    Raises:
+        ValueError: has_pump is True and max_volume isn't given
+    """
+    # plunger increments per full stroke, in the resolution mode pumps are in after initialisation
+    STROKE_INCREMENTS = 3000
+
+    def __init__(self, port, address, clockwise=True, name="", num_positions=6, has_pump=True, max_volume=None,
+                 **kwargs):
+        super().__init__(port, address, clockwise, name, num_positions, has_pump, **kwargs)
         self.logger = logging.getLogger("main_logger.serial_device_logger")
+        # volumes are converted to plunger increments using the syringe volume, so there is no safe default
+        if has_pump and max_volume is None:
+            raise ValueError("Syringe volume (max_volume) of pump {0} not given.".format(name))
+        self.max_volume = float(max_volume) if max_volume is not None else None
 
-        if port not in self.CONNECTIONS:
-            self.logger.debug(f"Openning new serial connection on port {port}.")
-            self.device = C3000(port, name)
-            self.device.open_connection()
-            self.device.launch_command_handler()
-            self.CONNECTIONS[port] = self.device
-        else:
-            self.logger.debug(f"Reusing serial connection on port {port}.")
-            self.device = self.CONNECTIONS[port]
-        self.device.init_pump_full(run=True, address=address)
+        self.bus = TricontBus.get(port, name)
+        self.cmd = self.bus.device.cmd
+        self.bus.device.init_pump_full(valve_enumeration_direction="CW" if clockwise else "CCW", run=True, address=address)
 
-    def execute(self, cmd, **kwargs):
-        super().execute(cmd, **kwargs)
-        # TODO: Add actuation code.
+    def wait_until_ready(self):
+        self.bus.wait_until_idle(self.address)
+
+    def valve_command(self, port):
+        """ Command string switching the valve to a Chemputer port, which are numbered from 0 """
+        return f"{self.cmd.VLV_ROT_CW}{port + 1}"
+
+    def stroke_command(self, direction, volume, speed):
+        """
+        Command string moving the plunger.
+
+        Args:
+            direction (str): "sink" to aspirate, "source" to dispense
+            volume (float): Volume to move in milliliters
+            speed (float): Speed to move at in milliliters per minute
+
+        Returns:
+            command (str): Velocity and relative move commands
+        """
+        increments = round(volume / self.max_volume * self.STROKE_INCREMENTS)
+        velocities = [speeds[0] for speeds in self.cmd.SPEED_MODES.values()]
+        velocity = round(speed / 60 / self.max_volume * self.STROKE_INCREMENTS)
+        velocity = min(max(velocity, min(velocities)), max(velocities))
+        move = self.cmd.SYR_SUCK_REL if direction == "sink" else self.cmd.SYR_SPIT_REL
+        return f"{self.cmd.SET_MAX_VEL}{velocity}{move}{increments}"
+
+    def execute(self, cmd, volume=None, speed=None, **kwargs):
+        super().execute(cmd, volume=volume, speed=speed, **kwargs)
+        self.wait_until_ready()
+        if cmd[0] == "route":
+            _, port_in, port_out = cmd
+            # one of `port_in` and `port_out` should be equal to -1 signifying
+            # the central connection.
+            port = port_out if port_in == -1 else port_in
+            command_string = self.valve_command(port)
+        else:
+            # switch the valve and move the plunger in one transaction
+            direction, port = cmd
+            command_string = self.valve_command(port) + self.stroke_command(direction, volume, speed)
+        self.logger.debug(f"{self.__class__.__name__} {self.name} - Sending {command_string}.")
+        self.bus.run(self.address, command_string)
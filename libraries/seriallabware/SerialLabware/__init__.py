@@ -18,6 +18,9 @@ to date!
 For style guide used see http://xkcd.com/1513/
 """
 
+# Waiting for commands submitted to several devices
+from .serial_labware import gather
+
 # Cronin
 from .devices.Cronin.conductivity_sensor import ConductivitySensor
 from .devices.Cronin.shaker_stirrer import ShakerStirrer
@@ -49,6 +49,9 @@ class MRHeiConnect(SerialDevice):
         self.bytesize = serial.SEVENBITS
         self.parity = serial.PARITY_EVEN
 
+        # query the status every 5 seconds to reset the watchdog
+        self.keepalive_interval = 5
+
         # answer patterns
         self.stranswer = re.compile("([0-9A-Z_]+)\r\n")
         self.intanswer = re.compile("([0-9A-Z_]+) (-?\d)\r\n")
@@ -72,7 +75,7 @@ class MRHeiConnect(SerialDevice):
         """
         Queries the stirrer status every 5 seconds to reset the watchdog. Overrides dummy keepalive from parent method.
         """
-        self.non_blocking_wait(callback=self.query_status, interval=5)
+        self.query_status()
 
     @command
     def switch_protocol(self, protocol="new"):
@@ -92,15 +92,14 @@ class IKARV10(SerialDevice):
         self.MAX_RETRIES = 10
 
         self.heating_on = Event()  # communicator for switching the keepalive on or off
+        self.keepalive_interval = 2  # seconds between heating bath temperature checks
 
         super().__init__(address, port, mode, device_name, connect_on_instantiation, soft_fail_for_testing)
 
     def keepalive(self):
         """
         Queries heating bath temperature every 2 seconds if the heating is on to keep it alive. Overrides dummy
-        keepalive from parent method. This does not utilise the non_blocking_wait method because passing a property as
-        callback leads to unwanted behaviour (i.e. property gets read on every loop iteration, not just
-        every x seconds). self.last_time is initialised in the parent method.
+        keepalive from parent method. The command handler runs it every keepalive_interval seconds.
         """
 
         # check if heater is on
@@ -109,14 +108,11 @@ class IKARV10(SerialDevice):
                 # monitor temperature
                 temp = self.temperature_pv
                 floattemp = float(temp[0])
-                sleep(2)
             except ValueError:
                 self.logger.exception("Oh noes! Something went wrong!")
                 # stop heater when something goes wrong
                 self.stop_heater()
-        # when heating is off run parent "keepalive"
-        else:
-            sleep(0.1)
+        # when heating is off there's nothing to keep alive
 
     @command
     def initialise(self):
@@ -442,6 +442,22 @@ class C3000(SerialDevice):
         cmd = self.cmd.PREFIX + address + rotation_command + self.cmd.CMD_RUN
         return self.send_message(cmd)
 
+    @command
+    def run_command_string(self, command_string, address=None):
+        """Sends a string of commands the pump runs one after the other, e.g. 'I1V500P300' to switch the valve to port 1
+        and aspirate 300 increments at 500 increments/second, in a single transaction.
+        Arguments:
+            command_string {str} -- Commands without prefix, address and run command.
+        Keyword Arguments:
+            address {int or str} -- Value of the rotary switch position on the back of the pump (default: {None}).
+        Returns:
+            str -- Raw reply from the pump.
+        """
+
+        address = self.map_address(address)
+        cmd = self.cmd.PREFIX + address + command_string + self.cmd.CMD_RUN
+        return self.send_message(cmd)
+
     @command
     def is_pump_busy(self, address=None):
         """Runs status request command and checks if busy bit is set in the reply.
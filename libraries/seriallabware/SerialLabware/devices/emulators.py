@@ -0,0 +1,634 @@
+# coding=utf-8
+# !/usr/bin/env python
+"""
+"emulators" -- Serial protocol emulators for SerialLabware devices
+==================================================================
+
+.. module:: emulators
+   :platform: Linux
+   :synopsis: Answer on pseudo-terminals in the serial protocols of the supported lab equipment.
+   :license: BSD 3-clause
+
+(c) 2019 The Cronin Group, University of Glasgow
+
+The simulated devices in `sim_devices` skip communication entirely. An emulator instead opens a pseudo-terminal and
+answers on it in the protocol of the real device, so the device classes can be driven, including `SerialDevice`
+framing, reply parsing and timeouts, and their latency and throughput measured without any hardware attached. Pass
+`emulator.port` to the device class as its serial port.
+
+Every reply is delayed by the time request and reply would take on the wire at the baud rate of the device (10 bits
+per character), and by a response time plus a random jitter. `mute()` makes an emulator ignore messages, to exercise
+the paths for devices that don't reply.
+
+Example:
+    with IKARCTDigitalEmulator(response_time=0.01) as emulator:
+        hotplate = IKARCTDigital(emulator.port)
+        hotplate.temperature_sp = 60
+
+For style guide used see http://xkcd.com/1513/
+"""
+
+# system imports
+import logging
+import os
+import random
+import re
+import select
+import threading
+from time import monotonic, sleep
+
+# Core import
+from .Tricontinent.C3000_commands import C3000_commands_DT
+
+__all__ = [
+    "SerialEmulator", "IKAEmulator", "IKARCTDigitalEmulator", "IKARETControlViscEmulator", "IKARV10Emulator",
+    "CVC3000Emulator", "JULABOCF41Emulator", "HuberEmulator", "C3000Emulator", "ConductivitySensorEmulator",
+    "HeatingPadEmulator",
+]
+
+
+class SerialEmulator:
+    """
+    Pseudo-terminal peer of a device class. Messages received are split on `terminator` and answered one after the
+    other with the reply of the subclass's `reply` method, if any.
+    """
+    # Ending of the messages received
+    terminator = "\r\n"
+    encoding = "UTF-8"
+    # Baud rate of the real device
+    BAUDRATE = 9600
+    # Characters on the wire per byte: start bit, 7 or 8 data bits, parity and stop bits
+    BITS_PER_CHARACTER = 10
+
+    def __init__(self, baudrate=None, response_time=0.0, jitter=0.0):
+        """
+        Opens the pseudo-terminal and starts answering on it.
+
+        Args:
+            baudrate (int): Baud rate to calculate transfer times for. Default is the baud rate of the real device, 0
+                doesn't delay replies for transfer times
+            response_time (float): Seconds the device takes to process a message before replying
+            jitter (float): Upper bound of a random delay added to the response time, in seconds
+        """
+        # pseudo-terminals only exist on Unix
+        import tty
+
+        self.baudrate = self.BAUDRATE if baudrate is None else baudrate
+        self.response_time = response_time
+        self.jitter = jitter
+        self.logger = logging.getLogger("main_logger.serial_emulator_logger")
+
+        # messages received, in order
+        self.received = []
+        # number of messages still to be ignored
+        self.__muted = 0
+        self.__lock = threading.Lock()
+
+        # The emulator keeps the slave end open, so the terminal survives device classes reconnecting
+        self.__master, self.__slave = os.openpty()
+        tty.setraw(self.__slave)
+        self.port = os.ttyname(self.__slave)
+
+        # Writing to this pipe stops the emulator thread
+        self.__stop_read, self.__stop_write = os.pipe()
+        self.__thread = threading.Thread(target=self.__run, name="{0} on {1}".format(type(self).__name__, self.port), daemon=True)
+        self.__thread.start()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc_info):
+        self.close()
+
+    def close(self):
+        """
+        Stops answering and closes the pseudo-terminal.
+        """
+        os.write(self.__stop_write, b"\0")
+        self.__thread.join()
+        for fd in (self.__master, self.__slave, self.__stop_read, self.__stop_write):
+            os.close(fd)
+
+    def mute(self, messages=1):
+        """
+        Ignores the next messages received, as if the device was unplugged.
+
+        Args:
+            messages (int): Number of messages to ignore
+        """
+        with self.__lock:
+            self.__muted += messages
+
+    def transfer_time(self, data):
+        """
+        Returns the seconds it takes to send data at the baud rate of the emulator.
+
+        Args:
+            data (bytes): Data sent
+
+        Returns:
+            seconds (float): Transfer time
+        """
+        if not self.baudrate:
+            return 0
+        return len(data) * self.BITS_PER_CHARACTER / self.baudrate
+
+    def reply(self, message):
+        """
+        Answers a message. To be overridden by child classes.
+
+        Args:
+            message (str): Message received, without the terminator
+
+        Returns:
+            reply (str): Reply including its terminator, None if the device doesn't reply
+        """
+        return None
+
+    def __run(self):
+        terminator = self.terminator.encode(self.encoding)
+        buffer = b""
+        while True:
+            ready, _, _ = select.select([self.__master, self.__stop_read], [], [])
+            if self.__stop_read in ready:
+                return
+            buffer += os.read(self.__master, 4096)
+            while terminator in buffer:
+                message, buffer = buffer.split(terminator, 1)
+                self.__answer(message + terminator)
+
+    def __answer(self, data):
+        """ Answers a message received as data, after the time the device would take """
+        received = monotonic()
+        message = data.decode(self.encoding, errors="replace")[:-len(self.terminator)]
+        self.received.append(message)
+        with self.__lock:
+            if self.__muted:
+                self.__muted -= 1
+                self.logger.debug("Ignoring message %r.", message)
+                return
+        try:
+            reply = self.reply(message)
+        except Exception:
+            self.logger.exception("Error answering message %r.", message)
+            return
+        if reply is None:
+            return
+        reply = reply.encode(self.encoding)
+        delay = self.transfer_time(data) + self.response_time + random.uniform(0, self.jitter) + self.transfer_time(reply)
+        sleep(max(0, received + delay - monotonic()))
+        os.write(self.__master, reply)
+
+
+class IKAEmulator(SerialEmulator):
+    """
+    NAMUR protocol of IKA devices. `IN_PV_<n>` and `IN_SP_<n>` are answered with the value and the channel n.
+    `OUT_SP_<n> <value>`, `START_<n>`, `STOP_<n>` and `RESET` aren't answered. Started channels read their setpoint,
+    stopped ones their idle value.
+    """
+    NAME = "IKA"
+    # channel: (value when stopped, initial setpoint)
+    CHANNELS = {}
+    # channels reporting integer values
+    INTEGER_CHANNELS = ()
+
+    def __init__(self, baudrate=None, response_time=0.0, jitter=0.0):
+        self.name = self.NAME
+        self.idle_values = {channel: values[0] for channel, values in self.CHANNELS.items()}
+        self.setpoints = {channel: values[1] for channel, values in self.CHANNELS.items()}
+        self.started = set()
+        super().__init__(baudrate, response_time, jitter)
+
+    def value(self, channel, value):
+        """ Formats the answer to a query of a channel """
+        if channel in self.INTEGER_CHANNELS:
+            return "{0:d} {1}\r\n".format(int(value), channel)
+        return "{0:.1f} {1}\r\n".format(value, channel)
+
+    def reply(self, message):
+        command, _, argument = message.partition(" ")
+        if command == "IN_NAME":
+            return "{0}\r\n".format(self.name)
+        elif command == "OUT_NAME":
+            # the name is shortened to 6 characters
+            self.name = argument[:6]
+            return None
+        elif command == "RESET":
+            self.started.clear()
+            return None
+
+        kind, _, channel = command.rpartition("_")
+        try:
+            channel = int(channel)
+        except ValueError:
+            return None
+        if channel not in self.setpoints:
+            return None
+        if kind == "IN_PV":
+            return self.value(channel, self.setpoints[channel] if channel in self.started else self.idle_values[channel])
+        elif kind == "IN_SP":
+            return self.value(channel, self.setpoints[channel])
+        elif kind == "OUT_SP":
+            self.setpoints[channel] = float(argument)
+        elif kind == "START":
+            self.started.add(channel)
+        elif kind == "STOP":
+            self.started.discard(channel)
+        return None
+
+
+class IKARCTDigitalEmulator(IKAEmulator):
+    """ IKA RCT digital hotplate stirrer """
+    NAME = "RCT digital"
+    CHANNELS = {
+        1: (20.0, 20.0),    # medium temperature
+        2: (20.0, 20.0),    # hot plate temperature
+        3: (20.0, 340.0),   # hot plate safety temperature
+        4: (0, 0),          # stir rate
+        5: (0, 0),          # viscosity trend
+    }
+
+
+class IKARETControlViscEmulator(IKAEmulator):
+    """ IKA RET control-visc hotplate stirrer """
+    NAME = "RET control-visc"
+    CHANNELS = {
+        1: (20.0, 20.0),    # medium temperature
+        2: (20.0, 20.0),    # hot plate temperature
+        3: (20.0, 340.0),   # hot plate safety temperature
+        4: (0, 0),          # stir rate
+        7: (20.0, 20.0),    # heat transfer medium temperature
+        80: (7.0, 7.0),     # pH
+        90: (0.0, 0.0),     # weight
+    }
+
+
+class IKARV10Emulator(IKAEmulator):
+    """ IKA RV 10 rotary evaporator with HB 10 heating bath """
+    NAME = "RV10Digital"
+    CHANNELS = {
+        2: (20.0, 20.0),    # heating bath temperature
+        4: (0, 0),          # rotation speed
+        60: (0, 0),         # interval
+        61: (0, 0),         # timer
+        62: (0, 0),         # lift up
+        63: (0, 0),         # lift down
+    }
+    INTEGER_CHANNELS = (4, 60, 61, 62, 63)
+
+
+class CVC3000Emulator(SerialEmulator):
+    """
+    Vacuubrand CVC 3000 vacuum controller. Settings are echoed once `ECHO 1` was received, the pressure reads the
+    vacuum setpoint while running and atmospheric pressure otherwise.
+    """
+    BAUDRATE = 19200
+    ATMOSPHERIC_PRESSURE = 1013
+
+    def __init__(self, baudrate=None, response_time=0.0, jitter=0.0):
+        self.echo = False
+        self.remote = 0
+        self.controller_version = 3
+        self.mode = 2
+        self.running = False
+        self.vent_valve = 0
+        self.vacuum_sp = 100
+        self.speed_sp = 100
+        self.end_vacuum_sp = 10
+        self.runtime_sp = "00:00"
+        super().__init__(baudrate, response_time, jitter)
+
+    def reply(self, message):
+        command, _, argument = message.partition(" ")
+        if command == "IN_PV_1":
+            pressure = self.vacuum_sp if self.running else self.ATMOSPHERIC_PRESSURE
+            return "{0} mbar\r\n".format(pressure)
+        elif command == "IN_SP_1":
+            return "{0} mbar\r\n".format(self.vacuum_sp)
+        elif command == "IN_SP_2":
+            return "{0} %\r\n".format(self.speed_sp)
+        elif command == "IN_SP_5":
+            return "{0} mbar\r\n".format(self.end_vacuum_sp)
+        elif command == "IN_SP_6":
+            return "{0} h:m\r\n".format(self.runtime_sp)
+        elif command == "IN_STAT":
+            # pump, in-line valve, coolant valve, vent valve, mode, controller
+            return "{0:d}00{1:d}{2}0\r\n".format(self.running, self.vent_valve, str(self.mode)[0])
+        elif command == "IN_VER":
+            return "CVC 3000 V1.00\r\n"
+        # These always return their state
+        elif command == "START":
+            self.running = True
+            return "1\r\n"
+        elif command == "STOP":
+            self.running = False
+            return "0\r\n"
+        elif command == "REMOTE":
+            self.remote = int(argument)
+            return "{0}\r\n".format(self.remote)
+        elif command == "ECHO":
+            self.echo = argument == "1"
+            return "1\r\n" if self.echo else None
+
+        # Settings, echoed if echo is on
+        if command == "CVC":
+            self.controller_version = int(argument)
+        elif command == "OUT_MODE":
+            self.mode = int(argument)
+        elif command == "OUT_SP_1":
+            self.vacuum_sp = int(argument)
+        elif command == "OUT_SP_2":
+            self.speed_sp = 100 if argument == "HI" else int(argument)
+        elif command == "OUT_SP_5":
+            self.end_vacuum_sp = int(argument)
+        elif command == "OUT_SP_6":
+            self.runtime_sp = argument
+            argument = "{0} h:m".format(argument)
+        elif command == "OUT_VENT":
+            self.vent_valve = int(argument)
+        else:
+            return None
+        return "{0}\r\n".format(argument) if self.echo else None
+
+
+class JULABOCF41Emulator(SerialEmulator):
+    """
+    JULABO CF41 chiller. Settings aren't answered, the bath reads the selected setpoint while running and its idle
+    temperature otherwise. Without an external sensor `IN_PV_02` reads `---.--`.
+    """
+    IDLE_TEMPERATURE = 20.0
+
+    def __init__(self, baudrate=None, response_time=0.0, jitter=0.0, external_sensor=False):
+        self.external_sensor = external_sensor
+        self.setpoints = [self.IDLE_TEMPERATURE] * 3
+        self.selected_setpoint = 0
+        self.running = False
+        self.cooling_power = 100
+        super().__init__(baudrate, response_time, jitter)
+
+    @property
+    def temperature(self):
+        return self.setpoints[self.selected_setpoint] if self.running else self.IDLE_TEMPERATURE
+
+    def reply(self, message):
+        command, _, argument = message.partition(" ")
+        if command == "IN_PV_00":
+            return "{0:.2f}\r\n".format(self.temperature)
+        elif command == "IN_PV_02":
+            return "{0:.2f}\r\n".format(self.temperature) if self.external_sensor else "---.--\r\n"
+        elif command in ("IN_SP_00", "IN_SP_01", "IN_SP_02"):
+            return "{0:.2f}\r\n".format(self.setpoints[int(command[-1])])
+        elif command == "IN_MODE_01":
+            return "{0}\r\n".format(self.selected_setpoint)
+        elif command == "IN_MODE_05":
+            return "{0:d}\r\n".format(self.running)
+        elif command == "IN_HIL_00":
+            return "{0}\r\n".format(-self.cooling_power)
+        elif command == "STATUS":
+            return "03 REMOTE START\r\n" if self.running else "02 REMOTE STOP\r\n"
+        elif command == "VERSION":
+            return "JULABO CF41 VERSION 1.00\r\n"
+        elif command in ("OUT_SP_00", "OUT_SP_01", "OUT_SP_02"):
+            self.setpoints[int(command[-1])] = float(argument)
+        elif command == "OUT_MODE_01":
+            self.selected_setpoint = int(argument)
+        elif command == "OUT_MODE_05":
+            self.running = argument == "1"
+        elif command == "OUT_HIL_00":
+            self.cooling_power = -int(argument)
+        elif command.startswith("IN_"):
+            return "-08 INVALID COMMAND\r\n"
+        return None
+
+
+class HuberEmulator(SerialEmulator):
+    """
+    Huber chiller PB protocol. `{M<address><value>}` sets a variable to a 16 bit two's complement hex value, or reads it
+    if the value is `****`, and is answered with `{S<address><value>}`. The internal temperature reads the setpoint
+    while temperature control is on and the idle temperature otherwise.
+    """
+    SETPOINT = "00"
+    INTERNAL_TEMPERATURE = "01"
+    TEMPERATURE_CONTROL = "14"
+    START_RAMP = "5A"
+    IDLE_TEMPERATURE = 2000     # 20.00°C
+
+    def __init__(self, baudrate=None, response_time=0.0, jitter=0.0):
+        self.variables = {self.SETPOINT: self.IDLE_TEMPERATURE}
+        super().__init__(baudrate, response_time, jitter)
+
+    def reply(self, message):
+        match = re.fullmatch("\\{M([0-9A-F]{2})([0-9A-F]{4}|\\*{4})", message)
+        if match is None:
+            return None
+        address, value = match.groups()
+        if value != "****":
+            self.variables[address] = int(value, 16)
+            if address == self.START_RAMP:
+                self.variables[self.SETPOINT] = self.variables[address]
+        if address == self.INTERNAL_TEMPERATURE:
+            if self.variables.get(self.TEMPERATURE_CONTROL):
+                self.variables[address] = self.variables[self.SETPOINT]
+            else:
+                self.variables[address] = self.IDLE_TEMPERATURE
+        return "{{S{0}{1:04X}\r\n".format(address, self.variables.get(address, 0))
+
+
+class C3000Emulator(SerialEmulator):
+    """
+    Bus of Tricontinent C3000 pumps speaking the DT protocol. Command strings are run when they end with `R`, and set the
+    busy bit of the pump until its valve and plunger would have finished moving. Replies carry the error code of the
+    command: moves before initialisation, plunger positions out of range, unknown commands and commands sent while busy
+    are rejected.
+    """
+    INCREMENTS = C3000_commands_DT.RESOLUTION_MODES["N0"]
+    # increments/second after initialisation
+    DEFAULT_VELOCITY = 1400
+    # seconds to switch the valve
+    VALVE_TIME = 0.2
+
+    NO_ERROR = 0b0000
+    INVALID_COMMAND = 0b0010
+    INVALID_OPERAND = 0b0011
+    NOT_INITIALIZED = 0b0111
+    COMMAND_OVERFLOW = 0b1111
+
+    def __init__(self, addresses=("0",), baudrate=None, response_time=0.0, jitter=0.0, time_scale=1.0):
+        """
+        Opens the pseudo-terminal and starts answering on it.
+
+        Args:
+            addresses (Iterable[int or str]): Rotary switch positions of the pumps on the bus
+            baudrate (int): Baud rate to calculate transfer times for. Default is the baud rate of the real device, 0
+                doesn't delay replies for transfer times
+            response_time (float): Seconds the device takes to process a message before replying
+            jitter (float): Upper bound of a random delay added to the response time, in seconds
+            time_scale (float): Factor applied to all motion times
+        """
+        self.time_scale = time_scale
+        # address character on the bus: pump state
+        self.pumps = {
+            C3000_commands_DT.VALID_ADDRESSES[str(address)]: {
+                "initialized": False, "plunger": 0, "valve": 1, "velocity": self.DEFAULT_VELOCITY, "busy_until": 0.0,
+                "pending": ""}
+            for address in addresses}
+        super().__init__(baudrate, response_time, jitter)
+
+    def reply(self, message):
+        if not message.startswith(C3000_commands_DT.PREFIX) or len(message) < 2:
+            return None
+        address, body = message[1], message[2:]
+        if address == C3000_commands_DT.VALID_ADDRESSES["all"]:
+            # broadcasts aren't answered
+            for pump in self.pumps.values():
+                self.run(pump, body)
+            return None
+        if address not in self.pumps:
+            return None
+        pump = self.pumps[address]
+
+        data = ""
+        if body.startswith("?"):
+            error = self.NO_ERROR
+            data = self.query(pump, body)
+        else:
+            error = self.run(pump, body)
+        status = 0x40 | error
+        if monotonic() >= pump["busy_until"]:
+            status |= 0x20
+        return "/0{0}{1}\x03\r\n".format(chr(status), data)
+
+    def query(self, pump, body):
+        """ Answers a report command """
+        if body == C3000_commands_DT.GET_SYR_POS:
+            return str(pump["plunger"])
+        elif body == C3000_commands_DT.GET_VLV_POS:
+            return str(pump["valve"])
+        elif body == C3000_commands_DT.GET_INIT_STATUS:
+            return "1" if pump["initialized"] else "0"
+        elif body == C3000_commands_DT.GET_MAX_VEL:
+            return str(pump["velocity"])
+        elif body == C3000_commands_DT.GET_FW_VER:
+            return "C3000 EMULATOR"
+        return ""
+
+    def run(self, pump, body):
+        """
+        Runs or buffers a command string.
+
+        Returns:
+            error (int): Error code of the reply
+        """
+        if monotonic() < pump["busy_until"]:
+            return self.COMMAND_OVERFLOW
+        pump["pending"] += body
+        if not pump["pending"].endswith(C3000_commands_DT.CMD_RUN):
+            return self.NO_ERROR
+        commands = pump["pending"][:-1]
+        pump["pending"] = ""
+
+        tokens = re.findall("([A-Za-z])([0-9,]*)", commands)
+        if "".join(letter + operand for letter, operand in tokens) != commands:
+            return self.INVALID_COMMAND
+        # Check the whole string before moving anything
+        initialized = pump["initialized"]
+        plunger = pump["plunger"]
+        for letter, operand in tokens:
+            if letter in "ZYW":
+                initialized = True
+                plunger = 0
+            elif letter in "IOAaPpDd" and not initialized:
+                return self.NOT_INITIALIZED
+            elif letter in "AaPpDd":
+                plunger = self.plunger_target(letter, operand, plunger)
+                if not 0 <= plunger <= self.INCREMENTS:
+                    return self.INVALID_OPERAND
+            elif letter not in "IOwVSLvcNUKhm":
+                return self.INVALID_COMMAND
+
+        duration = 0
+        for letter, operand in tokens:
+            if letter in "ZYW":
+                pump["initialized"] = True
+                duration += self.VALVE_TIME + pump["plunger"] / pump["velocity"]
+                pump["plunger"] = 0
+            elif letter == "w" or letter in "IO" and operand:
+                duration += self.VALVE_TIME
+                if operand:
+                    pump["valve"] = int(operand)
+            elif letter == "V":
+                pump["velocity"] = max(int(operand or 0), 1)
+            elif letter in "AaPpDd":
+                target = self.plunger_target(letter, operand, pump["plunger"])
+                duration += abs(target - pump["plunger"]) / pump["velocity"]
+                pump["plunger"] = target
+        pump["busy_until"] = monotonic() + duration * self.time_scale
+        return self.NO_ERROR
+
+    @staticmethod
+    def plunger_target(letter, operand, plunger):
+        """ Plunger position after an absolute, aspirate or dispense command """
+        operand = int(operand or 0)
+        if letter in "Aa":
+            return operand
+        elif letter in "Pp":
+            return plunger + operand
+        return plunger - operand
+
+
+class ConductivitySensorEmulator(SerialEmulator):
+    """
+    Cronin conductivity sensor. `C` is answered with the conductivity against every resistor, `Q` with their sum.
+    """
+    def __init__(self, baudrate=None, response_time=0.0, jitter=0.0, readings=(512, 480, 300)):
+        self.readings = tuple(readings)
+        super().__init__(baudrate, response_time, jitter)
+
+    def reply(self, message):
+        if message == "Q":
+            return "{0}\r\n".format(sum(self.readings))
+        elif message == "C":
+            return "{0}\r\n".format(" ".join(str(reading) for reading in self.readings))
+        return None
+
+
+class HeatingPadEmulator(SerialEmulator):
+    """
+    Cronin heating pad. Requests end with a newline, every request is answered with a bare number. The pad reads the
+    target temperature while heating and the idle temperature otherwise.
+    """
+    terminator = "\n"
+    IDLE_TEMPERATURE = 20.0
+
+    def __init__(self, baudrate=None, response_time=0.0, jitter=0.0):
+        # -999 until a target is set
+        self.set_temp = -999.0
+        self.heating = False
+        super().__init__(baudrate, response_time, jitter)
+
+    @property
+    def pad_temp(self):
+        return self.set_temp if self.heating and self.set_temp != -999.0 else self.IDLE_TEMPERATURE
+
+    def reply(self, message):
+        command, _, argument = message.strip().partition(" ")
+        if command in ("get_temp_1", "get_is_temp"):
+            value = self.pad_temp
+        elif command == "get_temp_2":
+            value = self.IDLE_TEMPERATURE
+        elif command == "get_set_temp":
+            value = self.set_temp
+        elif command == "get_pwm":
+            return "{0}\r\n".format(128 if self.heating else 0)
+        elif command == "set_temp":
+            self.set_temp = value = float(argument)
+        elif command == "start":
+            self.heating = True
+            return "1\r\n"
+        elif command == "stop":
+            self.heating = False
+            return "1\r\n"
+        else:
+            # Also the empty line after every request
+            return None
+        return "{0:.2f}\r\n".format(value)
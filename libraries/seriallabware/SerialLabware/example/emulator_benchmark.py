@@ -0,0 +1,70 @@
+# coding=utf-8
+# !/usr/bin/env python
+# * ========================================================================= */
+# *                                                                           */
+# *   emulator_benchmark.py                                                   */
+# *   (c) 2019 The Cronin Group, University of Glasgow                        */
+# *                                                                           */
+# *   This script times a typical query of every device family against its   */
+# *   protocol emulator, at the device's baud rate, once with the I/O delays  */
+# *   the device classes ship with and once without them. Linux only.         */
+# *                                                                           */
+# * ========================================================================= */
+
+# system imports
+import argparse
+from time import monotonic
+
+# additional module imports
+from SerialLabware import (
+    IKARCTDigital, IKARETControlVisc, IKARV10, CVC3000, JULABOCF41, Huber, C3000, ConductivitySensor, HeatingPad
+)
+from SerialLabware.devices.emulators import (
+    IKARCTDigitalEmulator, IKARETControlViscEmulator, IKARV10Emulator, CVC3000Emulator, JULABOCF41Emulator,
+    HuberEmulator, C3000Emulator, ConductivitySensorEmulator, HeatingPadEmulator
+)
+
+# (name, emulator class, device class, query)
+FAMILIES = [
+    ("IKA RCT digital", IKARCTDigitalEmulator, IKARCTDigital, lambda device: device.temperature_pv),
+    ("IKA RET control-visc", IKARETControlViscEmulator, IKARETControlVisc, lambda device: device.temperature_pv),
+    ("IKA RV 10", IKARV10Emulator, IKARV10, lambda device: device.rotation_speed_pv),
+    ("Vacuubrand CVC 3000", CVC3000Emulator, CVC3000, lambda device: device.vacuum_pv()),
+    ("JULABO CF41", JULABOCF41Emulator, JULABOCF41, lambda device: device.get_setpoint()),
+    ("Huber", HuberEmulator, Huber, lambda device: device.get_temperature()),
+    ("Tricontinent C3000", C3000Emulator, C3000, lambda device: device.is_pump_busy(address=0)),
+    ("Cronin conductivity sensor", ConductivitySensorEmulator, ConductivitySensor, lambda device: device.conductivity),
+    ("Cronin heating pad", HeatingPadEmulator, HeatingPad, lambda device: device.get_pwm()),
+]
+
+
+def time_queries(query, device, n):
+    """ Mean seconds per query over n queries """
+    start = monotonic()
+    for _ in range(n):
+        query(device)
+    return (monotonic() - start) / n
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Time SerialLabware devices against their protocol emulators.")
+    parser.add_argument("-n", type=int, default=20, help="queries per device without I/O delays")
+    parser.add_argument("--shipped", type=int, default=3, help="queries per device with the shipped I/O delays")
+    parser.add_argument("--response-time", type=float, default=0.005, help="device processing time in seconds")
+    args = parser.parse_args()
+
+    print("{0:<28} {1:>14} {2:>14} {3:>12}".format("device", "shipped (ms)", "no delay (ms)", "queries/s"))
+    for name, emulator_class, device_class, query in FAMILIES:
+        with emulator_class(response_time=args.response_time) as emulator:
+            device = device_class(emulator.port)
+            try:
+                shipped = time_queries(query, device, args.shipped)
+                device.write_delay = device.read_delay = 0
+                fast = time_queries(query, device, args.n)
+            finally:
+                device.disconnect()
+        print("{0:<28} {1:>14.1f} {2:>14.1f} {3:>12.1f}".format(name, shipped * 1000, fast * 1000, 1 / fast))
+
+
+if __name__ == '__main__':
+    main()
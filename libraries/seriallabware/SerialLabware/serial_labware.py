@@ -25,54 +25,113 @@ import re
 import socket
 import sys
 import threading
-from functools import wraps
+from concurrent.futures import Future, TimeoutError as FutureTimeoutError, wait
+from functools import update_wrapper
 from queue import Empty, Queue
-from time import sleep, time
+from time import monotonic, sleep, time
 
 import serial
 
 
 def command(func):
     """
-    Decorator for command_set execution. Checks if the method is called in the same thread as the class instance,
-    if so enqueues the command_set and waits for a reply in the reply queue. Else it concludes it must be the command
-    handler thread and actually executes the method. This way methods in the child classes need to be written
-    just once and decorated accordingly.
+    Decorator for command_set execution. Checks if the method is called from the command handler thread, if so it
+    actually executes the method. Else it enqueues the command_set together with a Future of its own and waits for
+    the command handler to set the reply, or the exception raised, on it. This way methods in the child classes need
+    to be written just once and decorated accordingly, and a reply can never end up with the wrong caller.
+
+    Every decorated method also has a non-blocking variant, `device.method.submit(*args, **kwargs)`, returning the
+    Future instead of waiting for it. Commands used as properties are submitted with `device.submit(name, *args)`.
 
     Returns:
         decorated method
     """
+    return _Command(func)
 
-    @wraps(func)
-    def wrapper(*args, **kwargs):
-        device_instance = args[0]
-        if threading.get_ident() == device_instance.current_thread:
-            command_set = [func, args, kwargs]
-            device_instance.command_queue.put(command_set)
-            while True:
-                try:
-                    return device_instance.reply_queue.get(timeout=10)
-                    # Setting timeout to 10 secs is a temporary change to fix the issue when library hangs
-                    # if exception is thrown from the function wrapped with @command decorator and get_return=True
-                    # Without timeout here's what happens:
-                    # wrapper puts the wrapped function in the queue with device_instance.command_queue.put(command_set) and then main thread blocks on reply_queue.get()
-                    # Then a command execution thread fetches & executes the function where exception occurs, so potentially no command is sent to serial port & no reply can be expected
-                    # But main thread keeps blocked forever on reply_queue.get() because it has no clue that command has not been actually sent
-                except Empty:
-                    raise Empty("Reply queue timeout!") from None
-        else:
-            return func(*args, **kwargs)
 
-    return wrapper
+class _Command:
+    """
+    Method decorated with `command`. Calling it blocks until the command handler has run it, `submit` returns a
+    Future instead.
+
+    Args:
+        func (Callable): Undecorated method
+    """
+    def __init__(self, func):
+        self.func = func
+        update_wrapper(self, func)
+
+    def __get__(self, device, owner=None):
+        if device is None:
+            return self
+        return _BoundCommand(self, device)
+
+    def __call__(self, device, *args, **kwargs):
+        return device.run_command(self.func, *args, **kwargs)
+
+    def submit(self, device, *args, **kwargs):
+        return device.submit_command(self.func, *args, **kwargs)
+
+
+class _BoundCommand:
+    """
+    `command` method of a device.
+
+    Args:
+        command (_Command): Decorated method
+        device (SerialDevice): Device the method is bound to
+    """
+    def __init__(self, command, device):
+        self.command = command
+        self.device = device
+        update_wrapper(self, command.func)
+
+    def __call__(self, *args, **kwargs):
+        return self.command(self.device, *args, **kwargs)
+
+    def submit(self, *args, **kwargs):
+        """
+        Queues the command without waiting for it.
+
+        Returns:
+            reply (concurrent.futures.Future): Future the reply is set on. Wrap it with `asyncio.wrap_future` to await
+                it.
+        """
+        return self.command.submit(self.device, *args, **kwargs)
+
+    def __repr__(self):
+        return "<command {0} of {1}>".format(self.command.func.__qualname__, self.device.device_name)
+
+
+def gather(*futures, timeout=None):
+    """
+    Waits for the replies to commands submitted to any number of devices, so the commands run on all devices at once.
+
+    Args:
+        futures (concurrent.futures.Future): Futures returned by `submit`
+        timeout (float): Seconds to wait for all replies, None to wait forever
+
+    Returns:
+        replies (list): Reply of every command, in the order of futures
+
+    Raises:
+        Empty: Not all replies arrived within timeout. Commands still queued are cancelled.
+        Exception: The exception raised by the first command that failed, once all have finished
+    """
+    _, not_done = wait(futures, timeout=timeout)
+    if not_done:
+        for reply in not_done:
+            reply.cancel()
+        raise Empty("Reply queue timeout!")
+    return [reply.result() for reply in futures]
 
 
 class SerialDevice:
     """
     This is a generic parent class handling serial communication with lab equipment. It provides
     methods for opening and closing connections as well as a keepalive. It works by spawning a
-    daemon thread which periodically checks a queue for commands. If no commands are enqueued,
-    a keepalive method is executed periodically. Replies are put in their own reply queue where
-    they can be retrieved at any time.
+    daemon thread which waits for commands on a queue and runs the keepalive method every
+    keepalive_interval seconds. Every queued command carries a Future the reply is set on.
     """
     def __init__(self, address=None, port=None, mode="serial", device_name=None, connect_on_instantiation=False, soft_fail_for_testing=False):
         """
@@ -87,14 +146,15 @@ class SerialDevice:
         """
         # note down current thread number
         self.current_thread = threading.get_ident()
+        # thread number of the command handler, None while it isn't running
+        self.command_handler_thread = None
         self.disconnect_requested = threading.Event()
         self.disconnect_requested.clear()
         # implement class logger
         #FIXME this has to be re-done, no hard-coded logger names
         self.logger = logging.getLogger("main_logger.serial_device_logger")
-        # spawn queues
+        # spawn queue of [method, args, kwargs, reply future] items
         self.command_queue = Queue()
-        self.reply_queue = Queue()
         
         # DEBUG testing switch, to allow soft-fails instead of exceptions
         self.__soft_fail_for_testing = soft_fail_for_testing
@@ -115,11 +175,15 @@ class SerialDevice:
 
         # Connection object
         self.__connection = None
+        # Data received over ethernet that isn't part of a reply handed over yet
+        self.__receive_buffer = bytearray()
         
         # Command format settings
         # hasattr() is used not to override the attributes that might have already been set in the child class before activating this with super().__init__()
         if not hasattr(self, "command_termination"): self.command_termination = '\r\n'
         if not hasattr(self, "standard_encoding"): self.standard_encoding = 'UTF-8'
+        # Ending of the replies, used to tell where a reply received over ethernet is complete
+        if not hasattr(self, "reply_termination"): self.reply_termination = self.command_termination
 
         # Serial connection settings
         if not hasattr(self, "baudrate"): self.baudrate = 9600
@@ -136,6 +200,10 @@ class SerialDevice:
         # I/O delays
         if not hasattr(self, "write_delay"): self.write_delay = 0
         if not hasattr(self, "read_delay"): self.read_delay = 0
+
+        # Seconds between keepalive calls, and to wait for the reply to a command
+        if not hasattr(self, "keepalive_interval"): self.keepalive_interval = 0.1
+        if not hasattr(self, "reply_timeout"): self.reply_timeout = 10
         
         # Set device mode
         self.mode = mode if mode is not None else "serial"
@@ -156,39 +224,133 @@ class SerialDevice:
         thread for more important stuff, partially to allow for implementation of watchdog keepalive calls,
         which would be tremendously tricky to do from the main thread.
 
-        This private function polls the command_queue for any commands to send. If no commands are queued,
-        a keepalive method is executed. Any replies received from the device are enqueued into reply_queue for
-        further processing.
+        This private function blocks on the command_queue until a command comes in or the next keepalive is due.
+        The reply of every command, or the exception it raised, is set on the Future queued with it.
         """
+        self.command_handler_thread = threading.get_ident()
+        next_keepalive = monotonic() + self.keepalive_interval
         while True:
             if self.disconnect_requested.is_set():
                 self.logger.debug("Stop requested, command handler exiting.")
                 break
             try:
-                if not self.command_queue.empty():
-                    command_item = self.command_queue.get()
-                    method = command_item[0]
-                    arguments = command_item[1]
-                    keywordarguments = command_item[2]
-                    reply = method(*arguments, **keywordarguments)
-                    self.reply_queue.put(reply)
-                else:
-                    self.keepalive()
-            except:
-                # workaround if something goes wrong with the serial connection
-                # future me will certainly not hate past me for this...
-                # but current other one hates you for that been done that way!
-                err_msg = "Error while running {} - {}".format(method, sys.exc_info()[1])
-                self.logger.critical(err_msg)
-                if self.mode == 'serial':
-                    self.__connection.flush()
-                # Purge the queues
-                while not self.command_queue.empty():
-                    self.command_queue.get()
-                while not self.reply_queue.empty():
-                    self.reply_queue.get()
+                command_item = self.command_queue.get(timeout=max(next_keepalive - monotonic(), 0))
+            except Empty:
+                command_item = None
+            if command_item is None:
+                # Keepalive due, or woken up to check for a disconnect request
+                if monotonic() >= next_keepalive:
+                    try:
+                        self.keepalive()
+                    except Exception:
+                        self.__command_failed(self.keepalive)
+                    next_keepalive = monotonic() + self.keepalive_interval
+                continue
+
+            method, arguments, keywordarguments, reply = command_item
+            # Skip commands whose caller has given up waiting
+            if not reply.set_running_or_notify_cancel():
+                continue
+            try:
+                reply.set_result(method(*arguments, **keywordarguments))
+            except Exception as e:
+                self.__command_failed(method)
+                reply.set_exception(e)
+        self.command_handler_thread = None
+        self.__fail_pending_commands()
+
+    def __command_failed(self, method):
+        """ Logs the exception raised by a command or the keepalive and flushes the connection """
+        # workaround if something goes wrong with the serial connection
+        # future me will certainly not hate past me for this...
+        # but current other one hates you for that been done that way!
+        err_msg = "Error while running {} - {}".format(method, sys.exc_info()[1])
+        self.logger.critical(err_msg)
+        if self.mode == 'serial':
+            self.__connection.flush()
+
+    def __fail_pending_commands(self):
+        """ Fails the Futures of all queued commands, so their callers don't wait for a reply that won't come """
+        while True:
+            try:
+                command_item = self.command_queue.get_nowait()
+            except Empty:
+                break
+            if command_item is not None and command_item[3].set_running_or_notify_cancel():
+                command_item[3].set_exception(ConnectionError("{0} disconnected.".format(self.device_name)))
+
+    def submit_command(self, func, *args, **kwargs):
+        """
+        Queues a command for the command handler, the only thread talking to the device, without waiting for it.
+        Called from the command handler itself, the command is run right away.
+
+        Args:
+            func (Callable): Undecorated method to call with the device and the other arguments
+
+        Returns:
+            reply (concurrent.futures.Future): Future the reply, or the exception raised, is set on
+        """
+        reply = Future()
+        if threading.get_ident() == self.command_handler_thread:
+            # Queuing the command would deadlock
+            reply.set_running_or_notify_cancel()
+            try:
+                reply.set_result(func(self, *args, **kwargs))
+            except Exception as e:
+                reply.set_exception(e)
+            return reply
+        self.command_queue.put([func, (self,) + args, kwargs, reply])
+        return reply
+
+    def run_command(self, func, *args, **kwargs):
+        """
+        Has the command handler run a command and waits for the reply, for at most reply_timeout seconds.
+
+        Args:
+            func (Callable): Undecorated method to call with the device and the other arguments
+
+        Returns:
+            reply: Whatever the command returned
+
+        Raises:
+            Empty: No reply within reply_timeout. The command is cancelled if it hasn't started yet.
+        """
+        if threading.get_ident() == self.command_handler_thread:
+            return func(self, *args, **kwargs)
+        reply = self.submit_command(func, *args, **kwargs)
+        try:
+            return reply.result(timeout=self.reply_timeout)
+        except FutureTimeoutError:
+            # Don't send the command late if it is still queued
+            reply.cancel()
+            raise Empty("Reply queue timeout!") from None
+
+    def submit(self, name, *args, **kwargs):
+        """
+        Queues a command method, or reading or setting a property, by name without waiting for it.
+
+        Args:
+            name (str): Name of the method or property
+            args: Arguments of the method, or the value to set the property to. Reads the property if there are none
+
+        Returns:
+            reply (concurrent.futures.Future): Future the reply is set on
+        """
+        func = getattr(type(self), name)
+        if isinstance(func, property):
+            func = func.fset if args else func.fget
+            if func is None:
+                raise AttributeError("Property {0} can't be {1}.".format(name, "set" if args else "read"))
+        if isinstance(func, _Command):
+            func = func.func
+        return self.submit_command(func, *args, **kwargs)
 
     def launch_command_handler(self):
+        # Reconnecting from a command, the command handler is still running
+        if getattr(self, "command_handler", None) is not None and self.command_handler.is_alive():
+            return
+        # Purge the queue
+        self.__fail_pending_commands()
         self.command_handler = threading.Thread(target=self.__command_handler_daemon, name="{0}_command_handler".format(self.device_name), daemon=True)
         self.command_handler.start()
 
@@ -198,11 +360,6 @@ class SerialDevice:
         If a connection is already open it is closed and then a connection is re-established with the current settings
         """
         self.disconnect_requested.clear()
-        # Purge the queues
-        while not self.command_queue.empty():
-            self.command_queue.get()
-        while not self.reply_queue.empty():
-            self.reply_queue.get()
         if self.mode == 'serial':
             if self.__connection is not None and self.__connection.isOpen():
                 self.logger.info("Already connected!")
@@ -237,6 +394,7 @@ class SerialDevice:
             # in case 'address' was provided and 'mode' was set to "socket"
             # create a socket connection
             self.__connection = socket.socket(socket.AF_INET, socket.SOCK_STREAM)
+            self.__receive_buffer = bytearray()
             # Set socket timeout
             self.__connection.settimeout(self.timeout)
             try:
@@ -262,7 +420,10 @@ class SerialDevice:
         """
         self.logger.debug("Stopping command handler...")
         self.disconnect_requested.set()
-        self.command_handler.join()
+        # Wake the command handler up
+        self.command_queue.put(None)
+        if threading.get_ident() != self.command_handler_thread:
+            self.command_handler.join()
         self.logger.debug("Command handler stopped...")
         if self.__connection is not None:
             self.__connection.close()
@@ -308,6 +469,8 @@ class SerialDevice:
                     if self.mode == "serial":
                         self.__connection.reset_input_buffer()
                         self.logger.debug("Reset input buffer before sending command.")
+                    else:
+                        self.__reset_receive_buffer()
                 if self.mode == "serial":
                     self.__connection.write("{0}{1}".format(message, self.command_termination).encode(self.standard_encoding))
                 else:
@@ -363,32 +526,24 @@ class SerialDevice:
             # checking if a connection is there
             if self.__connection is not None:
                 # Get data from connection
+                # Socket connections deliver data in chunks, read until the reply is complete
+                if self.mode == "ethernet":
+                    with self._connection_lock:
+                        answer = self.__receive_reply(return_pattern=return_pattern, multiline=multiline)
                 # If multiple lines are expected, keep reading lines until no more lines come in
-                # That's always the case for socket connection because data is read back in chunks
-                if multiline or self.mode == "ethernet":
+                elif multiline:
                     answer = ""
                     with self._connection_lock:
                         while True:
-                            if self.mode == "serial":
-                                line = self.__connection.readline()
-                                if line:
-                                    try:
-                                        answer += line.decode(self.standard_encoding)
-                                    except UnicodeDecodeError:
-                                        self.logger.warning("Failed to decode reply. Raw reply: %s", answer)
-                                        answer += line
-                                else:
-                                    break
-                            # Ethernet connection
-                            else:
-                                # Read data from socket
+                            line = self.__connection.readline()
+                            if line:
                                 try:
-                                    chunk = self.__connection.recv(4096)
-                                    while chunk:
-                                        answer += chunk.decode()
-                                        chunk = self.__connection.recv(4096)
-                                except socket.timeout:
-                                    break
+                                    answer += line.decode(self.standard_encoding)
+                                except UnicodeDecodeError:
+                                    self.logger.warning("Failed to decode reply. Raw reply: %s", answer)
+                                    answer += line
+                            else:
+                                break
                 # if just one line is expected, just read one line (faster than always waiting for the timeout)
                 else:
                     with self._connection_lock:
@@ -434,6 +589,72 @@ class SerialDevice:
             # information
             raise Exception("Serial device message receive failed. Error Message: {0}\n{1}".format(e, e.__traceback__))
 
+    def __receive_reply(self, return_pattern=None, multiline=False):
+        """
+        Reads from the socket until the receive buffer holds a complete reply and takes it out of the buffer. A reply
+            is complete at the first reply_termination, or if multiple lines are expected, at the first
+            reply_termination the data up to which matches return_pattern. Anything received after the reply is kept
+            for the next one. Multiline replies without a pattern, and replies that never end, are read until the
+            connection times out.
+
+        Args:
+            return_pattern (_sre.SRE_Pattern): Pattern a complete multiline reply matches
+            multiline (bool): Are you expecting a return message spanning multiple lines?
+
+        Returns:
+            answer (str): The decoded reply, including the termination
+        """
+        termination = self.reply_termination.encode(self.standard_encoding)
+        # Where to look for the next termination, everything before is known not to complete the reply
+        end = 0
+        while True:
+            found = self.__receive_buffer.find(termination, end)
+            if found >= 0:
+                end = found + len(termination)
+                if not multiline:
+                    return self.__take_reply(end)
+                if return_pattern is not None and re.match(return_pattern, self.__decode(self.__receive_buffer[:end])):
+                    return self.__take_reply(end)
+                continue
+            try:
+                chunk = self.__connection.recv(4096)
+            except socket.timeout:
+                break
+            # Connection closed by the device
+            if not chunk:
+                break
+            self.__receive_buffer += chunk
+        # Timed out, hand over whatever arrived
+        return self.__take_reply(len(self.__receive_buffer))
+
+    def __take_reply(self, end):
+        """ Takes the first end bytes out of the receive buffer and decodes them """
+        reply = bytes(self.__receive_buffer[:end])
+        del self.__receive_buffer[:end]
+        return self.__decode(reply)
+
+    def __decode(self, data):
+        try:
+            return bytes(data).decode(self.standard_encoding)
+        except UnicodeDecodeError:
+            self.logger.warning("Failed to decode reply. Raw reply: %s", data)
+            return bytes(data).decode(self.standard_encoding, errors="replace")
+
+    def __reset_receive_buffer(self):
+        """
+        Discards everything received over ethernet that wasn't handed over in a reply yet, like stale replies to
+            commands that timed out, the same way the input buffer of a serial connection is reset.
+        """
+        self.__receive_buffer.clear()
+        self.__connection.setblocking(False)
+        try:
+            while self.__connection.recv(4096):
+                pass
+        except (BlockingIOError, InterruptedError):
+            pass
+        finally:
+            self.__connection.settimeout(self.timeout)
+
     def non_blocking_wait(self, callback, interval):
         """
         Simple non-blocking wait function crafted after the Arduino Blink Without Delay example. Checks whether the
@@ -456,9 +677,10 @@ class SerialDevice:
     def keepalive(self):
         """
         Dummy keepalive method. This is just a stand-in for whatever keepalive operation needs to be performed
-        on the device, meant to be overridden in the actual child class.
+        on the device, meant to be overridden in the actual child class. It is run on the command handler thread
+        every keepalive_interval seconds and must not block for longer than it takes to talk to the device.
         """
-        sleep(0.1)
+        pass
 
     #FIXME potentially duplicates close_connection()
     def disconnect(self):